@@ -0,0 +1,243 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from candidate_store import get_candidate_store
+from metrics import get_metrics
+from prompt_builder import USER_INPUT_TOKENS, truncate_to_tokens
+from rate_limit import RateLimiter, retry_with_backoff
+from resume_cache import get_resume_cache, make_cache_key
+
+# Bump RUBRIC_VERSION whenever RUBRIC or the scoring prompt changes: cached scores are keyed by it,
+# and every candidate is scored again for the new version
+RUBRIC_VERSION = "1"
+RUBRIC = """
+5 - Correct, complete and specific; shows hands-on experience and discusses trade-offs.
+4 - Correct and reasonably complete, with minor gaps or little depth.
+3 - Partly correct or generic; covers the basics but misses important points.
+2 - Mostly incorrect, vague or off-topic, with only a little relevant content.
+1 - No meaningful answer (empty, "I don't know", or unrelated).
+"""
+MIN_SCORE = 1
+MAX_SCORE = 5
+
+# Question/answer pairs sent in one model request (override with environment variables)
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "20"))
+# Candidates read from the store and written back per transaction
+SCORING_CANDIDATE_BATCH = 200
+# Times a candidate whose record is replaced while it is being scored is re-read and scored again
+SCORING_STALE_RETRIES = 2
+
+SCORING_GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "max_output_tokens": 4096,
+}
+
+
+class ScoringFailedError(Exception):
+    pass
+
+
+# Cache key for one answer's score: the same question, answer and rubric are only ever scored once
+def score_cache_key(question, answer):
+    return make_cache_key("answer-score", RUBRIC_VERSION, question, answer)
+
+# Answered questions in a candidate record: [(question, answer)]
+def answered_questions(record):
+    return [
+        (item["question"], item["answer"])
+        for item in record.get("answers") or []
+        if item.get("question") and (item.get("answer") or "").strip()
+    ]
+
+
+def build_scoring_prompt(pairs):
+    items = "\n\n".join(
+        f"Item {number}\n"
+        f"Question: {truncate_to_tokens(question, USER_INPUT_TOKENS)}\n"
+        f"Answer: {truncate_to_tokens(answer, USER_INPUT_TOKENS)}"
+        for number, (question, answer) in enumerate(pairs, start=1)
+    )
+    return f"""
+    You are grading candidates' answers to technical interview questions for TalentScout.
+    Grade each item independently, using only this rubric:
+    {RUBRIC}
+    {items}
+
+    Return a JSON array of scores with one object per item and these keys: item, score, rationale
+    The score is an integer from {MIN_SCORE} to {MAX_SCORE}; the rationale is one short sentence.
+    Only return the JSON array, nothing else.
+    """
+
+# Score a batch of (question, answer) pairs in one model request; returns [{"score", "rationale"}] in order.
+# Raises ScoringFailedError if any item is missing or malformed, so the batch can be retried.
+def score_batch(pairs):
+    import interview_engine as engine
+
+    response = engine.get_model().generate(build_scoring_prompt(pairs), generation_config=SCORING_GENERATION_CONFIG)
+    try:
+        results = engine.parse_json_response(response.text)
+    except json.JSONDecodeError:
+        raise ScoringFailedError(f"Could not parse scores: {response.text[:200]}")
+
+    scores = {}
+    for result in results if isinstance(results, list) else []:
+        try:
+            number, score = int(result["item"]), int(result["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 1 <= number <= len(pairs) and MIN_SCORE <= score <= MAX_SCORE:
+            scores[number] = {"score": score, "rationale": str(result.get("rationale", "")).strip()}
+    missing = len(pairs) - len(scores)
+    if missing:
+        raise ScoringFailedError(f"{missing} of {len(pairs)} items were not scored")
+    return [scores[number] for number in range(1, len(pairs) + 1)]
+
+
+# Record with its per-answer scores and their average, in the saved-record schema
+def apply_scores(record, scored_answers):
+    record = dict(record)
+    average = round(sum(item["score"] for item in scored_answers) / len(scored_answers), 2)
+    record["answer_scores"] = {
+        "rubric_version": RUBRIC_VERSION,
+        "average": average,
+        "scores": scored_answers,
+    }
+    return record, average
+
+
+# Score every candidate not yet scored under RUBRIC_VERSION and write the scores back to the candidate store.
+# Cached scores are reused; the rest are sent in batches of batch_size, with up to `concurrency` requests
+# in flight under the rate limiter. Candidates whose batches fail are left for the next run.
+def run_scoring(concurrency=4, requests_per_minute=60, retries=3, batch_size=SCORING_BATCH_SIZE, limit=None):
+    store = get_candidate_store()
+    cache = get_resume_cache()
+    metrics = get_metrics()
+    limiter = RateLimiter(requests_per_minute)
+    stats = {"candidates": 0, "skipped": 0, "failed": 0, "stale": 0, "answers": 0, "cached": 0, "requests": 0}
+    start_time = time.time()
+
+    def score_with_retries(pairs):
+        def call():
+            limiter.acquire()
+            return score_batch(pairs)
+        try:
+            return retry_with_backoff(call, retries=retries)
+        except Exception as e:
+            print(f"Error scoring {len(pairs)} answers: {str(e)}")
+            return None
+
+    def score_window(candidates, executor):
+        # Score each distinct uncached answer once, even if several candidates gave it
+        scores = {}
+        pending = {}
+        hits = 0
+        for _, _, record in candidates:
+            for question, answer in answered_questions(record):
+                key = score_cache_key(question, answer)
+                if key in scores or key in pending:
+                    continue
+                cached = cache.get(key)
+                if cached is not None:
+                    scores[key] = cached
+                    hits += 1
+                else:
+                    pending[key] = (question, answer)
+        stats["cached"] += hits
+        metrics.count("answer_score_cache", value=hits, result="hit")
+        metrics.count("answer_score_cache", value=len(pending), result="miss")
+
+        keys = list(pending)
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        stats["requests"] += len(batches)
+        for batch, results in zip(batches, executor.map(lambda b: score_with_retries([pending[k] for k in b]), batches)):
+            if results is None:
+                continue
+            for key, result in zip(batch, results):
+                scores[key] = result
+                cache.put(key, result)
+
+        scored = []
+        for candidate_id, revision, record in candidates:
+            pairs = answered_questions(record)
+            if not pairs:
+                # Nothing to grade (e.g. a batch-ingested resume); mark it so later runs skip it
+                scored.append((candidate_id, revision, None, None, 0))
+                continue
+            keys = [score_cache_key(question, answer) for question, answer in pairs]
+            if any(key not in scores for key in keys):
+                stats["failed"] += 1
+                continue
+            scored_answers = [
+                {"question": question, "answer": answer, **scores[key]}
+                for (question, answer), key in zip(pairs, keys)
+            ]
+            record, average = apply_scores(record, scored_answers)
+            scored.append((candidate_id, revision, record, average, len(pairs)))
+        stale = set(store.save_answer_scores([item[:4] for item in scored], RUBRIC_VERSION))
+        for candidate_id, _, record, _, answers in scored:
+            if candidate_id in stale:
+                continue
+            if record is None:
+                stats["skipped"] += 1
+            else:
+                stats["candidates"] += 1
+                stats["answers"] += answers
+        return stale
+
+    # Score a window; candidates whose record was replaced meanwhile are re-read and scored again
+    def score_candidates(candidates, executor):
+        for _ in range(SCORING_STALE_RETRIES + 1):
+            stale = score_window(candidates, executor)
+            if not stale:
+                return
+            candidates = []
+            for candidate_id in stale:
+                row = store.get(candidate_id)
+                if row is not None:
+                    candidates.append((candidate_id, row["revision"], row["record"]))
+            if not candidates:
+                return
+        stats["stale"] += len(candidates)
+
+    # Windows of candidates are committed as they finish, so an interrupted run keeps its progress
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        window = []
+        for candidate in itertools.islice(store.iter_unscored(RUBRIC_VERSION, batch_size=SCORING_CANDIDATE_BATCH), limit):
+            window.append(candidate)
+            if len(window) >= SCORING_CANDIDATE_BATCH:
+                score_candidates(window, executor)
+                window = []
+        if window:
+            score_candidates(window, executor)
+
+    elapsed = time.time() - start_time
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["answers_per_second"] = round(stats["answers"] / elapsed, 3) if elapsed > 0 else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score interview answers in the candidate store with the model.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Scoring requests in flight (default: 4)")
+    parser.add_argument("--rpm", type=int, default=60, help="Maximum model requests per minute (default: 60)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per failed request (default: 3)")
+    parser.add_argument("--batch-size", type=int, default=SCORING_BATCH_SIZE, help="Answers per model request")
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N unscored candidates")
+    args = parser.parse_args()
+
+    stats = run_scoring(
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        retries=args.retries,
+        batch_size=args.batch_size,
+        limit=args.limit
+    )
+    print(json.dumps(stats, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import interview_engine as engine
+from candidate_store import BatchWriter, get_candidate_store
+from candidate_search import get_search_index
+from rate_limit import RateLimiter, retry_with_backoff
+from resume_cache import hash_bytes
+from resume_extract import DOCX_MIME, PDF_MIME, TXT_MIME
+
+FILE_TYPES = {
+    ".pdf": PDF_MIME,
+    ".docx": DOCX_MIME,
+    ".txt": TXT_MIME,
+}
+
+
+class AnalysisFailedError(Exception):
+    pass
+
+
+# Minimal stand-in for Streamlit's UploadedFile so the app's extraction helpers can be reused
+class ResumeFile:
+    def __init__(self, path):
+        self.name = os.path.basename(path)
+        self.type = FILE_TYPES[os.path.splitext(path)[1].lower()]
+        with open(path, "rb") as f:
+            self._data = f.read()
+
+    def getvalue(self):
+        return self._data
+
+
+# Append-only JSONL log of finished files, keyed by content hash so renamed files are skipped too
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        # An interrupted run can leave a partial last line; new entries start on a line of their own
+        self._partial_line = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    self._partial_line = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partial line from an interrupted run
+                    if entry.get("status") == "done":
+                        self.done.add(entry["sha256"])
+
+    def record(self, entry):
+        with self._lock:
+            with open(self.path, "a") as f:
+                if self._partial_line:
+                    f.write("\n")
+                    self._partial_line = False
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+            if entry["status"] == "done":
+                self.done.add(entry["sha256"])
+
+
+# Find resume files with a supported extension under input_dir
+def find_resumes(input_dir):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in FILE_TYPES:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+# Run the upload flow headlessly for one resume and queue its candidate record for the store
+def ingest_resume(resume_file, limiter, retries, writer, one_shot=False):
+    file_hash, resume_text = engine.get_cached_resume_text(resume_file)
+    if not resume_text:
+        raise AnalysisFailedError("no text could be extracted")
+
+    # The analysis functions report failures by returning None; turn that into an error so it is retried
+    def with_retries(analyze_fn):
+        def analyze(*args):
+            def call():
+                limiter.acquire()
+                result = analyze_fn(*args)
+                if not result:
+                    raise AnalysisFailedError("resume analysis returned no data")
+                return result
+            return retry_with_backoff(call, retries=retries)
+        return analyze
+
+    technical_questions = []
+    if one_shot:
+        result = engine.get_cached_one_shot_analysis(
+            file_hash, resume_text, analyze=with_retries(engine.analyze_resume_with_questions)
+        )
+        resume_data = result["resume_data"]
+        technical_questions = result["questions"]
+    else:
+        resume_data = engine.get_cached_resume_analysis(
+            file_hash, resume_text, analyze=with_retries(engine.analyze_resume)
+        )
+
+    candidate_info = engine.new_candidate_info()
+    candidate_info["resume_text"] = resume_text
+    candidate_info["resume_filename"] = resume_file.name
+    engine.apply_resume_data(candidate_info, resume_data)
+
+    # Rate-limited only when the question bank leaves technologies uncovered and the model is actually called
+    def generate_questions(*args):
+        limiter.acquire()
+        return engine.generate_technical_questions(*args)
+
+    if not technical_questions and candidate_info["tech_stack"]:
+        technical_questions = engine.get_technical_questions(
+            candidate_info["tech_stack"],
+            candidate_info["desired_position"],
+            resume_text,
+            candidate_info["experience"],
+            generate=generate_questions
+        )
+
+    record = engine.build_candidate_record(candidate_info, [], technical_questions, [])
+    writer.add(record)
+    return file_hash
+
+
+# Process every resume under input_dir with at most `concurrency` resumes in flight
+def run_batch(input_dir, output_dir="data", concurrency=4, requests_per_minute=60, retries=3, checkpoint_path=None, limit=None, one_shot=False):
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(output_dir, "batch_checkpoint.jsonl")
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(checkpoint_path)
+    limiter = RateLimiter(requests_per_minute)
+    # Flushed explicitly, in step with the checkpoint; each committed batch is indexed for search
+    writer = BatchWriter(get_candidate_store(), batch_size=50, on_flush=get_search_index().add_candidates)
+
+    paths = find_resumes(input_dir)
+    if limit is not None:
+        paths = paths[:limit]
+
+    stats = {"done": 0, "skipped": 0, "failed": 0}
+    start_time = time.time()
+
+    def handle(path):
+        resume_file = ResumeFile(path)
+        file_hash = hash_bytes(resume_file.getvalue())
+        if file_hash in checkpoint.done:
+            return "skipped", path, None
+        try:
+            ingest_resume(resume_file, limiter, retries, writer, one_shot)
+        except Exception as e:
+            checkpoint.record({"file": path, "sha256": file_hash, "status": "failed", "error": str(e)})
+            return "failed", path, str(e)
+        return "done", path, file_hash
+
+    # Records must be committed before they are checkpointed as done
+    completed = []
+
+    def commit_completed():
+        writer.flush()
+        for path, file_hash in completed:
+            checkpoint.record({"file": path, "sha256": file_hash, "status": "done"})
+        completed.clear()
+
+    # Keep a bounded window of futures so huge folders don't queue everything up front
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        path_iter = iter(paths)
+        while True:
+            while len(pending) < concurrency * 2:
+                path = next(path_iter, None)
+                if path is None:
+                    break
+                pending.add(executor.submit(handle, path))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                status, path, detail = future.result()
+                stats[status] += 1
+                if status == "failed":
+                    print(f"Failed to process {path}: {detail}")
+                elif status == "done":
+                    completed.append((path, detail))
+            if len(completed) >= writer.batch_size:
+                commit_completed()
+    commit_completed()
+
+    elapsed = time.time() - start_time
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["resumes_per_second"] = round(stats["done"] / elapsed, 3) if elapsed > 0 else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-screen a folder of resumes without the Streamlit UI.")
+    parser.add_argument("input_dir", help="Folder containing PDF, DOCX or TXT resumes")
+    parser.add_argument("--output-dir", default="data", help="Where the progress checkpoint is written (default: data)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Resumes processed in parallel (default: 4)")
+    parser.add_argument("--rpm", type=int, default=60, help="Maximum model requests per minute (default: 60)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per failed analysis (default: 3)")
+    parser.add_argument("--checkpoint", default=None, help="Progress file (default: <output-dir>/batch_checkpoint.jsonl)")
+    parser.add_argument("--one-shot", action="store_true", help="Analyze and draft questions in a single model request")
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N resumes")
+    args = parser.parse_args()
+
+    stats = run_batch(
+        args.input_dir,
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        retries=args.retries,
+        checkpoint_path=args.checkpoint,
+        limit=args.limit,
+        one_shot=args.one_shot or engine.ONE_SHOT_ANALYSIS
+    )
+    print(json.dumps(stats, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import io
+import random
+
+import docx
+
+from resume_extract import DOCX_MIME, PDF_MIME, TXT_MIME
+
+# Synthetic resume sizes, in pages (about 45 lines of text per page)
+SIZES = {
+    "small": 1,
+    "medium": 10,
+    "large": 60,
+}
+LINES_PER_PAGE = 45
+
+TECHNOLOGIES = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "SQL", "React", "Django", "Flask",
+    "FastAPI", "Spring", "Node.js", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Docker",
+    "Kubernetes", "AWS", "GCP", "Azure",
+]
+VERBS = ["Built", "Designed", "Maintained", "Migrated", "Optimized", "Led", "Deployed", "Automated"]
+OBJECTS = [
+    "a billing service", "the data pipeline", "an internal dashboard", "the search backend",
+    "a payments API", "CI/CD workflows", "the reporting system", "customer-facing microservices",
+]
+FILLER = [
+    "collaborated with product and design teams", "mentored junior engineers", "improved test coverage",
+    "reduced latency by a third", "handled on-call rotations", "wrote technical documentation",
+]
+
+
+# Plain-text lines of a synthetic resume; the same seed always gives the same resume
+def resume_lines(pages, seed=0, name="Jordan Example"):
+    rng = random.Random(seed)
+    techs = rng.sample(TECHNOLOGIES, 6)
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{seed}@example.com | +1 555 {seed % 1000:03d} {rng.randint(1000, 9999)} | Berlin, Germany",
+        "",
+        "SUMMARY",
+        f"Software engineer with {rng.randint(1, 15)} years of experience building backend systems.",
+        "",
+        "SKILLS",
+        ", ".join(techs),
+        "",
+        "EXPERIENCE",
+    ]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(
+            f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(techs)} and {rng.choice(techs)}; "
+            f"{rng.choice(FILLER)}."
+        )
+    return lines
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+# Minimal single-font PDF with one text stream per page (enough for PyPDF2 text extraction)
+def build_pdf(lines):
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page_lines in pages:
+        text = "".join(f"({_pdf_escape(line)}) '\n" for line in page_lines)
+        stream = f"BT /F1 9 Tf 12 TL 40 800 Td\n{text}ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1', 'replace'))} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+def build_docx(lines):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+def build_txt(lines):
+    return "\n".join(lines).encode("utf-8")
+
+
+BUILDERS = {
+    "pdf": (PDF_MIME, build_pdf),
+    "docx": (DOCX_MIME, build_docx),
+    "txt": (TXT_MIME, build_txt),
+}
+
+
+# In-memory stand-in for Streamlit's UploadedFile
+class MemoryFile:
+    def __init__(self, name, file_type, data):
+        self.name = name
+        self.type = file_type
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+# One synthetic resume file of the given format ("pdf", "docx", "txt") and size ("small", "medium", "large")
+def make_resume(fmt, size, seed=0, name="Jordan Example"):
+    file_type, builder = BUILDERS[fmt]
+    return MemoryFile(f"resume_{size}_{seed}.{fmt}", file_type, builder(resume_lines(SIZES[size], seed, name)))
+
+# Every format at every size: {"pdf-small": MemoryFile, ...}
+def build_corpus(seed=0):
+    return {f"{fmt}-{size}": make_resume(fmt, size, seed) for fmt in BUILDERS for size in SIZES}
@@ -0,0 +1,329 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Latency increases smaller than this are treated as timer noise, whatever the relative change
+NOISE_FLOOR_MS = 0.5
+# Per-process measurements that don't depend on CPU speed, so they are compared as recorded
+MACHINE_INDEPENDENT = ("peak_memory_mb", "count", "interviews", "messages", "file_bytes", "text_chars")
+
+# Scripted candidate replies, in stage order; the tech stack is confirmed from the resume.
+# Contact details differ per interview ({seed}), so duplicate detection treats every run as a new candidate.
+INTERVIEW_INPUTS = [
+    "Jordan Example",
+    "jordan.{seed}@example.com",
+    "+1 555 {seed:07d}",
+    "6 years",
+    "Backend Engineer",
+    "Berlin",
+]
+ANSWER = "I would start by measuring, then look at the data model and the hot paths before changing anything."
+CONCLUSION_QUESTION = "When will I hear back about the next steps?"
+
+
+# Point every store, cache and log at a scratch directory and select the offline model backend.
+# Must run before the app modules are imported, since they read their configuration at import time.
+def configure_environment(workdir, latency):
+    os.environ.update({
+        "LLM_BACKEND": "stub",
+        "LLM_STUB_LATENCY": str(latency),
+        "STREAM_RESPONSES": "true",
+        "ONE_SHOT_ANALYSIS": "false",
+        "RESUME_CACHE_DIR": os.path.join(workdir, "cache"),
+        "QUESTION_BANK_PATH": os.path.join(workdir, "question_bank.json"),
+        "CANDIDATE_DB_PATH": os.path.join(workdir, "candidates.db"),
+        "SEARCH_INDEX_DIR": os.path.join(workdir, "search_index"),
+        "METRICS_LOG_PATH": os.path.join(workdir, "metrics.jsonl"),
+        "METRICS_PORT": "0",
+    })
+
+
+def _consume(reply):
+    return reply if isinstance(reply, str) else "".join(reply)
+
+def _summarize(samples):
+    from metrics import percentile
+
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+# Drive one interview from greeting to conclusion through the engine, appending per-stage wall times (seconds) to timings
+def run_interview(engine, seed, timings):
+    from benchmarks.corpus import make_resume
+
+    session = engine.new_session()
+
+    def send(user_input):
+        stage = session.current_stage
+        start = time.perf_counter()
+        _, reply = engine.step(session, user_input)
+        _consume(reply)
+        timings[stage].append(time.perf_counter() - start)
+
+    for user_input in INTERVIEW_INPUTS:
+        send(user_input.format(seed=seed))
+
+    # Same call as the sidebar upload handler; each interview gets a distinct resume so caches miss
+    start = time.perf_counter()
+    engine.upload_resume(session, make_resume("txt", "small", seed=seed))
+    timings["resume_upload_processing"].append(time.perf_counter() - start)
+
+    send("Done, uploaded it")
+    send("yes")
+    while session.current_stage == "ask_questions":
+        send(ANSWER)
+    send(CONCLUSION_QUESTION)
+    engine.end_session(session)
+
+
+# Complete interviews per second plus per-stage latency
+def bench_interviews(engine, count, seed_offset=0):
+    timings = defaultdict(list)
+    run_interview(engine, seed_offset, defaultdict(list))  # warm-up: imports, pools, connections
+    gc.collect()
+    start = time.perf_counter()
+    for i in range(count):
+        run_interview(engine, seed_offset + i + 1, timings)
+    elapsed = time.perf_counter() - start
+    return {
+        "interviews": count,
+        "seconds": round(elapsed, 3),
+        "interviews_per_sec": round(count / elapsed, 3),
+        "stages": {stage: _summarize(samples) for stage, samples in sorted(timings.items())},
+    }
+
+# Extraction latency and throughput for every synthetic resume format and size
+def bench_extraction(engine, repeat):
+    from benchmarks.corpus import build_corpus
+
+    results = {}
+    for name, resume in build_corpus().items():
+        engine.extract_resume_text(resume)  # warm-up
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = engine.extract_resume_text(resume)
+            samples.append(time.perf_counter() - start)
+        summary = _summarize(samples)
+        summary["file_bytes"] = len(resume.getvalue())
+        summary["text_chars"] = len(text)
+        summary["mb_per_sec"] = round(len(resume.getvalue()) / statistics.median(samples) / 1e6, 3)
+        results[name] = summary
+    return results
+
+# Routing cost per message, without model or store calls: the exit-intent check and stage table lookup for a
+# scripted interview's messages, plus the contact validators. Best of `rounds` runs, in microseconds per message.
+def bench_dispatch(engine, iterations=2000, rounds=5):
+    stages = ["greeting"] + ["collecting_info"] * 5 + ["tech_stack"] + ["ask_questions"] * 5 + ["conclusion"]
+    messages = [text.format(seed=0) for text in INTERVIEW_INPUTS] + ["Python, SQL"] + [ANSWER] * 5 + [CONCLUSION_QUESTION]
+    samples = list(zip(stages, messages))
+    email, phone = messages[1], messages[2]
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for stage, text in samples:
+                engine.wants_to_exit(text)
+                engine.STAGES[stage]
+            engine.validate_email(email)
+            engine.validate_phone(phone)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "messages": len(samples),
+        "per_message_us": round(best / (iterations * len(samples)) * 1e6, 3),
+    }
+
+# Wall time (ms) of a fixed pure-Python workload (JSON, regex and dict work like the app's hot paths), best of
+# `rounds`. Timings are compared relative to it, so a baseline recorded on a faster or busier machine still applies.
+def calibrate(rounds=7):
+    payload = {"answers": [{"question": f"Question {i}?", "answer": ANSWER, "score": i % 5} for i in range(50)]}
+    word = re.compile(r"\w+")
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(40):
+            decoded = json.loads(json.dumps(payload))
+            counts = defaultdict(int)
+            for item in decoded["answers"]:
+                for token in word.findall(item["answer"].lower()):
+                    counts[token] += 1
+            sorted(counts.items(), key=lambda item: item[1])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 3)
+
+# Median of every numeric field across repeated result dicts of the same shape
+def median_results(runs):
+    first = runs[0]
+    if isinstance(first, dict):
+        return {key: median_results([run[key] for run in runs]) for key in first}
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        value = statistics.median(runs)
+        return value if isinstance(first, int) and value == int(value) else round(value, 3)
+    return first
+
+# Peak traced Python memory (MB) while running fn
+def peak_memory_mb(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1e6, 3)
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="talentscout-bench-")
+    configure_environment(workdir, args.latency)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        import interview_engine as engine
+        from benchmarks.corpus import build_corpus
+
+        # Each suite runs `runs` times and every figure is the median across runs, which smooths out
+        # one-off stalls (GC, other processes) that a single run would report as a regression
+        results = {
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "stub_latency": args.latency,
+                "runs": args.runs,
+                "calibration_ms": calibrate(),
+            },
+            "interview": median_results([
+                bench_interviews(engine, args.interviews, seed_offset=run * 10 ** 4) for run in range(args.runs)
+            ]),
+            "extraction": median_results([bench_extraction(engine, args.repeat) for _ in range(args.runs)]),
+            "dispatch": median_results([bench_dispatch(engine) for _ in range(args.runs)]),
+        }
+        # Calibrate again at the end and keep the faster figure, in case the machine was busy at the start
+        results["environment"]["calibration_ms"] = min(results["environment"]["calibration_ms"], calibrate())
+        results["interview"]["peak_memory_mb"] = peak_memory_mb(
+            lambda: run_interview(engine, 10 ** 6, defaultdict(list))
+        )
+        corpus = build_corpus()
+        for name, resume in corpus.items():
+            results["extraction"][name]["peak_memory_mb"] = peak_memory_mb(lambda: engine.extract_resume_text(resume))
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# Compare against a baseline: latencies (and memory) may grow, and throughputs drop, by at most tolerance.
+# Timings are first scaled by the ratio of the two calibration runs, so only slowdowns relative to the machine count.
+# Returns a list of (metric, baseline, current, change) for every regression, with current in baseline-machine units.
+def compare(results, baseline, tolerance):
+    base_calibration = baseline.get("environment", {}).get("calibration_ms")
+    calibration = results.get("environment", {}).get("calibration_ms")
+    speed = base_calibration / calibration if base_calibration and calibration else 1.0
+    checks = []
+    interview, base_interview = results["interview"], baseline.get("interview", {})
+    checks.append(("interview.interviews_per_sec", base_interview.get("interviews_per_sec"), interview["interviews_per_sec"], False))
+    checks.append(("interview.peak_memory_mb", base_interview.get("peak_memory_mb"), interview["peak_memory_mb"], True))
+    for stage, stats in interview["stages"].items():
+        base = base_interview.get("stages", {}).get(stage, {})
+        checks.append((f"interview.stages.{stage}.p95_ms", base.get("p95_ms"), stats["p95_ms"], True))
+    for name, stats in results["extraction"].items():
+        base = baseline.get("extraction", {}).get(name, {})
+        checks.append((f"extraction.{name}.p50_ms", base.get("p50_ms"), stats["p50_ms"], True))
+        checks.append((f"extraction.{name}.peak_memory_mb", base.get("peak_memory_mb"), stats["peak_memory_mb"], True))
+    if "dispatch" in results:
+        checks.append(("dispatch.per_message_us", baseline.get("dispatch", {}).get("per_message_us"), results["dispatch"]["per_message_us"], True))
+
+    regressions = []
+    for metric, base, current, lower_is_better in checks:
+        if not base:
+            continue
+        if not metric.endswith(MACHINE_INDEPENDENT):
+            # Latencies shrink and throughputs grow on a faster machine
+            current = round(current * speed if lower_is_better else current / speed, 3)
+        if metric.endswith("_ms") and current - base < NOISE_FLOOR_MS:
+            continue
+        change = (current - base) / base
+        if (change > tolerance) if lower_is_better else (change < -tolerance):
+            regressions.append((metric, base, current, change))
+    return regressions
+
+
+def print_report(results):
+    interview = results["interview"]
+    print(f"Interviews: {interview['interviews']} in {interview['seconds']}s "
+          f"({interview['interviews_per_sec']} interviews/sec, peak {interview['peak_memory_mb']} MB)")
+    print(f"Median of {results['environment']['runs']} run(s); "
+          f"calibration loop {results['environment']['calibration_ms']} ms")
+    print(f"{'stage':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for stage, stats in interview["stages"].items():
+        print(f"{stage:<28}{stats['count']:>7}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['mean_ms']:>10}")
+    print()
+    print(f"{'extraction':<28}{'bytes':>9}{'p50 ms':>10}{'p95 ms':>10}{'MB/s':>9}{'peak MB':>9}")
+    for name, stats in results["extraction"].items():
+        print(f"{name:<28}{stats['file_bytes']:>9}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+              f"{stats['mb_per_sec']:>9}{stats['peak_memory_mb']:>9}")
+    if "dispatch" in results:
+        dispatch = results["dispatch"]
+        print(f"\nDispatch: {dispatch['per_message_us']} us per message (exit check, stage lookup, validators)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the interview pipeline with an offline model backend.")
+    parser.add_argument("--interviews", type=int, default=50, help="Interviews to run for throughput and stage latency")
+    parser.add_argument("--repeat", type=int, default=10, help="Extraction runs per corpus file")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated model latency in seconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--runs", type=int, default=3, help="Repeat every suite this many times and report medians")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative regression before failing")
+    parser.add_argument("--output", default=None, help="Also write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    scale = (f"timings scaled by calibration {baseline.get('environment', {}).get('calibration_ms')} -> "
+             f"{results['environment']['calibration_ms']} ms")
+    if not regressions:
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}, {scale})")
+        return
+    print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}, {scale}):")
+    for metric, base, current, change in regressions:
+        print(f"  {metric}: {base} -> {current} ({change:+.0%})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+# Archive layout and compression (override with environment variables)
+ARCHIVE_PATH = os.getenv("CANDIDATE_ARCHIVE_PATH", os.path.join("data", "candidates.archive"))
+ARCHIVE_CHUNK_RECORDS = int(os.getenv("ARCHIVE_CHUNK_RECORDS", "32"))  # records compressed together
+ARCHIVE_COMPRESSION_LEVEL = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "9"))
+ARCHIVE_TEXT_CACHE = 64  # decompressed texts kept by a reader
+
+# Large, repetitive fields stored once per distinct content (also inside "previous_applications")
+EXTERNAL_FIELDS = ("resume_text", "conversation_history")
+# Smaller values stay inline; a reference would cost more than it saves
+MIN_EXTERNAL_BYTES = 256
+
+# File layout: MAGIC, then frames of (kind, payload length, payload), then the index frame and the trailer.
+#   T: a 16-byte content hash followed by the compressed JSON of one deduplicated text
+#   R: a compressed JSON list of [record_id, record] for up to ARCHIVE_CHUNK_RECORDS records, texts replaced by {"$text": hash}.
+#      Keys in the records that start with "$" are escaped with one more "$", so record data can't look like a reference.
+#   I: a compressed JSON index: {"records": {record_id: [chunk offset, position]}, "texts": {hash: offset}}
+# Texts are always written before the chunk that references them, so an archive can be streamed front to back.
+MAGIC = b"TSARCH1\n"
+END_MAGIC = b"TSARCEND"
+_FRAME = struct.Struct("<cI")
+_TRAILER = struct.Struct("<Q8s")
+TEXT, CHUNK, INDEX = b"T", b"R", b"I"
+DIGEST_BYTES = 16
+
+
+class ArchiveFormatError(Exception):
+    pass
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+# Replace external fields anywhere in the value with references; new_text(data) stores a text and returns its hash
+def _externalize(value, new_text):
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            stored_key = "$" + key if key.startswith("$") else key
+            if key in EXTERNAL_FIELDS:
+                data = _encode(item)
+                if len(data) >= MIN_EXTERNAL_BYTES:
+                    result[stored_key] = {"$text": new_text(data)}
+                    continue
+            result[stored_key] = _externalize(item, new_text)
+        return result
+    if isinstance(value, list):
+        return [_externalize(item, new_text) for item in value]
+    return value
+
+# Inverse of _externalize; load_text(hash) returns the stored value
+def _resolve(value, load_text):
+    if isinstance(value, dict):
+        if len(value) == 1 and "$text" in value:
+            return load_text(value["$text"])
+        return {key[1:] if key.startswith("$$") else key: _resolve(item, load_text) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, load_text) for item in value]
+    return value
+
+
+# Writes a new archive. The file appears at path only when close() succeeds (written to path.tmp until then).
+class ArchiveWriter:
+    def __init__(self, path=ARCHIVE_PATH, chunk_records=ARCHIVE_CHUNK_RECORDS, level=ARCHIVE_COMPRESSION_LEVEL):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.level = level
+        self._tmp_path = path + ".tmp"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(MAGIC)
+        self._records = {}
+        self._texts = {}
+        self._chunk = []
+        self.stats = {"records": 0, "texts": 0, "deduplicated_texts": 0, "input_bytes": 0}
+
+    def _write_frame(self, kind, payload):
+        offset = self._file.tell()
+        self._file.write(_FRAME.pack(kind, len(payload)))
+        self._file.write(payload)
+        return offset
+
+    def _add_text(self, data):
+        digest = hashlib.blake2b(data, digest_size=DIGEST_BYTES).digest()
+        key = digest.hex()
+        if key in self._texts:
+            self.stats["deduplicated_texts"] += 1
+        else:
+            self._texts[key] = self._write_frame(TEXT, digest + zlib.compress(data, self.level))
+            self.stats["texts"] += 1
+        return key
+
+    def add(self, record_id, record):
+        record_id = str(record_id)
+        if record_id in self._records or any(record_id == queued for queued, _ in self._chunk):
+            raise ValueError(f"Record {record_id} is already in the archive")
+        self.stats["input_bytes"] += len(_encode(record))
+        self._chunk.append((record_id, _externalize(record, self._add_text)))
+        self.stats["records"] += 1
+        if len(self._chunk) >= self.chunk_records:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self._chunk:
+            return
+        offset = self._write_frame(CHUNK, zlib.compress(_encode(self._chunk), self.level))
+        for position, (record_id, _) in enumerate(self._chunk):
+            self._records[record_id] = [offset, position]
+        self._chunk = []
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush_chunk()
+        index_offset = self._write_frame(INDEX, zlib.compress(_encode({"records": self._records, "texts": self._texts}), self.level))
+        self._file.write(_TRAILER.pack(index_offset, END_MAGIC))
+        self.stats["archive_bytes"] = self._file.tell()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    # Discard a partly written archive
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# Reads an archive: get() decompresses only the record's chunk and its texts, and iteration streams
+# the file front to back (without the index, so it also works on an archive whose writer was interrupted)
+class ArchiveReader:
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ArchiveFormatError(f"{path} is not a candidate archive")
+        self._index = None
+        self._chunk_cache = (None, None)  # (offset, records) of the last chunk read
+        self._text_cache = OrderedDict()
+        # Reentrant: rebuilding the index of an unclosed archive scans frames while the lock is held
+        self._lock = threading.RLock()
+
+    def _read_frame(self, offset, expected_kind=None):
+        self._file.seek(offset)
+        header = self._file.read(_FRAME.size)
+        if len(header) < _FRAME.size:
+            return None, None
+        kind, length = _FRAME.unpack(header)
+        payload = self._file.read(length)
+        if len(payload) < length or (expected_kind and kind != expected_kind):
+            raise ArchiveFormatError(f"Corrupt frame at offset {offset} in {self.path}")
+        return kind, payload
+
+    # JSON value of a compressed frame payload
+    def _decode(self, payload, offset):
+        try:
+            return json.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError):
+            raise ArchiveFormatError(f"Corrupt frame at offset {offset} in {self.path}")
+
+    # The index from the trailer, or rebuilt by scanning the frames if the archive was not closed properly
+    # (or its index is damaged). A scan stops at the first damaged frame and keeps everything before it.
+    def _load_index(self):
+        if self._index is None:
+            self._file.seek(0, os.SEEK_END)
+            size = self._file.tell()
+            index = None
+            if size >= len(MAGIC) + _TRAILER.size:
+                self._file.seek(size - _TRAILER.size)
+                index_offset, end = _TRAILER.unpack(self._file.read(_TRAILER.size))
+                if end == END_MAGIC and len(MAGIC) <= index_offset < size - _TRAILER.size:
+                    try:
+                        index = self._decode(self._read_frame(index_offset, INDEX)[1], index_offset)
+                    except ArchiveFormatError:
+                        index = None
+            if index is None:
+                index = {"records": {}, "texts": {}}
+                for kind, offset, payload in self._scan():
+                    if kind == TEXT:
+                        index["texts"][payload[:DIGEST_BYTES].hex()] = offset
+                    elif kind == CHUNK:
+                        try:
+                            chunk = self._decode(payload, offset)
+                        except ArchiveFormatError:
+                            break
+                        for position, (record_id, _) in enumerate(chunk):
+                            index["records"][record_id] = [offset, position]
+            self._index = index
+        return self._index
+
+    # (kind, offset, payload) for every frame before the index; stops quietly at a truncated frame
+    def _scan(self):
+        offset = len(MAGIC)
+        while True:
+            with self._lock:
+                try:
+                    kind, payload = self._read_frame(offset)
+                except ArchiveFormatError:
+                    return
+            if kind is None or kind == INDEX:
+                return
+            yield kind, offset, payload
+            offset += _FRAME.size + len(payload)
+
+    def _load_text(self, key, offsets=None):
+        with self._lock:
+            if key in self._text_cache:
+                self._text_cache.move_to_end(key)
+                return self._text_cache[key]
+            offset = (offsets if offsets is not None else self._load_index()["texts"]).get(key)
+            if offset is None:
+                raise ArchiveFormatError(f"Missing text {key} in {self.path}")
+            payload = self._read_frame(offset, TEXT)[1]
+            value = self._decode(payload[DIGEST_BYTES:], offset)
+            self._text_cache[key] = value
+            if len(self._text_cache) > ARCHIVE_TEXT_CACHE:
+                self._text_cache.popitem(last=False)
+            return value
+
+    # One record by id (with its texts unless resolve=False), or None
+    def get(self, record_id, resolve=True):
+        with self._lock:
+            location = self._load_index()["records"].get(str(record_id))
+            if location is None:
+                return None
+            offset, position = location
+            if self._chunk_cache[0] != offset:
+                self._chunk_cache = (offset, self._decode(self._read_frame(offset, CHUNK)[1], offset))
+            record = self._chunk_cache[1][position][1]
+        return _resolve(record, self._load_text) if resolve else record
+
+    # Stream (record_id, record) in archive order, holding one chunk in memory at a time.
+    # With resolve=False, records are returned as stored: texts stay as {"$text": hash} references and are never
+    # decompressed, and keys starting with "$" keep their escaping "$".
+    def iter_records(self, resolve=True):
+        offsets = {}
+        for kind, offset, payload in self._scan():
+            if kind == TEXT:
+                offsets[payload[:DIGEST_BYTES].hex()] = offset
+            elif kind == CHUNK:
+                for record_id, record in self._decode(payload, offset):
+                    if resolve:
+                        record = _resolve(record, lambda key: self._load_text(key, offsets))
+                    yield record_id, record
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load_index()["records"])
+
+    def record_ids(self):
+        with self._lock:
+            return list(self._load_index()["records"])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Archive legacy data/candidate_*.json files (record id: the file name without .json); returns the writer stats
+def convert_json_files(data_dir="data", path=ARCHIVE_PATH):
+    names = sorted(
+        name for name in os.listdir(data_dir)
+        if name.startswith("candidate_") and name.endswith(".json")
+    )
+    with ArchiveWriter(path) as writer:
+        for name in names:
+            try:
+                with open(os.path.join(data_dir, name), "r") as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {name}: {str(e)}")
+                continue
+            writer.add(name[:-len(".json")], record)
+    return writer.stats
+
+# Archive every record in the candidate store (record id: the candidate id); returns the writer stats
+def export_candidate_store(path=ARCHIVE_PATH):
+    from candidate_store import get_candidate_store
+
+    with ArchiveWriter(path) as writer:
+        for candidate_id, record in get_candidate_store().iter_records():
+            writer.add(candidate_id, record)
+    return writer.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write and read compressed candidate archives.")
+    parser.add_argument("--archive", default=ARCHIVE_PATH, help=f"Archive file (default: {ARCHIVE_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Archive legacy candidate_*.json files")
+    convert_parser.add_argument("data_dir", nargs="?", default="data")
+    subparsers.add_parser("export", help="Archive every record in the candidate store")
+
+    get_parser = subparsers.add_parser("get", help="Print one record")
+    get_parser.add_argument("record_id")
+
+    dump_parser = subparsers.add_parser("dump", help="Stream every record as JSON lines")
+    dump_parser.add_argument("--no-text", action="store_true", help="Leave resume texts and transcripts as references")
+    subparsers.add_parser("count", help="Number of archived records")
+
+    args = parser.parse_args()
+    if args.command in ("convert", "export"):
+        if args.command == "convert":
+            stats = convert_json_files(args.data_dir, args.archive)
+        else:
+            stats = export_candidate_store(args.archive)
+        print(json.dumps(stats, indent=4))
+        return
+
+    with ArchiveReader(args.archive) as reader:
+        if args.command == "get":
+            record = reader.get(args.record_id)
+            if record is None:
+                print(f"No record {args.record_id} in {args.archive}")
+            else:
+                print(json.dumps(record, indent=4))
+        elif args.command == "dump":
+            for record_id, record in reader.iter_records(resolve=not args.no_text):
+                print(json.dumps({"record_id": record_id, "record": record}, ensure_ascii=False))
+        elif args.command == "count":
+            print(len(reader))
+
+
+if __name__ == "__main__":
+    main()
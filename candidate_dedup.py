@@ -0,0 +1,106 @@
+import functools
+import hashlib
+import os
+import random
+import re
+import struct
+
+from tech_normalize import normalize_tech_stack
+
+# Near-duplicate detection (override with environment variables)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Estimated Jaccard similarity of resume shingles above which two resumes belong to the same person
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+# MinHash signature of NUM_HASHES values, split into BANDS bands of ROWS_PER_BAND for LSH.
+# Two resumes with similarity s share a bucket with probability 1 - (1 - s^8)^16: about 0.01 at s=0.4, 0.95 at s=0.8.
+# Changing these invalidates stored signatures (rebuild with `python candidate_store.py dedup-index`).
+NUM_HASHES = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+SHINGLE_WORDS = 4
+# Only the start of very long resumes is signed; edits between applications are almost always visible there
+SIGNATURE_MAX_CHARS = 30000
+MIN_SHINGLES = 10
+
+_SIGNATURE = struct.Struct(f"<{NUM_HASHES}Q")
+# Fixed seed: signatures must be comparable across processes and restarts
+_masks = [random.Random(20240611 + i).getrandbits(64) for i in range(NUM_HASHES)]
+_word = re.compile(r"[a-z0-9][a-z0-9+#.@]*")
+_non_digits = re.compile(r"[^0-9]")
+
+
+def normalize_email(email):
+    return str(email or "").strip().lower()
+
+# Digits only, without country code or trunk prefix (the last 10 digits)
+def normalize_phone(phone):
+    digits = _non_digits.sub("", str(phone or ""))
+    return digits[-10:] if len(digits) >= 7 else ""
+
+# 64-bit hashes of the overlapping SHINGLE_WORDS-word sequences in the text
+def shingles(text):
+    words = _word.findall(str(text or "")[:SIGNATURE_MAX_CHARS].lower())
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"), digest_size=8).digest(), "little")
+        for i in range(max(0, len(words) - SHINGLE_WORDS + 1))
+    }
+
+# MinHash signature of a resume, or None if it is too short to compare reliably.
+# Each hash function is the shingle hash XORed with a fixed random mask (a permutation of 64-bit values).
+# Memoized: the same text is signed at upload, when saving and when indexing.
+@functools.lru_cache(maxsize=64)
+def resume_signature(text):
+    hashes = list(shingles(text))
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return tuple(min(map(mask.__xor__, hashes)) for mask in _masks)
+
+def signature_to_bytes(signature):
+    return _SIGNATURE.pack(*signature)
+
+def signature_from_bytes(data):
+    return _SIGNATURE.unpack(data)
+
+# (band, bucket) pairs for LSH lookup; buckets are signed 64-bit so they fit SQLite integers
+def lsh_buckets(signature):
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f"<{ROWS_PER_BAND}Q", *rows), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+    return buckets
+
+# Estimated Jaccard similarity of the two resumes' shingle sets
+def similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+
+# Merge a new application into a known candidate's record: the newest details win, tech stacks are combined,
+# and the earlier record (without its resume text) is kept under "previous_applications"
+def merge_records(existing, new):
+    old_info = existing.get("candidate_info", {})
+    new_info = new.get("candidate_info", {})
+    info = dict(old_info)
+    info.update({key: value for key, value in new_info.items() if value})
+    info["tech_stack"] = normalize_tech_stack(list(old_info.get("tech_stack") or []) + list(new_info.get("tech_stack") or []))
+
+    previous = {key: value for key, value in existing.items() if key != "previous_applications"}
+    previous["candidate_info"] = {key: value for key, value in old_info.items() if key != "resume_text"}
+    merged = dict(new)
+    merged["candidate_info"] = info
+    merged["previous_applications"] = list(existing.get("previous_applications") or []) + [previous]
+    return merged
+
+# Resume analysis (the analyze_resume schema) recovered from a stored candidate record
+def resume_data_from_record(record):
+    info = record.get("candidate_info", {})
+    return {
+        "name": info.get("name", ""),
+        "email": info.get("email", ""),
+        "phone": info.get("phone", ""),
+        "experience": info.get("experience", ""),
+        "position": info.get("desired_position", ""),
+        "location": info.get("location", ""),
+        "tech_stack": list(info.get("tech_stack") or []),
+    }
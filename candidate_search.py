@@ -0,0 +1,483 @@
+import argparse
+import contextlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import uuid
+from collections import Counter, defaultdict
+
+from tech_normalize import ALIAS_LOOKUP, canonical_tech
+
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", os.path.join("data", "search_index"))
+MAX_SEGMENTS = int(os.getenv("SEARCH_MAX_SEGMENTS", "8"))
+
+# BM25 parameters; skills count several times towards term frequency so skill matches rank first
+BM25_K1 = 1.2
+BM25_B = 0.75
+SKILL_BOOST = 3
+
+_token = re.compile(r'[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*')
+
+# Segment file layout (little-endian):
+#   header    magic, version, doc count, term count, total doc length
+#   doc ids   32 ASCII bytes per doc
+#   doc lens  uint32 per doc
+#   exp       float32 per doc (NaN when unknown)
+#   loc table (offset uint64, length uint32) per doc, into the string blob
+#   terms     (offset uint64, length uint32, postings offset uint64, doc frequency uint32) per term, sorted
+#   blob      term and location strings
+#   postings  (doc index uint32, term frequency uint16) per posting
+MAGIC = b"TSIX"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQ")
+LOC_ENTRY = struct.Struct("<QI")
+TERM_ENTRY = struct.Struct("<QIQI")
+POSTING = struct.Struct("<IH")
+ID_BYTES = 32
+
+
+# Lowercase word tokens; keeps technology names like c++, c#, node.js and ci-cd intact
+def tokenize(text):
+    return _token.findall(str(text or "").lower())
+
+# Query tokens, with exact technology aliases mapped to their canonical names ("js" -> "javascript")
+def tokenize_query(text):
+    tokens = []
+    for token in tokenize(text):
+        canonical = ALIAS_LOOKUP.get(token)
+        tokens.extend(tokenize(canonical) if canonical else [token])
+    return tokens
+
+# Text, skills and filter fields for one candidate record
+def candidate_document(record):
+    info = record.get("candidate_info", {})
+    answered = record.get("answers") or []
+    tokens = tokenize(info.get("resume_text", ""))
+    tokens += tokenize(" ".join(f"{q.get('question', '')} {q.get('answer') or ''}" for q in answered))
+    for skill in info.get("tech_stack") or []:
+        tokens += tokenize(canonical_tech(skill)) * SKILL_BOOST
+    years = re.search(r'\d+(?:\.\d+)?', str(info.get("experience") or ""))
+    return {
+        "terms": Counter(tokens),
+        "length": len(tokens),
+        "location": " ".join(str(info.get("location") or "").lower().split()),
+        "experience": float(years.group()) if years else float("nan"),
+    }
+
+
+# Write one immutable segment file from {candidate_id: document}
+def write_segment(path, documents):
+    ids = list(documents)
+    postings = defaultdict(list)
+    for doc_index, candidate_id in enumerate(ids):
+        for term, tf in documents[candidate_id]["terms"].items():
+            postings[term].append((doc_index, min(tf, 0xFFFF)))
+    terms = sorted(postings, key=lambda term: term.encode("utf-8"))
+
+    blob = bytearray()
+    loc_table = bytearray()
+    for candidate_id in ids:
+        loc = documents[candidate_id]["location"].encode("utf-8")
+        loc_table += LOC_ENTRY.pack(len(blob), len(loc))
+        blob += loc
+
+    term_table = bytearray()
+    posting_bytes = bytearray()
+    for term in terms:
+        encoded = term.encode("utf-8")
+        term_table += TERM_ENTRY.pack(len(blob), len(encoded), len(posting_bytes), len(postings[term]))
+        blob += encoded
+        for doc_index, tf in postings[term]:
+            posting_bytes += POSTING.pack(doc_index, tf)
+
+    total_length = sum(documents[candidate_id]["length"] for candidate_id in ids)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(ids), len(terms), total_length))
+        f.write(b"".join(candidate_id.encode("ascii")[:ID_BYTES].ljust(ID_BYTES) for candidate_id in ids))
+        f.write(struct.pack(f"<{len(ids)}I", *(documents[c]["length"] for c in ids)))
+        f.write(struct.pack(f"<{len(ids)}f", *(documents[c]["experience"] for c in ids)))
+        f.write(loc_table)
+        f.write(term_table)
+        f.write(blob)
+        f.write(posting_bytes)
+    os.replace(tmp_path, path)
+
+
+# Read-only, memory-mapped view of a segment; opening it only parses the fixed-size header
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is an empty search index segment")
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a search index segment")
+        magic, version, self.doc_count, self.term_count, self.total_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a search index segment")
+        n = self.doc_count
+        self._ids_at = HEADER.size
+        self._lens_at = self._ids_at + n * ID_BYTES
+        self._exp_at = self._lens_at + n * 4
+        self._locs_at = self._exp_at + n * 4
+        self._terms_at = self._locs_at + n * LOC_ENTRY.size
+        self._blob_at = self._terms_at + self.term_count * TERM_ENTRY.size
+        if self._blob_at > len(self._mm):
+            self.close()
+            raise ValueError(f"{path} is a truncated search index segment")
+        last_blob_end = 0
+        if self.term_count:
+            offset, length, _, _ = self._term_entry(self.term_count - 1)
+            last_blob_end = offset + length
+        elif n:
+            offset, length = LOC_ENTRY.unpack_from(self._mm, self._locs_at + (n - 1) * LOC_ENTRY.size)
+            last_blob_end = offset + length
+        self._postings_at = self._blob_at + last_blob_end
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def doc_id(self, doc_index):
+        start = self._ids_at + doc_index * ID_BYTES
+        return self._mm[start:start + ID_BYTES].decode("ascii").rstrip()
+
+    def doc_length(self, doc_index):
+        return struct.unpack_from("<I", self._mm, self._lens_at + doc_index * 4)[0]
+
+    def experience(self, doc_index):
+        return struct.unpack_from("<f", self._mm, self._exp_at + doc_index * 4)[0]
+
+    def location(self, doc_index):
+        offset, length = LOC_ENTRY.unpack_from(self._mm, self._locs_at + doc_index * LOC_ENTRY.size)
+        start = self._blob_at + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _term_entry(self, i):
+        return TERM_ENTRY.unpack_from(self._mm, self._terms_at + i * TERM_ENTRY.size)
+
+    def _term_bytes(self, i):
+        offset, length, _, _ = self._term_entry(i)
+        start = self._blob_at + offset
+        return self._mm[start:start + length]
+
+    # Binary search over the sorted term table, straight from the mapped file
+    def postings(self, term):
+        target = term.encode("utf-8")
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.term_count or self._term_bytes(lo) != target:
+            return []
+        _, _, postings_offset, df = self._term_entry(lo)
+        start = self._postings_at + postings_offset
+        return list(POSTING.iter_unpack(self._mm[start:start + df * POSTING.size]))
+
+    # All terms with their postings (used when merging segments)
+    def iter_terms(self):
+        for i in range(self.term_count):
+            term = self._term_bytes(i).decode("utf-8")
+            _, _, postings_offset, df = self._term_entry(i)
+            start = self._postings_at + postings_offset
+            yield term, POSTING.iter_unpack(self._mm[start:start + df * POSTING.size])
+
+
+# Segmented inverted index over candidate records with BM25 ranking.
+# Each update is written as a small new segment; segments are merged once there are too many.
+class CandidateSearchIndex:
+    def __init__(self, index_dir=SEARCH_INDEX_DIR, max_segments=MAX_SEGMENTS):
+        self.index_dir = index_dir
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self._segments = {}
+        self._deleted = {}  # candidate id -> segments written before the deletion
+        self._doc_segments = defaultdict(set)  # candidate id -> segments that contain it
+        self._manifest_mtime = None
+        self._file_lock_depth = 0
+        self._file_lock = None
+        os.makedirs(index_dir, exist_ok=True)
+        self._load_manifest()
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.index_dir, "manifest.json")
+
+    # Hold an exclusive lock on the manifest lockfile so other processes can't interleave
+    # their read-modify-replace of the manifest with ours; reentrant within this process
+    @contextlib.contextmanager
+    def _manifest_locked(self):
+        with self._lock:
+            if self._file_lock_depth == 0:
+                self._file_lock = open(os.path.join(self.index_dir, "manifest.lock"), "a")
+                try:
+                    import fcntl
+                    fcntl.flock(self._file_lock.fileno(), fcntl.LOCK_EX)
+                except ImportError:
+                    pass
+            self._file_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._file_lock_depth -= 1
+                if self._file_lock_depth == 0:
+                    # Closing the file releases the lock
+                    self._file_lock.close()
+                    self._file_lock = None
+
+    def _open_segment(self, name):
+        segment = Segment(os.path.join(self.index_dir, name))
+        self._segments[name] = segment
+        for i in range(segment.doc_count):
+            self._doc_segments[segment.doc_id(i)].add(name)
+
+    def _close_segment(self, name):
+        segment = self._segments.pop(name)
+        for i in range(segment.doc_count):
+            candidate_id = segment.doc_id(i)
+            names = self._doc_segments.get(candidate_id)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._doc_segments[candidate_id]
+        segment.close()
+
+    # (Re)open segments listed in the manifest; cheap when nothing changed on disk
+    def _load_manifest(self):
+        try:
+            mtime = os.path.getmtime(self._manifest_path)
+        except OSError:
+            self._manifest_order = []
+            return
+        if mtime == self._manifest_mtime:
+            return
+        with open(self._manifest_path, "r") as f:
+            manifest = json.load(f)
+        names = manifest["segments"]
+        for name in list(self._segments):
+            if name not in names:
+                self._close_segment(name)
+        for name in names:
+            if name not in self._segments:
+                self._open_segment(name)
+        self._manifest_order = names
+        self._deleted = {candidate_id: set(names_before) for candidate_id, names_before in manifest.get("deleted", {}).items()}
+        self._manifest_mtime = mtime
+
+    def _save_manifest(self):
+        manifest = {
+            "segments": self._manifest_order,
+            "deleted": {candidate_id: sorted(names) for candidate_id, names in self._deleted.items()},
+        }
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+        self._manifest_mtime = os.path.getmtime(self._manifest_path)
+
+    def add_candidate(self, candidate_id, record, replace=False):
+        self.add_candidates([(candidate_id, record)], replace=replace)
+
+    # Index candidates as one new segment.
+    # Pass replace=True when the candidates may already be indexed (e.g. their record was updated).
+    def add_candidates(self, items, replace=False):
+        documents = {candidate_id: candidate_document(record) for candidate_id, record in items}
+        if not documents:
+            return
+        with self._manifest_locked():
+            self._load_manifest()
+            if replace:
+                # Older copies of re-indexed candidates are hidden in the segments that already exist
+                for candidate_id in documents:
+                    if self._doc_segments.get(candidate_id):
+                        self._deleted.setdefault(candidate_id, set()).update(self._manifest_order)
+            name = f"segment_{uuid.uuid4().hex}.bin"
+            write_segment(os.path.join(self.index_dir, name), documents)
+            self._open_segment(name)
+            self._manifest_order = self._manifest_order + [name]
+            self._save_manifest()
+            if len(self._manifest_order) > self.max_segments:
+                self.compact()
+
+    def _is_live(self, name, candidate_id):
+        return name not in self._deleted.get(candidate_id, ())
+
+    # Merge every segment into one, dropping deleted documents
+    def compact(self):
+        with self._manifest_locked():
+            self._load_manifest()
+            if len(self._manifest_order) <= 1 and not self._deleted:
+                return
+            documents = {}
+            for name in self._manifest_order:
+                segment = self._segments[name]
+                remap = {}
+                for i in range(segment.doc_count):
+                    candidate_id = segment.doc_id(i)
+                    if self._is_live(name, candidate_id):
+                        remap[i] = candidate_id
+                        documents[candidate_id] = {
+                            "terms": Counter(),
+                            "length": segment.doc_length(i),
+                            "location": segment.location(i),
+                            "experience": segment.experience(i),
+                        }
+                for term, postings in segment.iter_terms():
+                    for doc_index, tf in postings:
+                        if doc_index in remap:
+                            documents[remap[doc_index]]["terms"][term] = tf
+            old_names = self._manifest_order
+            name = f"segment_{uuid.uuid4().hex}.bin"
+            write_segment(os.path.join(self.index_dir, name), documents)
+            self._open_segment(name)
+            self._manifest_order = [name]
+            self._deleted = {}
+            self._save_manifest()
+            for old_name in old_names:
+                self._close_segment(old_name)
+                try:
+                    os.remove(os.path.join(self.index_dir, old_name))
+                except OSError:
+                    pass
+
+    # Ranked keyword/skill search with optional location and experience filters.
+    # Returns [(candidate_id, score)] best first.
+    def search(self, query, location=None, min_experience=None, max_experience=None, limit=20):
+        terms = list(dict.fromkeys(tokenize_query(query)))
+        location = " ".join(str(location or "").lower().split())
+        with self._lock:
+            self._load_manifest()
+            segments = [(name, self._segments[name]) for name in self._manifest_order]
+            doc_count = sum(segment.doc_count for _, segment in segments)
+            if doc_count == 0:
+                return []
+            avg_length = sum(segment.total_length for _, segment in segments) / doc_count
+
+            def allowed(segment, name, doc_index):
+                if not self._is_live(name, segment.doc_id(doc_index)):
+                    return False
+                if min_experience is not None or max_experience is not None:
+                    years = segment.experience(doc_index)
+                    if math.isnan(years):
+                        return False
+                    if min_experience is not None and years < min_experience:
+                        return False
+                    if max_experience is not None and years > max_experience:
+                        return False
+                if location and location not in segment.location(doc_index):
+                    return False
+                return True
+
+            if not terms:
+                # Filter-only query; nothing to rank by, so return a stable order by candidate id
+                matches = set()
+                for name, segment in segments:
+                    for i in range(segment.doc_count):
+                        if allowed(segment, name, i):
+                            matches.add(segment.doc_id(i))
+                return [(candidate_id, 0.0) for candidate_id in heapq.nsmallest(limit, matches)]
+
+            term_postings = {term: [(name, segment, segment.postings(term)) for name, segment in segments] for term in terms}
+            scores = defaultdict(float)
+            checked = {}
+            for term, per_segment in term_postings.items():
+                df = sum(len(postings) for _, _, postings in per_segment)
+                if df == 0:
+                    continue
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for name, segment, postings in per_segment:
+                    for doc_index, tf in postings:
+                        key = (name, doc_index)
+                        if key not in checked:
+                            checked[key] = allowed(segment, name, doc_index)
+                        if not checked[key]:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * segment.doc_length(doc_index) / avg_length)
+                        scores[key] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self._segments[name].doc_id(doc_index), round(score, 4)) for (name, doc_index), score in best]
+
+    # Replace the whole index with the contents of the candidate store
+    def rebuild(self, store, batch_size=5000):
+        with self._manifest_locked():
+            for name in list(self._segments):
+                self._close_segment(name)
+                try:
+                    os.remove(os.path.join(self.index_dir, name))
+                except OSError:
+                    pass
+            self._manifest_order = []
+            self._deleted = {}
+            self._save_manifest()
+            batch = []
+            for candidate_id, record in store.iter_records():
+                batch.append((candidate_id, record))
+                if len(batch) >= batch_size:
+                    self.add_candidates(batch)
+                    batch = []
+            self.add_candidates(batch)
+            self.compact()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+# Process-wide search index
+def get_search_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CandidateSearchIndex()
+    return _index
+
+
+def main():
+    from candidate_store import get_candidate_store
+
+    parser = argparse.ArgumentParser(description="Search interviewed candidates.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = subparsers.add_parser("query", help="Ranked keyword/skill search")
+    query_parser.add_argument("text", help='Keywords or skills, e.g. "python kafka"')
+    query_parser.add_argument("--location", default=None)
+    query_parser.add_argument("--min-experience", type=float, default=None)
+    query_parser.add_argument("--max-experience", type=float, default=None)
+    query_parser.add_argument("--limit", type=int, default=20)
+
+    subparsers.add_parser("rebuild", help="Rebuild the index from the candidate store")
+    subparsers.add_parser("compact", help="Merge index segments")
+
+    args = parser.parse_args()
+    index = get_search_index()
+    store = get_candidate_store()
+    if args.command == "query":
+        for candidate_id, score in index.search(args.text, args.location, args.min_experience, args.max_experience, args.limit):
+            candidate = store.get(candidate_id)
+            if candidate:
+                print(f"{score:8.3f}  {candidate['name']} <{candidate['email']}>  {candidate['location']}  "
+                      f"{candidate['experience_years']} yrs  [{', '.join(store.technologies(candidate_id))}]")
+    elif args.command == "rebuild":
+        index.rebuild(store)
+        print("Search index rebuilt")
+    elif args.command == "compact":
+        index.compact()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from candidate_dedup import (DEDUP_THRESHOLD, lsh_buckets, normalize_email, normalize_phone, resume_signature,
+                             signature_from_bytes, signature_to_bytes, similarity)
+from tech_normalize import canonical_tech, tech_key
+
+CANDIDATE_DB_PATH = os.getenv("CANDIDATE_DB_PATH", os.path.join("data", "candidates.db"))
+IMPORT_BATCH_SIZE = 500
+
+_years = re.compile(r'\d+(?:\.\d+)?')
+_location_word = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    email_normalized TEXT,
+    phone TEXT,
+    experience_years REAL,
+    desired_position TEXT,
+    position_normalized TEXT,
+    location TEXT,
+    location_normalized TEXT,
+    record TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email_normalized);
+CREATE INDEX IF NOT EXISTS idx_candidates_position ON candidates(position_normalized, experience_years);
+CREATE INDEX IF NOT EXISTS idx_candidates_experience ON candidates(experience_years);
+CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at);
+
+CREATE TABLE IF NOT EXISTS candidate_technologies (
+    technology TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (technology, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_technologies_candidate ON candidate_technologies(candidate_id);
+
+-- Words of the normalized location, so location filters are indexed prefix lookups instead of a scan
+CREATE TABLE IF NOT EXISTS candidate_locations (
+    term TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    PRIMARY KEY (term, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_locations_candidate ON candidate_locations(candidate_id);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    candidate_id TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS candidate_contacts (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    candidate_id TEXT NOT NULL,
+    PRIMARY KEY (kind, value, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_contacts_candidate ON candidate_contacts(candidate_id);
+
+CREATE TABLE IF NOT EXISTS resume_signatures (
+    candidate_id TEXT PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS resume_lsh (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    candidate_id TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_resume_lsh_candidate ON resume_lsh(candidate_id);
+
+CREATE TABLE IF NOT EXISTS answer_scores (
+    candidate_id TEXT NOT NULL,
+    rubric_version TEXT NOT NULL,
+    scored_at TEXT NOT NULL,
+    average_score REAL,
+    PRIMARY KEY (candidate_id, rubric_version)
+) WITHOUT ROWID;
+"""
+
+
+# Parse free-text experience (e.g. "5+ years") into a number of years
+def parse_experience_years(experience):
+    match = _years.search(str(experience or ""))
+    return float(match.group()) if match else None
+
+def _normalize_text(value):
+    return " ".join(str(value or "").lower().split())
+
+# Distinct words of a location ("Berlin, Germany" -> {"berlin", "germany"})
+def location_terms(location):
+    return set(_location_word.findall(_normalize_text(location)))
+
+
+# SQLite-backed candidate store with one connection per thread (WAL mode, so readers never block the writer)
+class CandidateStore:
+    def __init__(self, path=CANDIDATE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection().executescript(SCHEMA)
+        self._add_revision_column()
+        self._index_locations()
+
+    # Add candidates.revision to stores created before it existed
+    def _add_revision_column(self):
+        conn = self._connection()
+        if "revision" not in [row["name"] for row in conn.execute("PRAGMA table_info(candidates)")]:
+            with conn:
+                conn.execute("ALTER TABLE candidates ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    # Fill candidate_locations for stores created before it existed (a no-op once it has rows)
+    def _index_locations(self):
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM candidate_locations LIMIT 1").fetchone():
+            return
+        rows = conn.execute("SELECT id, location_normalized FROM candidates WHERE location_normalized != ''").fetchall()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO candidate_locations (term, candidate_id) VALUES (?, ?)",
+                [(term, row["id"]) for row in rows for term in location_terms(row["location_normalized"])]
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Indexed column values for a record, in candidates table order (after id and created_at)
+    def _columns(self, record):
+        info = record.get("candidate_info", {})
+        return (
+            info.get("name", ""),
+            info.get("email", ""),
+            _normalize_text(info.get("email")),
+            info.get("phone", ""),
+            parse_experience_years(info.get("experience")),
+            info.get("desired_position", ""),
+            _normalize_text(info.get("desired_position")),
+            info.get("location", ""),
+            _normalize_text(info.get("location")),
+            json.dumps(record, separators=(",", ":")),
+        )
+
+    def _insert(self, conn, record, created_at=None):
+        candidate_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO candidates (id, created_at, name, email, email_normalized, phone, experience_years, "
+            "desired_position, position_normalized, location, location_normalized, record) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (candidate_id, created_at or datetime.now().isoformat(timespec="seconds")) + self._columns(record)
+        )
+        self._index(conn, candidate_id, record)
+        return candidate_id
+
+    # Technology, location, contact and resume-signature index rows for a candidate
+    def _index(self, conn, candidate_id, record):
+        info = record.get("candidate_info", {})
+        technologies = {}
+        for tech in info.get("tech_stack") or []:
+            name = canonical_tech(tech)
+            if name:
+                technologies.setdefault(name.lower(), name)
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidate_technologies (technology, candidate_id, name) VALUES (?, ?, ?)",
+            [(key, candidate_id, name) for key, name in technologies.items()]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidate_locations (term, candidate_id) VALUES (?, ?)",
+            [(term, candidate_id) for term in location_terms(info.get("location"))]
+        )
+        self._index_duplicates(conn, candidate_id, info)
+
+    def _index_duplicates(self, conn, candidate_id, info):
+        contacts = [("email", normalize_email(info.get("email"))), ("phone", normalize_phone(info.get("phone")))]
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidate_contacts (kind, value, candidate_id) VALUES (?, ?, ?)",
+            [(kind, value, candidate_id) for kind, value in contacts if value]
+        )
+        signature = resume_signature(info.get("resume_text", ""))
+        if signature is None:
+            return
+        conn.execute(
+            "INSERT OR REPLACE INTO resume_signatures (candidate_id, signature) VALUES (?, ?)",
+            (candidate_id, signature_to_bytes(signature))
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO resume_lsh (band, bucket, candidate_id) VALUES (?, ?, ?)",
+            [(band, bucket, candidate_id) for band, bucket in lsh_buckets(signature)]
+        )
+
+    def _clear_index(self, conn, candidate_id):
+        for table in ("candidate_technologies", "candidate_locations", "candidate_contacts", "resume_signatures", "resume_lsh"):
+            conn.execute(f"DELETE FROM {table} WHERE candidate_id = ?", (candidate_id,))
+
+    # Add one record in its own transaction; returns the new candidate id
+    def add(self, record):
+        return self.add_many([record])[0]
+
+    # Add several records in a single transaction; returns their ids in order
+    def add_many(self, records):
+        conn = self._connection()
+        with conn:
+            return [self._insert(conn, record) for record in records]
+
+    def get(self, candidate_id):
+        row = self._connection().execute("SELECT * FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        return self._row_to_result(row) if row else None
+
+    # Replace a candidate's record and every index derived from it (e.g. after merging a new application).
+    # Bumps the revision and drops answer scores, so the next scoring run grades the new answers
+    # and a scoring run still working on the old record can't save over it.
+    def replace_record(self, candidate_id, record):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "UPDATE candidates SET name = ?, email = ?, email_normalized = ?, phone = ?, experience_years = ?, "
+                "desired_position = ?, position_normalized = ?, location = ?, location_normalized = ?, record = ?, "
+                "revision = revision + 1 WHERE id = ?",
+                self._columns(record) + (candidate_id,)
+            )
+            self._clear_index(conn, candidate_id)
+            self._index(conn, candidate_id, record)
+            conn.execute("DELETE FROM answer_scores WHERE candidate_id = ?", (candidate_id,))
+
+    # Known candidates matching an applicant: exact normalized email or phone, or a resume whose MinHash
+    # signature is at least `threshold` similar. Uses only indexed lookups (LSH buckets), never a full scan.
+    # Returns [{"candidate_id", "match": "email" | "phone" | "resume", "similarity"}], best match first.
+    def find_duplicates(self, email=None, phone=None, resume_text=None, threshold=DEDUP_THRESHOLD, signature=None):
+        conn = self._connection()
+        matches = {}
+        for kind, value in (("email", normalize_email(email)), ("phone", normalize_phone(phone))):
+            if not value:
+                continue
+            for row in conn.execute(
+                "SELECT candidate_id FROM candidate_contacts WHERE kind = ? AND value = ?", (kind, value)
+            ):
+                matches.setdefault(row["candidate_id"], {"candidate_id": row["candidate_id"], "match": kind, "similarity": None})
+
+        if signature is None and resume_text:
+            signature = resume_signature(resume_text)
+        if signature is not None:
+            buckets = lsh_buckets(signature)
+            rows = conn.execute(
+                "SELECT DISTINCT s.candidate_id, s.signature FROM resume_lsh l "
+                "JOIN resume_signatures s ON s.candidate_id = l.candidate_id WHERE "
+                + " OR ".join("(l.band = ? AND l.bucket = ?)" for _ in buckets),
+                [value for pair in buckets for value in pair]
+            ).fetchall()
+            for row in rows:
+                score = similarity(signature, signature_from_bytes(row["signature"]))
+                if score < threshold:
+                    continue
+                match = matches.setdefault(row["candidate_id"], {"candidate_id": row["candidate_id"], "match": "resume"})
+                match["similarity"] = round(score, 3)
+                match["match"] = "resume"
+
+        # Resume matches first (their analysis can be reused), then by similarity
+        return sorted(matches.values(), key=lambda m: (m["match"] != "resume", -(m["similarity"] or 0)))
+
+    # Index contacts and resume signatures of candidates stored before duplicate detection existed
+    def rebuild_duplicate_index(self, batch_size=500):
+        conn = self._connection()
+        indexed = 0
+        batch = []
+        for candidate_id, record in self.iter_records():
+            batch.append((candidate_id, record.get("candidate_info", {})))
+            if len(batch) >= batch_size:
+                indexed += self._reindex_duplicates(conn, batch)
+                batch = []
+        if batch:
+            indexed += self._reindex_duplicates(conn, batch)
+        return indexed
+
+    def _reindex_duplicates(self, conn, batch):
+        with conn:
+            for candidate_id, info in batch:
+                for table in ("candidate_contacts", "resume_signatures", "resume_lsh"):
+                    conn.execute(f"DELETE FROM {table} WHERE candidate_id = ?", (candidate_id,))
+                self._index_duplicates(conn, candidate_id, info)
+        return len(batch)
+
+    def _row_to_result(self, row):
+        result = {key: row[key] for key in row.keys() if key != "record"}
+        result["record"] = json.loads(row["record"])
+        return result
+
+    # Find candidates by any combination of indexed filters, newest first.
+    # technologies: every listed technology must be in the candidate's stack.
+    # location: every word must start a word of the candidate's location, case-insensitively
+    # (e.g. "berlin" and "germ" both match "Berlin, Germany").
+    def find(self, technologies=None, location=None, min_experience=None, max_experience=None,
+             position=None, email=None, limit=100, include_record=False):
+        joins = []
+        clauses = []
+        params = []
+        for i, tech in enumerate(technologies or []):
+            alias = f"t{i}"
+            joins.append(f"JOIN candidate_technologies {alias} ON {alias}.candidate_id = c.id AND {alias}.technology = ?")
+            params.append(tech_key(tech))
+        if email:
+            clauses.append("c.email_normalized = ?")
+            params.append(_normalize_text(email))
+        if position:
+            clauses.append("c.position_normalized = ?")
+            params.append(_normalize_text(position))
+        if min_experience is not None:
+            clauses.append("c.experience_years >= ?")
+            params.append(min_experience)
+        if max_experience is not None:
+            clauses.append("c.experience_years <= ?")
+            params.append(max_experience)
+        for term in sorted(location_terms(location)):
+            # Prefix range over the candidate_locations primary key
+            clauses.append("c.id IN (SELECT candidate_id FROM candidate_locations WHERE term >= ? AND term < ?)")
+            params.extend([term, term + "\uffff"])
+
+        columns = "c.*" if include_record else "c.id, c.created_at, c.name, c.email, c.phone, c.experience_years, c.desired_position, c.location"
+        sql = f"SELECT {columns} FROM candidates c {' '.join(joins)}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY c.created_at DESC LIMIT ?"
+        params.append(limit)
+
+        rows = self._connection().execute(sql, params).fetchall()
+        if include_record:
+            return [self._row_to_result(row) for row in rows]
+        return [dict(row) for row in rows]
+
+    def technologies(self, candidate_id):
+        rows = self._connection().execute(
+            "SELECT name FROM candidate_technologies WHERE candidate_id = ? ORDER BY technology", (candidate_id,)
+        ).fetchall()
+        return [row["name"] for row in rows]
+
+    # Distinct technology names across all candidates (one display name per normalized technology)
+    def all_technologies(self):
+        rows = self._connection().execute(
+            "SELECT technology, MIN(name) AS name FROM candidate_technologies GROUP BY technology ORDER BY technology"
+        ).fetchall()
+        return [row["name"] for row in rows]
+
+    # Stream every stored record without loading them all into memory
+    def iter_records(self, batch_size=1000):
+        cursor = self._connection().execute("SELECT id, record FROM candidates ORDER BY created_at")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row["id"], json.loads(row["record"])
+
+    # Stream (id, revision, record) for candidates without answer scores for this rubric version, oldest first.
+    # Each batch is read in full before it is yielded, so scores can be saved while iterating.
+    def iter_unscored(self, rubric_version, batch_size=200):
+        last_rowid = 0
+        while True:
+            rows = self._connection().execute(
+                "SELECT c.rowid AS position, c.id, c.revision, c.record FROM candidates c WHERE c.rowid > ? AND NOT EXISTS "
+                "(SELECT 1 FROM answer_scores s WHERE s.candidate_id = c.id AND s.rubric_version = ?) "
+                "ORDER BY c.rowid LIMIT ?",
+                (last_rowid, rubric_version, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1]["position"]
+            for row in rows:
+                yield row["id"], row["revision"], json.loads(row["record"])
+
+    # Store scored records and mark them scored for the rubric version, in one transaction.
+    # scored: [(candidate_id, revision the scores are based on, record or None to keep the stored one, average or None)]
+    # Candidates whose record was replaced since that revision are left untouched; their ids are returned.
+    def save_answer_scores(self, scored, rubric_version):
+        conn = self._connection()
+        scored_at = datetime.now().isoformat(timespec="seconds")
+        stale = []
+        with conn:
+            for candidate_id, revision, record, average in scored:
+                if record is not None:
+                    current = conn.execute(
+                        "UPDATE candidates SET record = ? WHERE id = ? AND revision = ?",
+                        (json.dumps(record, separators=(",", ":")), candidate_id, revision)
+                    ).rowcount
+                else:
+                    current = conn.execute(
+                        "SELECT 1 FROM candidates WHERE id = ? AND revision = ?", (candidate_id, revision)
+                    ).fetchone()
+                if not current:
+                    stale.append(candidate_id)
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO answer_scores (candidate_id, rubric_version, scored_at, average_score) "
+                    "VALUES (?, ?, ?, ?)",
+                    (candidate_id, rubric_version, scored_at, average)
+                )
+        return stale
+
+    # Average answer score from the most recent scoring run, or None if the candidate was never scored
+    def average_answer_score(self, candidate_id):
+        row = self._connection().execute(
+            "SELECT average_score FROM answer_scores WHERE candidate_id = ? ORDER BY scored_at DESC LIMIT 1",
+            (candidate_id,)
+        ).fetchone()
+        return row["average_score"] if row else None
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    # Import legacy data/candidate_<timestamp>.json files; files imported before are skipped
+    def import_json_files(self, data_dir="data"):
+        conn = self._connection()
+        already = {row["path"] for row in conn.execute("SELECT path FROM imported_files")}
+        names = sorted(
+            name for name in os.listdir(data_dir)
+            if name.startswith("candidate_") and name.endswith(".json")
+        )
+        imported = 0
+        batch = []
+        for name in names:
+            path = os.path.abspath(os.path.join(data_dir, name))
+            if path in already:
+                continue
+            try:
+                with open(path, "r") as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {name}: {str(e)}")
+                continue
+            batch.append((path, record, _created_at_from_filename(name, path)))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += self._import_batch(batch)
+                batch = []
+        if batch:
+            imported += self._import_batch(batch)
+        return imported
+
+    def _import_batch(self, batch):
+        conn = self._connection()
+        with conn:
+            for path, record, created_at in batch:
+                candidate_id = self._insert(conn, record, created_at)
+                conn.execute("INSERT INTO imported_files (path, candidate_id) VALUES (?, ?)", (path, candidate_id))
+        return len(batch)
+
+
+# Creation time for a legacy file: the timestamp in its name, or the file's modification time
+def _created_at_from_filename(name, path):
+    try:
+        return datetime.strptime(name[len("candidate_"):-len(".json")], "%Y%m%d_%H%M%S").isoformat(timespec="seconds")
+    except ValueError:
+        return datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+
+
+# Buffers records from many threads and writes them in batched transactions.
+# on_flush, if given, is called with [(candidate_id, record)] after each committed batch.
+class BatchWriter:
+    def __init__(self, store, batch_size=50, on_flush=None):
+        self.store = store
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            ids = self.store.add_many(self._buffer)
+            if self.on_flush:
+                self.on_flush(list(zip(ids, self._buffer)))
+            self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+# Process-wide candidate store
+def get_candidate_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CandidateStore()
+    return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the candidate store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import legacy candidate_*.json files")
+    import_parser.add_argument("data_dir", nargs="?", default="data")
+
+    find_parser = subparsers.add_parser("find", help="Search candidates")
+    find_parser.add_argument("--tech", action="append", default=[], help="Required technology (repeatable)")
+    find_parser.add_argument("--location", default=None)
+    find_parser.add_argument("--min-experience", type=float, default=None)
+    find_parser.add_argument("--position", default=None)
+    find_parser.add_argument("--email", default=None)
+    find_parser.add_argument("--limit", type=int, default=50)
+
+    subparsers.add_parser("count", help="Number of stored candidates")
+    subparsers.add_parser("dedup-index", help="Index contacts and resume signatures for duplicate detection")
+
+    duplicates_parser = subparsers.add_parser("duplicates", help="Known candidates matching a resume, email or phone")
+    duplicates_parser.add_argument("--resume", default=None, help="Path to a plain-text resume")
+    duplicates_parser.add_argument("--email", default=None)
+    duplicates_parser.add_argument("--phone", default=None)
+
+    args = parser.parse_args()
+    store = get_candidate_store()
+    if args.command == "import":
+        print(f"Imported {store.import_json_files(args.data_dir)} candidate files")
+    elif args.command == "find":
+        results = store.find(
+            technologies=args.tech,
+            location=args.location,
+            min_experience=args.min_experience,
+            position=args.position,
+            email=args.email,
+            limit=args.limit
+        )
+        print(json.dumps(results, indent=4))
+    elif args.command == "count":
+        print(store.count())
+    elif args.command == "dedup-index":
+        print(f"Indexed {store.rebuild_duplicate_index()} candidates")
+    elif args.command == "duplicates":
+        resume_text = None
+        if args.resume:
+            with open(args.resume, "r", encoding="utf-8") as f:
+                resume_text = f.read()
+        print(json.dumps(store.find_duplicates(email=args.email, phone=args.phone, resume_text=resume_text), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+
+from prompt_builder import FIELD_TOKENS, OMITTED_MARKER, USER_INPUT_TOKENS, estimate_tokens, truncate_to_tokens
+
+# History windowing (override with environment variables)
+HISTORY_WINDOW_MESSAGES = int(os.getenv("HISTORY_WINDOW_MESSAGES", "12"))  # rendered live in the chat
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))  # older messages per page
+HISTORY_CONTEXT_MESSAGES = int(os.getenv("HISTORY_CONTEXT_MESSAGES", "4"))  # kept verbatim in prompts
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "400"))
+
+# One character per message in the role string
+ROLE_CODES = {"user": "u", "assistant": "a"}
+ROLE_NAMES = {code: role for role, code in ROLE_CODES.items()}
+SPEAKERS = {"u": "Candidate", "a": "Assistant"}
+
+
+# Append-only transcript of one interview. Roles are kept as a single string and the texts as a flat list,
+# so the serialized form carries no per-message keys. Messages that scroll out of the prompt context
+# are folded into a rolling summary, so prompts stay the same size however long the interview runs.
+class ConversationHistory:
+    def __init__(self, roles="", texts=None, summary=None, summarized=0):
+        self.roles = roles
+        self.texts = texts if texts is not None else []
+        # One condensed line per message in [0, summarized), oldest first; the oldest are dropped past HISTORY_SUMMARY_TOKENS
+        self.summary = summary if summary is not None else []
+        self.summarized = summarized
+
+    def append(self, role, content):
+        self.roles += ROLE_CODES[role]
+        self.texts.append(content)
+        self._fold()
+
+    # Move messages older than the verbatim context into the summary, dropping its oldest lines past the budget
+    def _fold(self):
+        while len(self.texts) - self.summarized > HISTORY_CONTEXT_MESSAGES:
+            index = self.summarized
+            line = f"{SPEAKERS[self.roles[index]]}: {truncate_to_tokens(' '.join(self.texts[index].split()), FIELD_TOKENS)}"
+            self.summary.append(line)
+            self.summarized += 1
+        while len(self.summary) > 1 and estimate_tokens("\n".join(self.summary)) > HISTORY_SUMMARY_TOKENS:
+            del self.summary[0]
+
+    def message(self, index):
+        return {"role": ROLE_NAMES[self.roles[index]], "content": self.texts[index]}
+
+    # Messages [start, stop) as {"role", "content"} dicts
+    def messages(self, start=0, stop=None):
+        return [self.message(i) for i in range(*slice(start, stop).indices(len(self.texts)))]
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return (self.message(i) for i in range(len(self.texts)))
+
+    # Index of the first message rendered live; everything before it is paged
+    def window_start(self, window=HISTORY_WINDOW_MESSAGES):
+        return max(0, len(self.texts) - window)
+
+    def page_count(self, window=HISTORY_WINDOW_MESSAGES, page_size=HISTORY_PAGE_SIZE):
+        return -(-self.window_start(window) // page_size)
+
+    # One page of the messages older than the live window (page 1 is the oldest): [(index, message), ...]
+    def page(self, number, window=HISTORY_WINDOW_MESSAGES, page_size=HISTORY_PAGE_SIZE):
+        end = self.window_start(window)
+        start = (number - 1) * page_size
+        return [(i, self.message(i)) for i in range(start, min(start + page_size, end))]
+
+    # Conversation context for a prompt: the rolling summary plus the most recent messages verbatim
+    def prompt_context(self):
+        lines = []
+        if self.summary:
+            lines.append("Earlier in the conversation (condensed):")
+            if len(self.summary) < self.summarized:
+                lines.append(OMITTED_MARKER)
+            lines.extend(self.summary)
+        recent = range(self.summarized, len(self.texts))
+        if recent:
+            lines.append("Most recent messages:")
+            lines.extend(f"{SPEAKERS[self.roles[i]]}: {truncate_to_tokens(self.texts[i], USER_INPUT_TOKENS)}" for i in recent)
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {"roles": self.roles, "texts": self.texts, "summary": self.summary, "summarized": self.summarized}
+
+    # Accepts to_dict() output or a legacy list of {"role", "content"} messages
+    @classmethod
+    def from_data(cls, data):
+        if data is None:
+            return cls()
+        if isinstance(data, dict):
+            return cls(**data)
+        history = cls()
+        for message in data:
+            history.append(message["role"], message["content"])
+        return history
@@ -0,0 +1,1094 @@
+import io
+import re
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from resume_extract import DOCX_MIME, MAX_BYTES, MAX_CHARS, PDF_MIME, TXT_MIME, extract_text
+from resume_cache import get_resume_cache, hash_bytes, make_cache_key
+from resume_ocr import ocr_available, ocr_cache_id
+from question_bank import QUESTIONS_PER_INTERVIEW, get_question_bank, number_questions, strip_number
+from tech_normalize import normalize_tech_stack, parse_tech_stack, split_tech_stack, tech_key
+from prefetch import PrefetchRegistry
+from llm_backend import LLM_ANALYSIS_TIMEOUT, LLM_QUESTIONS_TIMEOUT, LLM_REPLY_TIMEOUT, get_backend
+from candidate_store import get_candidate_store
+from candidate_dedup import DEDUP_ENABLED, merge_records, resume_data_from_record
+from candidate_search import get_search_index
+from conversation import ConversationHistory
+from metrics import get_metrics
+from prompt_builder import (FIELD_TOKENS, RESUME_ANALYSIS_TOKENS, RESUME_QUESTION_TOKENS, TECH_STACK_TOKENS, USER_INPUT_TOKENS,
+                            join_within_budget, prompt_candidate_info, select_resume_text, truncate_to_tokens)
+
+# The Gemini API key is read from the GEMINI_API_KEY environment variable by the Gemini backend
+# (see llm_backend.py); set LLM_BACKEND=stub to run without network access
+
+# Updated model configuration - using the correct model name format
+# The model name format might have changed in recent versions of the library
+MODEL_NAME = "gemini-2.0-flash"  # Updated model name format
+
+# Shared model backend for this process (long-lived client, deadlines, in-flight deduplication)
+def get_model():
+    return get_backend(MODEL_NAME)
+
+# Bump whenever the analyze_resume prompt changes so cached results are not reused
+ANALYZE_PROMPT_VERSION = "2"
+ONE_SHOT_PROMPT_VERSION = "2"
+
+# One-shot mode: a single request returns the resume profile and tentative technical questions
+ONE_SHOT_ANALYSIS = os.getenv("ONE_SHOT_ANALYSIS", "false").lower() in ("1", "true", "yes")
+
+# Stream assistant responses token by token into the chat instead of waiting for the full completion
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+# Empty candidate info record
+def new_candidate_info():
+    return {
+        "name": "",
+        "email": "",
+        "phone": "",
+        "experience": "",
+        "desired_position": "",
+        "location": "",
+        "tech_stack": [],
+        "resume_text": "",  # New field for resume text
+        "resume_filename": ""  # New field for resume filename
+    }
+
+GREETING = """
+        Hello! I'm the TalentScout Hiring Assistant. I'll be conducting your initial screening interview.
+        
+        I'll collect some basic information, ask you to upload your resume, and then ask a few technical questions to assess your experience with various technologies.
+        
+        Let's start with your name. What is your full name?
+        """
+
+# Prefetch registries are process-local (they hold futures), so they live outside the serializable session
+PREFETCH_SESSIONS = int(os.getenv("PREFETCH_SESSIONS", "10000"))
+
+
+# Complete state of one interview. Plain data only, so it can be serialized with to_dict()
+# and restored with from_dict() by any process.
+class InterviewSession:
+    def __init__(self, session_id=None, conversation_history=None, candidate_info=None, current_stage="greeting",
+                 technical_questions=None, asked_questions=None, resume_uploaded=False, tentative_questions=None,
+                 duplicate_of=None, version=0):
+        self.session_id = session_id or uuid.uuid4().hex
+        # Append-only transcript with a rolling summary (a plain message list is converted)
+        self.conversation_history = (
+            conversation_history if isinstance(conversation_history, ConversationHistory)
+            else ConversationHistory.from_data(conversation_history)
+        )
+        self.candidate_info = candidate_info if candidate_info is not None else new_candidate_info()
+        self.current_stage = current_stage
+        self.technical_questions = technical_questions if technical_questions is not None else []
+        self.asked_questions = asked_questions if asked_questions is not None else []
+        self.resume_uploaded = resume_uploaded
+        # Questions drafted by one-shot analysis, with the tech stack they were drafted for
+        self.tentative_questions = tentative_questions
+        # Id of the known candidate this applicant matched (see find_known_candidate); saved as a merged record
+        self.duplicate_of = duplicate_of
+        # Incremented by session stores on every save, to detect concurrent updates
+        self.version = version
+
+    # Background question generation for this session (see get_session_prefetch)
+    @property
+    def question_prefetch(self):
+        return get_session_prefetch(self.session_id)
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "conversation_history": self.conversation_history.to_dict(),
+            "candidate_info": self.candidate_info,
+            "current_stage": self.current_stage,
+            "technical_questions": self.technical_questions,
+            "asked_questions": self.asked_questions,
+            "resume_uploaded": self.resume_uploaded,
+            "tentative_questions": self.tentative_questions,
+            "duplicate_of": self.duplicate_of,
+            "version": self.version,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+_prefetch_registries = OrderedDict()
+_prefetch_lock = threading.Lock()
+
+# Per-session registry of background question generation, kept for the PREFETCH_SESSIONS most recent sessions
+def get_session_prefetch(session_id):
+    with _prefetch_lock:
+        registry = _prefetch_registries.get(session_id)
+        if registry is None:
+            registry = _prefetch_registries[session_id] = PrefetchRegistry()
+            while len(_prefetch_registries) > PREFETCH_SESSIONS:
+                _, evicted = _prefetch_registries.popitem(last=False)
+                evicted.cancel_all()
+        else:
+            _prefetch_registries.move_to_end(session_id)
+        return registry
+
+# Start a new interview with the assistant's greeting already in the history
+def new_session(session_id=None):
+    session = InterviewSession(session_id)
+    session.conversation_history.append("assistant", GREETING)
+    return session
+
+# Cancel a session's background work and release it (on reset or once the interview is finished)
+def end_session(session):
+    with _prefetch_lock:
+        registry = _prefetch_registries.pop(session.session_id, None)
+    if registry is not None:
+        registry.cancel_all()
+
+# Patterns compiled once per process (module state survives Streamlit reruns)
+_email_pattern = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+# Basic validation - looks for a sequence of digits
+_phone_pattern = re.compile(r'^\d{10,15}$')
+_non_digits = re.compile(r'[^0-9]')
+_numbered_line = re.compile(r'^\d+\.')
+_number_prefix = re.compile(r'^\d+\.\s*')
+
+# Validate email format
+def is_valid_email(email):
+    return _email_pattern.match(email) is not None
+
+# Validate phone number format
+def is_valid_phone(phone):
+    return _phone_pattern.match(phone) is not None
+
+# Extract text from PDF (pages are extracted in parallel for long documents, scanned pages are OCRed)
+def extract_text_from_pdf(file, max_chars=None, on_error=print, on_ocr_fallback=None):
+    try:
+        text = extract_text(file.getvalue(), PDF_MIME, max_chars=max_chars, on_ocr_fallback=on_ocr_fallback)
+    except Exception as e:
+        on_error(f"Error extracting text from PDF: {str(e)}")
+        return ""
+    if not text.strip() and not ocr_available():
+        on_error("No text found in this PDF. It may be a scanned document; please upload a text-based PDF, DOCX, or TXT file.")
+    return text
+
+# Extract text from DOCX
+def extract_text_from_docx(file, max_chars=None, on_error=print):
+    try:
+        return extract_text(file.getvalue(), DOCX_MIME, max_chars=max_chars)
+    except Exception as e:
+        on_error(f"Error extracting text from DOCX: {str(e)}")
+        return ""
+
+# Extract text from resume file
+# Pass max_chars to stop reading once enough text has been gathered (e.g. 5000 for question generation).
+# Problems are reported through on_error (st.error in the Streamlit app).
+# on_ocr_fallback is called for each scanned page whose OCR failed, so the text is incomplete.
+def extract_resume_text(uploaded_file, max_chars=MAX_CHARS, on_error=print, on_ocr_fallback=None):
+    text = ""
+    if uploaded_file is not None:
+        # Create a copy of the file in memory
+        bytes_data = uploaded_file.getvalue()
+        
+        # Determine file type and extract text
+        file_type = uploaded_file.type
+        
+        if len(bytes_data) > MAX_BYTES:
+            on_error(f"Resume file is too large. Please upload a file smaller than {MAX_BYTES // (1024 * 1024)} MB.")
+        elif file_type == PDF_MIME:
+            text = extract_text_from_pdf(io.BytesIO(bytes_data), max_chars=max_chars, on_error=on_error,
+                                         on_ocr_fallback=on_ocr_fallback)
+        elif file_type == DOCX_MIME:
+            text = extract_text_from_docx(io.BytesIO(bytes_data), max_chars=max_chars, on_error=on_error)
+        elif file_type == TXT_MIME:
+            text = extract_text(bytes_data, TXT_MIME, max_chars=max_chars)
+        else:
+            on_error(f"Unsupported file type: {file_type}. Please upload a PDF, DOCX, or TXT file.")
+    
+    return text
+
+# Analyze resume using Gemini API
+def analyze_resume(resume_text):
+    try:
+        model = get_model()
+        
+        # Bounded excerpt: long resumes are cut down to their most informative sections
+        prompt = f"""
+        Analyze the following resume text and extract key information:
+        
+        {select_resume_text(resume_text, RESUME_ANALYSIS_TOKENS)}
+        
+        Please extract and format the following information:
+        1. Name
+        2. Email
+        3. Phone number
+        4. Total years of experience
+        5. Most recent position/title
+        6. Current/most recent location
+        7. Technical skills and technologies (as a comma-separated list)
+        
+        Format your response as a JSON object with these keys: name, email, phone, experience, position, location, tech_stack
+        Only return the JSON object, nothing else.
+        """
+        
+        generation_config = {
+            "temperature": 0.1,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": 1024,
+        }
+        
+        response = model.generate(prompt, generation_config=generation_config, timeout=LLM_ANALYSIS_TIMEOUT)
+        
+        # Try to parse the response as JSON
+        try:
+            resume_data = parse_json_response(response.text)
+            return resume_data
+        except json.JSONDecodeError:
+            print(f"Failed to parse JSON: {response.text}")
+            return None
+            
+    except Exception as e:
+        print(f"Error analyzing resume: {str(e)}")
+        return None
+
+# Parse a JSON object from a model response, tolerating markdown code fences
+def parse_json_response(text):
+    # First clean up the response to ensure it's valid JSON
+    json_text = text.strip()
+    # Remove markdown code blocks if present
+    if json_text.startswith("```json"):
+        json_text = json_text.replace("```json", "").replace("```", "").strip()
+    elif json_text.startswith("```"):
+        json_text = json_text.replace("```", "").strip()
+    
+    return json.loads(json_text)
+
+# Analyze resume and draft technical questions in a single Gemini request (one-shot mode)
+def analyze_resume_with_questions(resume_text, position=""):
+    try:
+        model = get_model()
+        
+        prompt = f"""
+        Analyze the following resume text:
+        
+        {select_resume_text(resume_text, RESUME_ANALYSIS_TOKENS)}
+        
+        Return a JSON object with exactly two keys:
+        1. "profile": an object with these keys: name, email, phone, experience (total years), position (most recent position/title), location (current/most recent), tech_stack (comma-separated list of technical skills and technologies)
+        2. "questions": a list of 5 technical interview questions (plain strings, without numbering) for a {truncate_to_tokens(position, FIELD_TOKENS) or "candidate for the most recent position"}
+        
+        The questions should:
+        - Cover the different technologies in the tech stack, at least one per major technology
+        - Range from basic to advanced
+        - Test both theoretical knowledge and practical application
+        - Be tailored to the experience described in the resume
+        
+        Only return the JSON object, nothing else.
+        """
+        
+        generation_config = {
+            "temperature": 0.3,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": 2048,
+        }
+        
+        response = model.generate(prompt, generation_config=generation_config, timeout=LLM_ANALYSIS_TIMEOUT)
+        
+        try:
+            result = parse_json_response(response.text)
+        except json.JSONDecodeError:
+            print(f"Failed to parse JSON: {response.text}")
+            return None
+        
+        if not isinstance(result, dict) or not isinstance(result.get("profile"), dict):
+            print(f"Unexpected one-shot response: {response.text}")
+            return None
+        
+        questions = []
+        for question in result.get("questions") or []:
+            question = _number_prefix.sub('', str(question).strip())
+            if question:
+                questions.append({"question": f"{len(questions)+1}. {question}", "answer": None})
+        
+        return {"resume_data": result["profile"], "questions": questions}
+    
+    except Exception as e:
+        print(f"Error analyzing resume: {str(e)}")
+        return None
+
+# Extract resume text, reusing the cached text for identical file bytes.
+# Whitespace-only text counts as no text. Text from an extraction where OCR failed for some page
+# is used but not cached, so the next upload of the file tries OCR again.
+def get_cached_resume_text(uploaded_file, on_error=print):
+    cache = get_resume_cache()
+    file_hash = hash_bytes(uploaded_file.getvalue())
+    
+    text_key = make_cache_key("text", file_hash, ocr_cache_id())
+    with get_metrics().timed("resume.extract", file_type=uploaded_file.type, file_bytes=len(uploaded_file.getvalue())) as timing:
+        cached_text = cache.get(text_key)
+        timing["cache_hit"] = cached_text is not None
+        if cached_text is not None:
+            resume_text = cached_text["resume_text"]
+        else:
+            ocr_fallbacks = []
+            resume_text = extract_resume_text(uploaded_file, on_error=on_error,
+                                              on_ocr_fallback=lambda: ocr_fallbacks.append(1))
+            if not (resume_text or "").strip():
+                resume_text = ""
+            timing["ocr_fallback_pages"] = len(ocr_fallbacks)
+            if resume_text and not ocr_fallbacks:
+                cache.put(text_key, {"resume_text": resume_text})
+        timing["text_chars"] = len(resume_text or "")
+    return file_hash, resume_text
+
+# Analyze resume text, reusing the cached analysis for identical file bytes
+def get_cached_resume_analysis(file_hash, resume_text, analyze=analyze_resume):
+    cache = get_resume_cache()
+    analysis_key = make_cache_key("analysis", file_hash, get_model().cache_id, ANALYZE_PROMPT_VERSION, RESUME_ANALYSIS_TOKENS)
+    with get_metrics().timed("resume.analyze") as timing:
+        cached_analysis = cache.get(analysis_key)
+        timing["cache_hit"] = cached_analysis is not None
+        if cached_analysis is not None:
+            return cached_analysis["resume_data"]
+        
+        resume_data = analyze(resume_text)
+        timing["failed"] = not resume_data
+        # Only successful analyses are cached so failures are retried on the next upload
+        if resume_data:
+            cache.put(analysis_key, {"resume_data": resume_data})
+        return resume_data
+
+# One-shot analysis (profile + tentative questions), reusing the cached result for identical file bytes
+def get_cached_one_shot_analysis(file_hash, resume_text, position="", analyze=analyze_resume_with_questions):
+    cache = get_resume_cache()
+    analysis_key = make_cache_key("one_shot", file_hash, get_model().cache_id, ONE_SHOT_PROMPT_VERSION, RESUME_ANALYSIS_TOKENS, position)
+    with get_metrics().timed("resume.analyze_one_shot") as timing:
+        cached_analysis = cache.get(analysis_key)
+        timing["cache_hit"] = cached_analysis is not None
+        if cached_analysis is not None:
+            return cached_analysis
+        
+        result = analyze(resume_text, position)
+        timing["failed"] = not result
+        if result:
+            cache.put(analysis_key, result)
+        return result
+
+# Extract and analyze a resume, reusing cached results for identical file bytes
+def process_resume_file(uploaded_file, on_error=print):
+    file_hash, resume_text = get_cached_resume_text(uploaded_file, on_error)
+    if not resume_text:
+        return resume_text, None
+    return resume_text, get_cached_resume_analysis(file_hash, resume_text)
+
+# Extract a resume and analyze it with one request that also drafts questions
+# Returns (resume_text, resume_data, tentative_questions)
+def process_resume_file_one_shot(uploaded_file, position="", on_error=print):
+    file_hash, resume_text = get_cached_resume_text(uploaded_file, on_error)
+    if not resume_text:
+        return resume_text, None, []
+    return (resume_text,) + analyze_resume_text_one_shot(file_hash, resume_text, position)
+
+# One-shot analysis of extracted resume text; returns (resume_data, tentative_questions)
+def analyze_resume_text_one_shot(file_hash, resume_text, position=""):
+    result = get_cached_one_shot_analysis(file_hash, resume_text, position)
+    if not result:
+        return None, []
+    return result["resume_data"], result["questions"]
+
+# Pre-fill empty candidate info fields and the tech stack from analyzed resume data
+def apply_resume_data(candidate_info, resume_data):
+    if not candidate_info["name"] and "name" in resume_data:
+        candidate_info["name"] = resume_data["name"]
+    if not candidate_info["email"] and "email" in resume_data:
+        candidate_info["email"] = resume_data["email"]
+    if not candidate_info["phone"] and "phone" in resume_data:
+        candidate_info["phone"] = resume_data["phone"]
+    if not candidate_info["experience"] and "experience" in resume_data:
+        candidate_info["experience"] = resume_data["experience"]
+    if not candidate_info["desired_position"] and "position" in resume_data:
+        candidate_info["desired_position"] = resume_data["position"]
+    if not candidate_info["location"] and "location" in resume_data:
+        candidate_info["location"] = resume_data["location"]
+    
+    # Extract tech stack (list or comma-separated string), with canonical names and no duplicates
+    if "tech_stack" in resume_data and resume_data["tech_stack"]:
+        candidate_info["tech_stack"] = parse_tech_stack(resume_data["tech_stack"])
+
+# Build a candidate record in the saved-file schema
+def build_candidate_record(candidate_info, conversation_history, technical_questions, asked_questions):
+    return {
+        "candidate_info": candidate_info,
+        "conversation_history": conversation_history,
+        "technical_questions": technical_questions,
+        "answers": [q for q in asked_questions if "answer" in q]
+    }
+
+# Best match for an applicant among known candidates (exact email/phone or near-duplicate resume), or None
+def find_known_candidate(candidate_info, resume_text=""):
+    if not DEDUP_ENABLED:
+        return None
+    try:
+        with get_metrics().timed("resume.dedup") as timing:
+            matches = get_candidate_store().find_duplicates(
+                email=candidate_info.get("email"),
+                phone=candidate_info.get("phone"),
+                resume_text=resume_text
+            )
+            timing["match"] = matches[0]["match"] if matches else ""
+    except Exception as e:
+        print(f"Error checking for duplicate candidates: {str(e)}")
+        return None
+    return matches[0] if matches else None
+
+# Save candidate data to the candidate store (once, when the interview is complete); returns the candidate id.
+# A returning candidate's application is merged into their existing record instead of creating a new one.
+def save_candidate_data(session):
+    record = build_candidate_record(
+        session.candidate_info,
+        session.conversation_history.messages(),
+        session.technical_questions,
+        session.asked_questions
+    )
+    store = get_candidate_store()
+    if session.duplicate_of is None and not session.resume_uploaded:
+        # Uploads were already checked; without a resume only the contact details can match
+        match = find_known_candidate(session.candidate_info)
+        session.duplicate_of = match["candidate_id"] if match else None
+    existing = store.get(session.duplicate_of) if session.duplicate_of else None
+    if existing is not None:
+        candidate_id = session.duplicate_of
+        record = merge_records(existing["record"], record)
+        store.replace_record(candidate_id, record)
+    else:
+        candidate_id = store.add(record)
+    
+    # Make the candidate searchable for recruiters right away (incremental, no rebuild)
+    try:
+        get_search_index().add_candidate(candidate_id, record, replace=existing is not None)
+    except Exception as e:
+        print(f"Error indexing candidate {candidate_id}: {str(e)}")
+    
+    return candidate_id
+
+# Create system prompt for the chatbot (defaults to the session's current stage)
+def get_system_prompt(session, stage=None):
+    stage = stage or session.current_stage
+    base_prompt = """You are the Hiring Assistant chatbot for TalentScout, a recruitment agency specializing in technology placements. 
+    Your purpose is to screen candidates by gathering information and asking technical questions.
+    Be professional, friendly, and concise in your responses.
+    Do not disclose that you are an AI unless explicitly asked.
+    """
+    
+    if stage == "greeting":
+        return base_prompt + """
+        Your task now is to greet the candidate and explain that you'll be collecting some information 
+        for their application. Ask for their name first.
+        """
+    elif stage == "collecting_info":
+        return base_prompt + f"""
+        You are currently collecting candidate information.
+        Current candidate info: {prompt_candidate_info(session.candidate_info)}
+        If any field is empty, politely ask for that information.
+        Collect information in this order: name, email, phone, experience (in years), desired position, current location.
+        Once you have all this information, ask the candidate about their tech stack (programming languages, frameworks, databases, tools).
+        """
+    elif stage == "tech_stack":
+        return base_prompt + f"""
+        You have collected the basic candidate information: {prompt_candidate_info(session.candidate_info)}
+        Now focus on understanding their tech stack in detail. Ask them to list all programming languages, 
+        frameworks, databases, and tools they are proficient in. Encourage them to be specific.
+        """
+    elif stage == "resume_upload":
+        return base_prompt + f"""
+        You have collected the candidate's basic information.
+        Now ask them to upload their resume for a more detailed assessment.
+        Explain that they can upload a PDF, DOCX, or TXT file using the file uploader in the sidebar.
+        """
+    elif stage == "generate_questions":
+        return base_prompt + f"""
+        Based on the candidate's tech stack: {join_within_budget(session.candidate_info['tech_stack'], TECH_STACK_TOKENS)}, 
+        generate 3-5 relevant technical questions to assess their proficiency.
+        Format each question with a clear question number.
+        Make sure to create questions for different technologies in their stack.
+        Questions should range from basic to advanced to gauge their depth of knowledge.
+        """
+    elif stage == "ask_questions":
+        return base_prompt + f"""
+        You are now interviewing the candidate.
+        Ask one technical question at a time from the list you've generated.
+        After they answer, provide brief feedback or acknowledgment, then ask the next question.
+        """
+    elif stage == "conclusion":
+        return base_prompt + f"""
+        You have completed collecting information and asking technical questions.
+        Thank the candidate for their time and inform them that their application has been recorded.
+        Let them know that a TalentScout recruiter will contact them soon for the next steps.
+        If they have any questions about the process, offer to answer them.
+        """
+    else:
+        return base_prompt
+
+# Generation settings for technical questions
+QUESTION_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 1024,
+}
+
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
+
+# Build the prompt for technical question generation
+def build_question_prompt(tech_stack, position, resume_text=""):
+    # Create a more detailed prompt that ensures questions cover different technologies
+    return f"""
+        Generate 5 technical interview questions for a {truncate_to_tokens(position, FIELD_TOKENS)} candidate 
+        who is proficient in the following technologies: {join_within_budget(tech_stack, TECH_STACK_TOKENS)}.
+        
+        Additional resume information:
+        {select_resume_text(resume_text, RESUME_QUESTION_TOKENS, focus=tech_stack) if resume_text else "Not provided"}
+        
+        Questions should:
+        1. Be specific to the technologies mentioned - ensure you create at least one question for each major technology in the stack
+        2. Range from basic to advanced
+        3. Test both theoretical knowledge and practical application
+        4. Be clear and concise
+        5. If the resume is provided, tailor some questions to their specific experience
+        
+        Make sure to distribute questions across different technologies in the tech stack.
+        Format the output as a numbered list of questions only, without any introductions or explanations.
+        """
+
+# Fallback questions used when the Gemini API fails
+def fallback_technical_questions(tech_stack):
+    fallback_questions = []
+    
+    # Generate at least one question for each technology in the stack
+    for i, tech in enumerate(tech_stack[:min(5, len(tech_stack))]):
+        fallback_questions.append(
+            {"question": f"{i+1}. What is your experience level with {tech}?", "answer": None}
+        )
+    
+    # If we have fewer than 3 questions, add some general ones
+    if len(fallback_questions) < 3:
+        fallback_questions.append(
+            {"question": f"{len(fallback_questions)+1}. Describe a challenging project you've worked on using any of these technologies.", "answer": None}
+        )
+        fallback_questions.append(
+            {"question": f"{len(fallback_questions)+1}. How do you stay updated with the latest developments in your tech stack?", "answer": None}
+        )
+    
+    return fallback_questions
+
+# Generate technical questions using the Gemini API
+def generate_technical_questions(tech_stack, position, resume_text=""):
+    try:
+        # Shared backend instance - no per-call client setup
+        model = get_model()
+        
+        prompt = build_question_prompt(tech_stack, position, resume_text)
+        
+        # Generate content with safety settings
+        response = model.generate(
+            prompt,
+            generation_config=QUESTION_GENERATION_CONFIG,
+            safety_settings=SAFETY_SETTINGS,
+            timeout=LLM_QUESTIONS_TIMEOUT
+        )
+        
+        # Extract and format questions
+        questions_text = response.text
+        questions = []
+        for line in questions_text.strip().split('\n'):
+            if _numbered_line.match(line.strip()):
+                questions.append({"question": line.strip(), "answer": None})
+        
+        return questions
+    
+    except Exception as e:
+        # Fallback to more diverse questions if the API fails
+        print(f"Error generating questions: {str(e)}")
+        get_metrics().count("fallback", source="generate_technical_questions")
+        return fallback_technical_questions(tech_stack)
+
+# Stream technical questions from the Gemini API, yielding each question's text as soon as its line is complete
+def stream_technical_questions(tech_stack, position, resume_text=""):
+    yielded = 0
+    try:
+        chunks = get_model().stream(
+            build_question_prompt(tech_stack, position, resume_text),
+            generation_config=QUESTION_GENERATION_CONFIG,
+            safety_settings=SAFETY_SETTINGS,
+            timeout=LLM_QUESTIONS_TIMEOUT
+        )
+        
+        buffer = ""
+        for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split('\n')
+            for line in lines:
+                if _numbered_line.match(line.strip()):
+                    yielded += 1
+                    yield strip_number(line)
+        if _numbered_line.match(buffer.strip()):
+            yielded += 1
+            yield strip_number(buffer)
+    
+    except Exception as e:
+        print(f"Error generating questions: {str(e)}")
+        # Only fall back if the candidate hasn't already been shown streamed questions
+        if yielded == 0:
+            get_metrics().count("fallback", source="stream_technical_questions")
+            for question in fallback_technical_questions(tech_stack):
+                yield strip_number(question["question"])
+
+# Count question bank lookups by how much of the stack the bank covered
+def record_bank_lookup(bank_questions, uncovered):
+    result = "miss" if not bank_questions else "partial" if uncovered else "hit"
+    get_metrics().count("question_bank_lookups", result=result)
+
+# Assemble technical questions from the question bank, calling Gemini (via generate) only for uncovered technologies
+def get_technical_questions(tech_stack, position, resume_text="", experience="", generate=generate_technical_questions):
+    bank_questions, uncovered = get_question_bank().assemble(tech_stack, experience, QUESTIONS_PER_INTERVIEW)
+    record_bank_lookup(bank_questions, uncovered)
+    if not bank_questions:
+        # Nothing in the bank for this stack - generate everything live
+        return generate(tech_stack, position, resume_text)
+    
+    questions = list(bank_questions)
+    if uncovered:
+        generated = generate(list(uncovered), position, resume_text)
+        questions.extend(strip_number(q["question"]) for q in generated[:sum(uncovered.values())])
+    
+    return number_questions(questions)
+
+# Like get_technical_questions, but yields question texts (unnumbered) as they become available
+def iter_technical_questions(tech_stack, position, resume_text="", experience=""):
+    bank_questions, uncovered = get_question_bank().assemble(tech_stack, experience, QUESTIONS_PER_INTERVIEW)
+    record_bank_lookup(bank_questions, uncovered)
+    if not bank_questions:
+        yield from stream_technical_questions(tech_stack, position, resume_text)
+        return
+    
+    yield from bank_questions
+    if uncovered:
+        needed = sum(uncovered.values())
+        live = stream_technical_questions(list(uncovered), position, resume_text)
+        for i, question in enumerate(live):
+            if i >= needed:
+                live.close()
+                break
+            yield question
+
+# Stream a model response as text chunks, yielding the fallback text if the call fails before any output
+def stream_model_text(prompt, fallback_text, **kwargs):
+    yielded = False
+    try:
+        for chunk in get_model().stream(prompt, **kwargs):
+            yielded = True
+            yield chunk
+    except Exception as e:
+        print(f"Error streaming response: {str(e)}")
+        if not yielded:
+            get_metrics().count("fallback", source="stream_model_text")
+            yield fallback_text
+
+# Reply for the tech_stack stage: the introduction is shown immediately and the first question
+# as soon as it has been generated; the rest of the questions are collected in the background
+def stream_questions_reply(session, tech_stack, position, resume_text="", experience=""):
+    yield "Thank you for sharing your tech stack. I'll now ask you a few technical questions based on your experience. Here's the first question:\n\n"
+    
+    questions = []
+    try:
+        for question in iter_technical_questions(tech_stack, position, resume_text, experience):
+            questions.append(question)
+            if len(questions) == 1:
+                yield f"1. {question}"
+    finally:
+        if questions:
+            session.technical_questions = number_questions(questions)
+        else:
+            get_metrics().count("fallback", source="default_technical_questions")
+            session.technical_questions = default_technical_questions(tech_stack)
+    
+    if not questions:
+        yield session.technical_questions[0]["question"]
+
+# Last-resort questions when no questions could be generated at all
+def default_technical_questions(tech_stack):
+    return [
+        {"question": f"1. Tell me about your experience with {tech_stack[0]}.", "answer": None},
+        {"question": f"2. What projects have you worked on using {tech_stack[0]}?", "answer": None},
+        {"question": f"3. How do you keep up with changes in {tech_stack[0]}?", "answer": None}
+    ]
+
+# Prefetch key for a tech stack: order- and case-insensitive
+def tech_stack_key(tech_stack):
+    return tuple(sorted({tech_key(tech) for tech in tech_stack if tech.strip()}))
+
+# Start generating questions for the current tech stack in the background
+def prefetch_technical_questions(session):
+    info = session.candidate_info
+    if not info["tech_stack"]:
+        return
+    session.question_prefetch.submit(
+        tech_stack_key(info["tech_stack"]),
+        get_technical_questions,
+        list(info["tech_stack"]),
+        info["desired_position"],
+        info["resume_text"],
+        info["experience"]
+    )
+
+# Use prefetched questions for tech_stack if a prefetch covered all or part of it.
+# Technologies added since the prefetch get questions of their own, generated for the delta only.
+def take_prefetched_questions(session, tech_stack, position, resume_text="", experience="", timeout=60):
+    registry = session.question_prefetch
+    current = set(tech_stack_key(tech_stack))
+    base_key = next((key for key in registry.keys() if key and set(key) <= current), None)
+    if base_key is None:
+        # The stack changed in a way the prefetch can't be reused for
+        registry.cancel_all()
+        return None
+    
+    questions = registry.result(base_key, timeout=timeout)
+    registry.cancel_all()
+    if not questions:
+        return None
+    
+    delta = [tech for tech in tech_stack if tech_key(tech) not in base_key]
+    if not delta:
+        return questions
+    
+    # Give the added technologies a share of the questions proportional to their part of the stack
+    delta_slots = max(1, round(QUESTIONS_PER_INTERVIEW * len(delta) / len(current)))
+    delta_questions = get_technical_questions(delta, position, resume_text, experience)[:delta_slots]
+    kept = questions[:QUESTIONS_PER_INTERVIEW - len(delta_questions)]
+    return number_questions([q["question"] for q in kept + delta_questions])
+
+# Advance the interview by one candidate message. The session is updated in place and returned with the reply:
+# text, or a generator of text chunks when the response is streamed. Both sides of the exchange are added to
+# the conversation history (a streamed reply once it has been fully consumed).
+# Each step is timed under the stage it was received in.
+def step(session, user_input):
+    metrics = get_metrics()
+    name = f"stage.{session.current_stage}"
+    session.conversation_history.append("user", user_input)
+    start = time.perf_counter()
+    try:
+        reply = respond_to_input(session, user_input)
+    except Exception:
+        metrics.observe(name, time.perf_counter() - start, status="error", input_chars=len(user_input))
+        raise
+    
+    if isinstance(reply, str):
+        metrics.observe(name, time.perf_counter() - start, status="ok", input_chars=len(user_input), response_chars=len(reply))
+        session.conversation_history.append("assistant", reply)
+        return session, reply
+    chunks = metrics.timed_iter(name, reply, start=start, input_chars=len(user_input), streamed=True)
+    return session, record_streamed_reply(session, chunks)
+
+# Pass a streamed reply through, adding the full text to the history once it is complete
+def record_streamed_reply(session, chunks):
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+    finally:
+        session.conversation_history.append("assistant", "".join(parts))
+
+# Exit intent: any of these as whole words ("stop" matches "please stop", not "nonstop" or "desktop").
+# The patterns are matched against the lowercased message.
+EXIT_KEYWORDS = ["quit", "exit", "bye", "goodbye", "end interview", "stop"]
+_exit_words = "|".join(re.escape(keyword).replace(r"\ ", r"\s+") for keyword in EXIT_KEYWORDS)
+_exit_intent = re.compile(rf"\b(?:{_exit_words})\b")
+CONFIRMATIONS = frozenset(["yes", "correct", "that's right", "that is correct", "confirmed", "looks good"])
+
+# Substrings every exit phrase contains; most messages contain none, and substring search is cheaper than the regex
+_exit_screen = ("quit", "exit", "bye", "end", "stop")
+
+# True if the message asks to end the interview, in any stage
+def wants_to_exit(user_input):
+    text = user_input.lower()
+    if not any(fragment in text for fragment in _exit_screen):
+        return False
+    return _exit_intent.search(text) is not None
+
+# Validators return the value to store, or None if the input is invalid
+def validate_text(user_input):
+    return user_input.strip()
+
+def validate_email(user_input):
+    email = user_input.strip()
+    return email if is_valid_email(email) else None
+
+def validate_phone(user_input):
+    phone = _non_digits.sub('', user_input)
+    return phone if is_valid_phone(phone) else None
+
+# Basic information collected in order: (field, validator, reply once stored, reply if invalid)
+INFO_FIELDS = [
+    ("email", validate_email,
+     "Thank you! Now, could you please provide your phone number?",
+     "That doesn't look like a valid email address. Please enter a valid email (e.g., example@domain.com)."),
+    ("phone", validate_phone,
+     "Thanks! How many years of experience do you have in the technology field?",
+     "That doesn't look like a valid phone number. Please enter a valid phone number (digits only)."),
+    ("experience", validate_text, "Great! What position are you applying for?", None),
+    ("desired_position", validate_text, "Thank you! What is your current location?", None),
+    ("location", validate_text,
+     "Thank you for providing your basic information. Could you please upload your resume using the file uploader in the sidebar? This will help us better understand your experience and skills. Supported formats are PDF, DOCX, and TXT.",
+     None),
+]
+
+# Interview stages: name -> {"handler", "transitions"}. Handlers take (session, user_input)
+# and return the reply (text or a stream of chunks); transitions are the stages a handler may move to.
+STAGES = {}
+
+# Register a stage handler in STAGES
+def stage(name, transitions=()):
+    def register(handler):
+        STAGES[name] = {"handler": handler, "transitions": frozenset(transitions)}
+        return handler
+    return register
+
+@stage("greeting", transitions=["collecting_info"])
+def handle_greeting(session, user_input):
+    # Extract name from the response
+    session.candidate_info["name"] = user_input.strip()
+    session.current_stage = "collecting_info"
+    return f"Nice to meet you, {session.candidate_info['name']}! Could you please provide your email address?"
+
+@stage("collecting_info", transitions=["resume_upload"])
+def handle_collecting_info(session, user_input):
+    # Fill the first missing field; the interview moves on to the resume once the last one is stored
+    for position, (field, validator, accepted, rejected) in enumerate(INFO_FIELDS):
+        if session.candidate_info[field]:
+            continue
+        value = validator(user_input)
+        if value is None:
+            return rejected
+        session.candidate_info[field] = value
+        if position == len(INFO_FIELDS) - 1:
+            session.current_stage = "resume_upload"
+        return accepted
+    return None
+
+@stage("resume_upload", transitions=["tech_stack"])
+def handle_resume_upload(session, user_input):
+    # After resume is processed, move to tech stack if response is received
+    session.current_stage = "tech_stack"
+    
+    # Check if we already have tech stack info from the resume
+    if session.resume_uploaded and session.candidate_info["tech_stack"]:
+        tech_stack_str = ", ".join(session.candidate_info["tech_stack"])
+        return f"Based on your resume, I see you have experience with: {tech_stack_str}. Could you please confirm or add any other technologies you're proficient with that may not be on your resume?"
+    else:
+        return "Now, please list your tech stack - all programming languages, frameworks, databases, and tools you're proficient with."
+
+@stage("tech_stack", transitions=["ask_questions"])
+def handle_tech_stack(session, user_input):
+    # Process tech stack information
+    if session.candidate_info["tech_stack"] and user_input.lower() in CONFIRMATIONS:
+        # User confirmed the tech stack extracted from resume
+        pass
+    else:
+        # User provided or updated tech stack; merged with any existing stack in a stable order,
+        # so "JS" and "javascript" collapse into one "JavaScript" entry
+        tech_stack = split_tech_stack(user_input)
+        session.candidate_info["tech_stack"] = normalize_tech_stack(
+            session.candidate_info["tech_stack"] + tech_stack
+        )
+    
+    # Generate technical questions
+    session.current_stage = "generate_questions"
+    
+    tentative = session.tentative_questions
+    if tentative and set(tentative["tech_stack"]) == set(session.candidate_info["tech_stack"]):
+        # Tech stack unchanged since one-shot analysis - reuse the drafted questions
+        ready_questions = tentative["questions"]
+    else:
+        # Use questions generated in the background while the candidate was typing, if any
+        ready_questions = take_prefetched_questions(
+            session,
+            session.candidate_info["tech_stack"],
+            session.candidate_info["desired_position"],
+            session.candidate_info["resume_text"],
+            session.candidate_info["experience"]
+        )
+    
+    if ready_questions:
+        session.technical_questions = ready_questions
+    elif STREAM_RESPONSES:
+        # Questions are collected while the reply streams; the first one is shown as soon as it exists
+        session.current_stage = "ask_questions"
+        return stream_questions_reply(
+            session,
+            session.candidate_info["tech_stack"],
+            session.candidate_info["desired_position"],
+            session.candidate_info["resume_text"],
+            session.candidate_info["experience"]
+        )
+    else:
+        # Use the question bank, generating questions only for technologies it doesn't cover
+        session.technical_questions = get_technical_questions(
+            session.candidate_info["tech_stack"], 
+            session.candidate_info["desired_position"],
+            session.candidate_info["resume_text"],
+            session.candidate_info["experience"]
+        )
+    
+    if not session.technical_questions:
+        # Fallback if no questions were generated
+        get_metrics().count("fallback", source="default_technical_questions")
+        session.technical_questions = default_technical_questions(session.candidate_info["tech_stack"])
+    
+    session.current_stage = "ask_questions"
+    
+    return "Thank you for sharing your tech stack. I'll now ask you a few technical questions based on your experience. Here's the first question:\n\n" + session.technical_questions[0]["question"]
+
+@stage("ask_questions", transitions=["conclusion"])
+def handle_ask_questions(session, user_input):
+    # Process answers to technical questions
+    if session.asked_questions:
+        last_question = session.asked_questions[-1]
+        last_question["answer"] = user_input
+    else:
+        # Add the first question to asked questions
+        session.asked_questions.append({
+            "question": session.technical_questions[0]["question"],
+            "answer": user_input
+        })
+    
+    # Check if we've asked all questions
+    if len(session.asked_questions) >= len(session.technical_questions):
+        session.current_stage = "conclusion"
+        save_candidate_data(session)
+        end_session(session)
+        return "Thank you for answering all our technical questions! Your application has been recorded. A TalentScout recruiter will contact you soon to discuss the next steps. Do you have any questions about the process?"
+    
+    # Ask the next question
+    next_question = session.technical_questions[len(session.asked_questions)]
+    session.asked_questions.append({
+        "question": next_question["question"],
+        "answer": None
+    })
+    
+    return f"Thank you for your answer. Let's move on to the next question:\n\n{next_question['question']}"
+
+@stage("conclusion")
+def handle_conclusion(session, user_input):
+    # Handle any final questions from the candidate, with the conversation so far as a rolling summary
+    prompt = f"""
+        {session.conversation_history.prompt_context()}
+        
+        The candidate has asked: {truncate_to_tokens(user_input, USER_INPUT_TOKENS)}
+        
+        You are concluding the interview process. Answer their question professionally and concisely.
+        If they have questions about when they'll hear back, let them know a recruiter will review their 
+        application and contact them within 3-5 business days.
+        If they're asking about next steps, explain there might be additional technical interviews and a culture fit assessment.
+        If they ask about something you can't answer, politely inform them that a recruiter will be able to provide more specific information.
+        """
+    fallback_text = "Thank you for your question. A recruiter will review your application and contact you within 3-5 business days to discuss the next steps in the hiring process."
+    
+    if STREAM_RESPONSES:
+        # Tokens are rendered as they arrive instead of after the full completion
+        return stream_model_text(prompt, fallback_text, timeout=LLM_REPLY_TIMEOUT)
+    
+    try:
+        # Use the Gemini API to generate a response
+        response = get_model().generate(prompt, timeout=LLM_REPLY_TIMEOUT)
+        return response.text
+    except Exception as e:
+        # Fallback response if the API call fails
+        print(f"Error in conclusion stage: {str(e)}")
+        get_metrics().count("fallback", source="conclusion")
+        return fallback_text
+
+UNKNOWN_STAGE_REPLY = "I'm sorry, I didn't understand. Could you please rephrase your response?"
+
+# Reply to user input based on the current stage: one table lookup, then the stage's handler
+def respond_to_input(session, user_input):
+    if wants_to_exit(user_input):
+        session.current_stage = "conclusion"
+        return "I understand you'd like to end our conversation. "
+    entry = STAGES.get(session.current_stage)
+    if entry is None:
+        # Fallback for unexpected states
+        return UNKNOWN_STAGE_REPLY
+    
+    stage_name = session.current_stage
+    reply = entry["handler"](session, user_input)
+    if session.current_stage != stage_name and session.current_stage not in entry["transitions"]:
+        print(f"Error in stage table: {stage_name} moved to undeclared stage {session.current_stage}")
+    return reply if reply is not None else UNKNOWN_STAGE_REPLY
+
+
+# Extract and analyze an uploaded resume (any object with name, type and getvalue()) into the session:
+# pre-fills empty candidate info, then drafts or prefetches technical questions for the extracted tech stack.
+# Returns (resume_text, resume_data); resume_data is None if the analysis failed.
+def upload_resume(session, uploaded_file, on_error=print):
+    # Returning candidates (same email/phone or a near-identical resume) are linked to their existing record;
+    # for a near-identical resume the earlier profile and contact details are reused instead of analyzing it again.
+    # Questions are always drafted anew, so a returning candidate isn't asked what they already answered.
+    file_hash, resume_text = get_cached_resume_text(uploaded_file, on_error)
+    match = find_known_candidate(session.candidate_info, resume_text) if resume_text else None
+    known = get_candidate_store().get(match["candidate_id"]) if match else None
+    if known is not None:
+        session.duplicate_of = match["candidate_id"]
+        get_metrics().count("duplicate_candidates", match=match["match"])
+    
+    if known is not None and match["match"] == "resume":
+        resume_data = resume_data_from_record(known["record"])
+        tentative_questions = []
+    elif not resume_text:
+        resume_data, tentative_questions = None, []
+    elif ONE_SHOT_ANALYSIS:
+        # Analyze (cached by file contents) and draft questions in one request
+        resume_data, tentative_questions = analyze_resume_text_one_shot(
+            file_hash, resume_text, session.candidate_info["desired_position"]
+        )
+    else:
+        resume_data = get_cached_resume_analysis(file_hash, resume_text)
+        tentative_questions = []
+    session.candidate_info["resume_text"] = resume_text
+    session.candidate_info["resume_filename"] = uploaded_file.name
+    
+    if resume_text and resume_data:
+        # Pre-fill candidate info from resume if fields are empty
+        apply_resume_data(session.candidate_info, resume_data)
+        
+        if tentative_questions:
+            session.tentative_questions = {
+                "tech_stack": list(session.candidate_info["tech_stack"]),
+                "questions": tentative_questions
+            }
+        else:
+            # Generate questions speculatively while the candidate reviews their tech stack
+            prefetch_technical_questions(session)
+    
+    # Mark as uploaded
+    session.resume_uploaded = True
+    return resume_text, resume_data
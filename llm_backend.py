@@ -0,0 +1,503 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from metrics import get_metrics
+from prompt_builder import CHARS_PER_TOKEN, estimate_tokens
+
+# Backend selection and limits (override with environment variables)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" or "stub"
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0.05"))
+LLM_STUB_RESPONSES = os.getenv("LLM_STUB_RESPONSES", "")
+
+# Per-call deadlines (seconds) by call type; a call that misses its deadline falls back like any other failure
+LLM_ANALYSIS_TIMEOUT = float(os.getenv("LLM_ANALYSIS_TIMEOUT", "30"))
+LLM_QUESTIONS_TIMEOUT = float(os.getenv("LLM_QUESTIONS_TIMEOUT", "20"))
+LLM_REPLY_TIMEOUT = float(os.getenv("LLM_REPLY_TIMEOUT", "15"))
+
+# Circuit breaker: opens when at least LLM_BREAKER_ERROR_RATE of the calls in the last LLM_BREAKER_WINDOW seconds
+# failed (given LLM_BREAKER_MIN_CALLS calls), then lets one probe call through every LLM_BREAKER_COOLDOWN seconds
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+LLM_BREAKER_WINDOW = float(os.getenv("LLM_BREAKER_WINDOW", "60"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+# Start one duplicate request if a call has not finished after this many seconds (0 disables hedging)
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+
+
+class LLMTimeoutError(TimeoutError):
+    pass
+
+
+# Raised without calling the model while the circuit breaker is open, so callers fall back immediately
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+# Error-rate circuit breaker shared by all calls to one backend and model.
+# closed: calls go through; open: calls fail fast; half_open: one probe call decides whether to close or reopen.
+# allow() hands out a ticket tagged with the breaker's generation, which changes on every state change;
+# outcomes reported with a ticket from an earlier generation (calls that were already running) are ignored.
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    # Gauge values for monitoring
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, labels, error_rate=LLM_BREAKER_ERROR_RATE, min_calls=LLM_BREAKER_MIN_CALLS,
+                 window=LLM_BREAKER_WINDOW, cooldown=LLM_BREAKER_COOLDOWN):
+        self.labels = labels
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._outcomes = deque()  # (monotonic time, ok)
+        self._probing = False
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # A ticket (generation, is probe) if a call may go to the model now, else None
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self._transition(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return (self._generation, True)
+            return (self._generation, False) if self.state == self.CLOSED else None
+
+    # Record the outcome of a call that allow() let through with this ticket (timeouts count as failures)
+    def record(self, ticket, ok):
+        with self._lock:
+            if ticket[0] != self._generation:
+                return
+            now = time.monotonic()
+            self._outcomes.append((now, ok))
+            self._trim(now)
+            if self.state == self.HALF_OPEN:
+                if ticket[1]:
+                    self._probing = False
+                    self._transition(self.CLOSED if ok else self.OPEN)
+            elif self.state == self.CLOSED and len(self._outcomes) >= self.min_calls \
+                    and self._failures() >= self.error_rate * len(self._outcomes):
+                self._transition(self.OPEN)
+
+    # A call that was let through ended without an outcome (e.g. a stream closed before its first chunk)
+    def release(self, ticket):
+        with self._lock:
+            if ticket == (self._generation, True):
+                self._probing = False
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _failures(self):
+        return sum(not ok for _, ok in self._outcomes)
+
+    def _transition(self, state):
+        self.state = state
+        self._generation += 1
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+            print(f"Model calls paused for {self.cooldown:.0f}s after repeated failures ({self.labels})")
+        elif state == self.CLOSED:
+            self._outcomes.clear()
+        metrics = get_metrics()
+        metrics.gauge("llm_circuit_state", self.STATE_VALUES[state], **self.labels)
+        metrics.count("llm_circuit_transitions", state=state, **self.labels)
+
+    def snapshot(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            calls = len(self._outcomes)
+            return {
+                **self.labels,
+                "state": self.state,
+                "calls": calls,
+                "error_rate": round(self._failures() / calls, 3) if calls else 0.0,
+                "open_for_s": round(max(0.0, self.cooldown - (time.monotonic() - self.opened_at)), 1)
+                if self.state == self.OPEN else 0.0,
+            }
+
+
+# One logical model request. With hedging, a duplicate attempt is started when the first is slow;
+# the first attempt to succeed wins, and the call only fails once every attempt has failed.
+class _ModelCall:
+    def __init__(self, executor, fn, args, labels):
+        self.future = Future()
+        self.hedged = False
+        self.winner = None
+        self._executor = executor
+        self._fn = fn
+        self._args = args
+        self._labels = labels
+        self._attempts = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._launch()
+
+    def _launch(self):
+        with self._lock:
+            self._attempts += 1
+            self._pending += 1
+            number = self._attempts
+        attempt = self._executor.submit(self._fn, *self._args)
+        attempt.add_done_callback(lambda done, number=number: self._finished(done, number))
+
+    def _finished(self, attempt, number):
+        with self._lock:
+            self._pending -= 1
+            if self.future.done():
+                return
+            error = attempt.exception()
+            if error is None:
+                self.winner = number
+                self.future.set_result(attempt.result())
+            elif not self._pending:
+                self.future.set_exception(error)
+
+    # Wait for the result; if hedge_after is set and shorter than the deadline, hedge once after that long
+    def result(self, timeout, hedge_after=0):
+        if 0 < hedge_after < timeout:
+            if not wait([self.future], timeout=hedge_after).done:
+                self.hedged = True
+                get_metrics().count("model_hedges", **self._labels)
+                self._launch()
+                timeout -= hedge_after
+        return self.future.result(timeout=timeout)
+
+
+# Minimal response object; callers only rely on .text, like the SDK response
+class LLMResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+# Base class: runs requests on a shared pool so every call gets a deadline, lets identical in-flight
+# requests share one underlying call, and fails fast through a circuit breaker while the model is failing.
+# Streams run on a pool of their own, so complete calls left running after their deadline can't starve them.
+class LLMBackend:
+    name = "base"
+
+    def __init__(self, model_name, timeout=LLM_TIMEOUT, max_concurrency=LLM_MAX_CONCURRENCY, hedge_after=LLM_HEDGE_AFTER):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.breaker = CircuitBreaker({"backend": self.name, "model": model_name})
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"llm-{self.name}")
+        self._stream_executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                                   thread_name_prefix=f"llm-{self.name}-stream")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    # Identifies the backend and model in cache keys, so stub output never masquerades as model output
+    @property
+    def cache_id(self):
+        return f"{self.name}:{self.model_name}"
+
+    def _request_key(self, prompt, generation_config, safety_settings):
+        payload = json.dumps([self.model_name, prompt, generation_config, safety_settings], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _short_circuit(self):
+        get_metrics().count("model_short_circuits", backend=self.name, model=self.model_name)
+        return CircuitOpenError(f"Model calls to {self.cache_id} are paused after repeated failures")
+
+    # Generate a complete response, raising LLMTimeoutError if it takes longer than timeout seconds
+    # and CircuitOpenError (without calling the model) while the breaker is open
+    def generate(self, prompt, generation_config=None, safety_settings=None, timeout=None):
+        timeout = timeout if timeout is not None else self.timeout
+        key = self._request_key(prompt, generation_config, safety_settings)
+        with self._lock:
+            model_call = self._in_flight.get(key)
+            shared = model_call is not None
+            if model_call is None:
+                ticket = self.breaker.allow()
+                if ticket is None:
+                    raise self._short_circuit()
+                model_call = _ModelCall(self._executor, self._generate,
+                                        (prompt, generation_config, safety_settings, timeout), self.breaker.labels)
+                self._in_flight[key] = model_call
+        if not shared:
+            # Outside the lock: the callback runs at once (and takes the lock) if the call already finished
+            model_call.future.add_done_callback(lambda _: self._forget(key, model_call))
+
+        # Only the caller that started the call reports its outcome to the breaker (and hedges it)
+        with get_metrics().timed("model.generate", backend=self.name, model=self.model_name,
+                                 prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt),
+                                 deduplicated=shared) as call:
+            try:
+                hedge_after = self.hedge_after if not shared and self.breaker.state == CircuitBreaker.CLOSED else 0
+                text = model_call.result(timeout, hedge_after=hedge_after)
+            except TimeoutError:
+                call["status"] = "timeout"
+                if not shared:
+                    self.breaker.record(ticket, False)
+                    # A stalled call is not shared with later identical requests; they start a fresh one
+                    self._forget(key, model_call)
+                raise LLMTimeoutError(f"Model call exceeded {timeout}s")
+            except Exception:
+                if not shared:
+                    self.breaker.record(ticket, False)
+                raise
+            if not shared:
+                self.breaker.record(ticket, True)
+            if model_call.hedged:
+                call["hedged"] = True
+                call["hedge_won"] = model_call.winner == 2
+            call["response_chars"] = len(text or "")
+            call["response_tokens"] = estimate_tokens(text)
+            return LLMResponse(text)
+
+    def _forget(self, key, model_call):
+        with self._lock:
+            if self._in_flight.get(key) is model_call:
+                del self._in_flight[key]
+
+    # Yield response text chunks as they are generated. Raises LLMTimeoutError if no chunk arrives
+    # within timeout seconds, and CircuitOpenError while the breaker is open.
+    def stream(self, prompt, generation_config=None, safety_settings=None, timeout=None):
+        timeout = timeout if timeout is not None else self.timeout
+        ticket = self.breaker.allow()
+        if ticket is None:
+            raise self._short_circuit()
+        start = time.perf_counter()
+        recorded = False
+        with get_metrics().timed("model.stream", backend=self.name, model=self.model_name,
+                                 prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt)) as call:
+            chunks = self._stream_with_deadline(prompt, generation_config, safety_settings, timeout)
+            try:
+                text_chars = 0
+                for chunk in chunks:
+                    if not recorded:
+                        # The first chunk shows the model is answering; later failures are the caller's to handle
+                        self.breaker.record(ticket, True)
+                        recorded = True
+                        call["first_chunk_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                    text_chars += len(chunk)
+                    call["response_chars"] = text_chars
+                    call["response_tokens"] = -(-text_chars // CHARS_PER_TOKEN)
+                    yield chunk
+            except Exception as e:
+                if isinstance(e, LLMTimeoutError):
+                    call["status"] = "timeout"
+                if not recorded:
+                    self.breaker.record(ticket, False)
+                    recorded = True
+                raise
+            finally:
+                chunks.close()
+                if not recorded:
+                    self.breaker.release(ticket)
+
+    # Run _stream on the stream pool and hand its chunks over through a queue, so waiting for each chunk has a deadline.
+    # The whole stream is bounded by the backend timeout (or the chunk deadline, if longer), so an abandoned
+    # stream gives its thread back once the underlying request times out.
+    def _stream_with_deadline(self, prompt, generation_config, safety_settings, timeout):
+        chunks = queue.Queue()
+        stop = threading.Event()
+        request_timeout = max(timeout, self.timeout)
+
+        def produce():
+            try:
+                for chunk in self._stream(prompt, generation_config, safety_settings, request_timeout):
+                    if stop.is_set():
+                        return
+                    chunks.put((chunk, None))
+                chunks.put((None, None))
+            except Exception as e:
+                chunks.put((None, e))
+
+        self._stream_executor.submit(produce)
+        try:
+            while True:
+                try:
+                    chunk, error = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise LLMTimeoutError(f"No response from the model for {timeout}s")
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            stop.set()
+
+    # Subclasses yield response text chunks, giving up on the request after timeout seconds
+    def _stream(self, prompt, generation_config, safety_settings, timeout):
+        raise NotImplementedError
+
+    # Subclasses return the full response text, giving up on the request after timeout seconds.
+    # The caller stops waiting at its deadline either way; this frees the pool thread as well.
+    def _generate(self, prompt, generation_config, safety_settings, timeout):
+        raise NotImplementedError
+
+
+# Google Gemini backend holding one long-lived model (and SDK client) per process
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, model_name, api_key=None, **kwargs):
+        super().__init__(model_name, **kwargs)
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE"))
+        self._model = genai.GenerativeModel(model_name)
+
+    def _generate(self, prompt, generation_config, safety_settings, timeout):
+        response = self._model.generate_content(
+            prompt,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            request_options={"timeout": timeout}
+        )
+        return response.text
+
+    def _stream(self, prompt, generation_config, safety_settings, timeout):
+        response = self._model.generate_content(
+            prompt,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            stream=True,
+            request_options={"timeout": timeout}
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+_email = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_phone = re.compile(r'\+?\d[\d\s\-\(\)]{8,}\d')
+_years = re.compile(r'(\d+)\+?\s*years?', re.IGNORECASE)
+_tech_list = re.compile(r'technologies:\s*(.+?)\.\s*$', re.MULTILINE)
+_tech_topic = re.compile(r'questions about (.+?) for a')
+_question_count = re.compile(r'Generate (\d+) technical')
+_scoring_item = re.compile(r'^[ \t]*Item (\d+)\nQuestion: .*\nAnswer: (.*)$', re.MULTILINE)
+
+STUB_TECHNOLOGIES = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "C#", "Ruby", "PHP", "SQL",
+    "React", "Angular", "Vue", "Django", "Flask", "FastAPI", "Spring", "Node.js",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Docker", "Kubernetes", "AWS", "GCP", "Azure"
+]
+
+
+# Offline backend returning canned or templated responses after a configurable delay.
+# Used for load tests and for measuring the app's own overhead without the network.
+class StubBackend(LLMBackend):
+    name = "stub"
+
+    def __init__(self, model_name, latency=LLM_STUB_LATENCY, responses_path=LLM_STUB_RESPONSES, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.latency = latency
+        # Optional JSON file mapping a prompt substring to a canned response
+        self.canned = {}
+        if responses_path:
+            with open(responses_path, "r") as f:
+                self.canned = json.load(f)
+
+    def _respond(self, prompt):
+        for needle, response in self.canned.items():
+            if needle in prompt:
+                return response
+        if "exactly two keys" in prompt:
+            profile = self._profile(prompt)
+            techs = [t.strip() for t in profile["tech_stack"].split(",") if t.strip()] or ["software engineering"]
+            return json.dumps({"profile": profile, "questions": self._questions(techs, 5)})
+        if "JSON array of scores" in prompt:
+            # Longer answers score higher, so results are deterministic but not constant
+            return json.dumps([
+                {"item": int(number), "score": min(5, 1 + len(answer.split()) // 8), "rationale": "Stub score based on answer length."}
+                for number, answer in _scoring_item.findall(prompt)
+            ])
+        if "JSON object with these keys" in prompt:
+            return json.dumps(self._profile(prompt))
+        if "numbered list of questions" in prompt:
+            count_match = _question_count.search(prompt)
+            count = int(count_match.group(1)) if count_match else 5
+            techs = self._prompt_techs(prompt) or ["software engineering"]
+            return "\n".join(f"{i+1}. {q}" for i, q in enumerate(self._questions(techs, count)))
+        return ("Thank you for your question. A recruiter will review your application and contact you "
+                "within 3-5 business days to discuss the next steps.")
+
+    def _prompt_techs(self, prompt):
+        match = _tech_list.search(prompt) or _tech_topic.search(prompt)
+        if not match:
+            return []
+        return [t.strip() for t in match.group(1).split(",") if t.strip()]
+
+    def _profile(self, prompt):
+        email = _email.search(prompt)
+        phone = _phone.search(prompt)
+        years = _years.search(prompt)
+        lowered = prompt.lower()
+        techs = [t for t in STUB_TECHNOLOGIES if re.search(r'(?<![\w+#])' + re.escape(t.lower()) + r'(?![\w+#])', lowered)]
+        return {
+            "name": "Stub Candidate",
+            "email": email.group() if email else "",
+            "phone": re.sub(r'[^0-9]', '', phone.group()) if phone else "",
+            "experience": f"{years.group(1)} years" if years else "",
+            "position": "Software Engineer",
+            "location": "",
+            "tech_stack": ", ".join(techs)
+        }
+
+    def _questions(self, techs, count):
+        templates = [
+            "Explain a core concept of {tech} that you use most often.",
+            "Describe a project where you used {tech} and a problem you had to solve.",
+            "How do you debug and profile performance issues in {tech}?",
+            "What are common pitfalls when working with {tech} and how do you avoid them?",
+            "How would you structure a large codebase or system that uses {tech}?",
+        ]
+        return [templates[(i // len(techs)) % len(templates)].format(tech=techs[i % len(techs)]) for i in range(count)]
+
+    def _generate(self, prompt, generation_config, safety_settings, timeout):
+        time.sleep(self.latency)
+        return self._respond(prompt)
+
+    def _stream(self, prompt, generation_config, safety_settings, timeout):
+        text = self._respond(prompt)
+        words = text.split(" ")
+        # Spread the configured latency over the chunks, like a token stream
+        delay = self.latency / max(1, len(words))
+        for i, word in enumerate(words):
+            time.sleep(delay)
+            yield word if i == len(words) - 1 else word + " "
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+# Circuit breaker state of every backend created in this process (none are created here)
+def backend_health():
+    return [backend.breaker.snapshot() for _, backend in sorted(_backends.items())]
+
+# Process-wide backend per model name, created on first use and reused across reruns and sessions
+def get_backend(model_name, backend=None):
+    backend = backend or LLM_BACKEND
+    key = (backend, model_name)
+    if key not in _backends:
+        with _backends_lock:
+            if key not in _backends:
+                if backend not in BACKENDS:
+                    raise ValueError(f"Unknown LLM backend: {backend}. Choose one of: {', '.join(BACKENDS)}")
+                _backends[key] = BACKENDS[backend](model_name)
+    return _backends[key]
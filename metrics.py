@@ -0,0 +1,347 @@
+import atexit
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Metrics configuration (override with environment variables)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_LOG_PATH = os.getenv("METRICS_LOG_PATH", os.path.join("data", "metrics.jsonl"))
+METRICS_LOG_MAX_BYTES = int(os.getenv("METRICS_LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "2000"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 disables the Prometheus endpoint
+# Time budgets for Streamlit script runs: the first run in a process (including app imports) and every rerun after it
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+RERUN_BUDGET_MS = float(os.getenv("RERUN_BUDGET_MS", "150"))
+
+QUANTILES = (0.5, 0.95)
+PROMETHEUS_PREFIX = "talentscout"
+
+
+# Value at quantile q (0..1) of a list of numbers, using the nearest-rank method
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(q * len(ordered)))) - 1]
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+
+# In-process metrics: rolling duration samples per timer, counters, and an append-only JSONL event log
+# that rotates to <path>.1 once it grows past max_bytes (so other processes and the dashboard can read it).
+# Events are handed to a background writer thread, so recording one never waits on the disk.
+class Metrics:
+    def __init__(self, log_path=METRICS_LOG_PATH, max_bytes=METRICS_LOG_MAX_BYTES, window=METRICS_WINDOW,
+                 enabled=METRICS_ENABLED):
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._samples = defaultdict(lambda: deque(maxlen=window))  # timer name -> recent durations (seconds)
+        self._timer_totals = defaultdict(lambda: [0, 0.0])  # timer name -> [count, sum of seconds]
+        self._counters = defaultdict(float)  # (name, sorted label items) -> value
+        self._gauges = {}  # (name, sorted label items) -> current value
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    def _write(self, event):
+        if not self.log_path:
+            return
+        self._queue.put(event)
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="metrics-writer", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+
+    # Writer thread: drain whatever is queued and append it in one go
+    def _write_loop(self):
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [json.dumps(item, separators=(",", ":"), default=str) + "\n"
+                     for item in items if not isinstance(item, threading.Event)]
+            if lines:
+                self._append("".join(lines))
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    # Append and rotate while holding <path>.lock, so processes sharing the log never write to a file
+    # that another one has just rotated away or rotate it twice
+    def _append(self, text):
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path + ".lock", "a") as lock_file:
+                try:
+                    import fcntl
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                except ImportError:
+                    pass
+                with open(self.log_path, "a") as log:
+                    log.write(text)
+                    size = log.tell()
+                if size > self.max_bytes:
+                    os.replace(self.log_path, self.log_path + ".1")
+        except OSError as e:
+            print(f"Error writing metrics: {str(e)}")
+
+    # Wait until every event recorded so far has been written to the log
+    def flush(self, timeout=5):
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    # Increment a counter, e.g. count("fallback", source="generate_technical_questions")
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+        self._write({"ts": round(time.time(), 3), "type": "counter", "name": name, "value": value, **labels})
+
+    # Set a gauge to its current value, e.g. gauge("llm_circuit_state", 2, backend="gemini")
+    def gauge(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+        self._write({"ts": round(time.time(), 3), "type": "gauge", "name": name, "value": value, **labels})
+
+    # Record one timed event. Numeric *_tokens / *_chars fields are also summed into counters,
+    # and a boolean cache_hit field into a cache counter.
+    def observe(self, name, seconds, **fields):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples[name].append(seconds)
+            totals = self._timer_totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+            for key, value in fields.items():
+                if isinstance(value, bool):
+                    if key == "cache_hit":
+                        self._counters[("cache_lookups", (("hit", str(value).lower()), ("timer", name)))] += 1
+                elif isinstance(value, (int, float)) and (key.endswith("_tokens") or key.endswith("_chars")):
+                    self._counters[(key, (("timer", name),))] += value
+        self._write({
+            "ts": round(time.time(), 3),
+            "type": "timer",
+            "name": name,
+            "duration_ms": round(seconds * 1000, 3),
+            **fields
+        })
+
+    # Time a block. The yielded dict can be filled with extra fields (sizes, cache_hit, fallback, ...).
+    # status is "error" if the block raises.
+    @contextmanager
+    def timed(self, name, **fields):
+        start = time.perf_counter()
+        fields.setdefault("status", "ok")
+        try:
+            yield fields
+        except Exception:
+            fields["status"] = "error"
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    # Time a generator until it is exhausted or closed, also recording time to first chunk.
+    # start (a time.perf_counter() value) defaults to the first iteration. Text chunks are measured as response_chars.
+    def timed_iter(self, name, iterable, start=None, **fields):
+        start = start if start is not None else time.perf_counter()
+        fields.setdefault("status", "ok")
+        chars = 0
+        try:
+            for chunk in iterable:
+                if "first_chunk_ms" not in fields:
+                    fields["first_chunk_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                if isinstance(chunk, str):
+                    chars += len(chunk)
+                yield chunk
+        except Exception:
+            fields["status"] = "error"
+            raise
+        finally:
+            fields.setdefault("response_chars", chars)
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    # p50/p95/count/mean per timer from the in-memory window
+    def summary(self):
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            totals = {name: tuple(values) for name, values in self._timer_totals.items()}
+        result = {}
+        for name, values in samples.items():
+            count, total = totals[name]
+            result[name] = {
+                "count": count,
+                "mean_ms": total / count * 1000 if count else None,
+                **{f"p{int(q * 100)}_ms": percentile(values, q) * 1000 for q in QUANTILES}
+            }
+        return result
+
+    # Metrics in the Prometheus text exposition format
+    def prometheus_text(self):
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            totals = {name: tuple(values) for name, values in self._timer_totals.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_duration_seconds Wall time of interview stages, resume processing and model calls",
+            f"# TYPE {PROMETHEUS_PREFIX}_duration_seconds summary",
+        ]
+        for name in sorted(samples):
+            for q in QUANTILES:
+                labels = _format_labels([("name", name), ("quantile", q)])
+                lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds{labels} {percentile(samples[name], q):.6f}")
+            count, total = totals[name]
+            labels = _format_labels([("name", name)])
+            lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds_sum{labels} {total:.6f}")
+            lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds_count{labels} {count}")
+
+        by_name = defaultdict(list)
+        for (name, labels), value in counters.items():
+            by_name[name].append((labels, value))
+        for name in sorted(by_name):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(by_name[name]):
+                lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        by_name = defaultdict(list)
+        for (name, labels), value in gauges.items():
+            by_name[name].append((labels, value))
+        for name in sorted(by_name):
+            metric = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in sorted(by_name[name]):
+                lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+# Read events from the JSONL log (and its rotated predecessor), oldest first
+def load_events(path=METRICS_LOG_PATH, since=None):
+    events = []
+    for file_path in (path + ".1", path):
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # partially written line from a concurrent writer
+                if since is None or event.get("ts", 0) >= since:
+                    events.append(event)
+    return events
+
+# Per-timer count, p50, p95 and mean (milliseconds) computed from logged events
+def summarize_events(events):
+    durations = defaultdict(list)
+    for event in events:
+        if event.get("type") == "timer":
+            durations[event["name"]].append(event["duration_ms"])
+    return {
+        name: {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.5),
+            "p95_ms": percentile(values, 0.95),
+            "mean_ms": sum(values) / len(values),
+        }
+        for name, values in durations.items()
+    }
+
+
+# Serve /metrics on the given port from a daemon thread (http.server is only imported when enabled)
+def start_metrics_server(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = get_metrics().prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+# Process-wide metrics; also starts the Prometheus endpoint when METRICS_PORT is set
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+                if METRICS_PORT:
+                    try:
+                        start_metrics_server(METRICS_PORT)
+                    except OSError as e:
+                        print(f"Error starting metrics endpoint: {str(e)}")
+    return _metrics
+
+
+_script_runs = {"startup_ms": None, "last_rerun_ms": None}
+_script_runs_lock = threading.Lock()
+
+# Record one Streamlit script run against its budget. The first run in the process is recorded as
+# "startup" (it includes importing the app), later runs as "rerun". Runs over budget are logged and counted.
+def record_script_run(seconds):
+    elapsed_ms = seconds * 1000
+    with _script_runs_lock:
+        name = "startup" if _script_runs["startup_ms"] is None else "rerun"
+        _script_runs["startup_ms" if name == "startup" else "last_rerun_ms"] = elapsed_ms
+    budget_ms = STARTUP_BUDGET_MS if name == "startup" else RERUN_BUDGET_MS
+    metrics = get_metrics()
+    metrics.observe(name, seconds, budget_ms=budget_ms, over_budget=elapsed_ms > budget_ms)
+    if elapsed_ms > budget_ms:
+        metrics.count("budget_exceeded", timer=name)
+        print(f"Warning: {name} took {elapsed_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+
+# Startup time, last rerun time and rerun p50/p95 for this process, with their budgets (milliseconds)
+def script_run_report():
+    reruns = get_metrics().summary().get("rerun", {})
+    with _script_runs_lock:
+        return {
+            "startup_ms": _script_runs["startup_ms"],
+            "startup_budget_ms": STARTUP_BUDGET_MS,
+            "last_rerun_ms": _script_runs["last_rerun_ms"],
+            "rerun_p50_ms": reruns.get("p50_ms"),
+            "rerun_p95_ms": reruns.get("p95_ms"),
+            "rerun_budget_ms": RERUN_BUDGET_MS,
+        }
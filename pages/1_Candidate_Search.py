@@ -0,0 +1,51 @@
+import streamlit as st
+from candidate_search import get_search_index
+from candidate_store import get_candidate_store
+
+# Recruiter page: ranked search over completed interviews
+def main():
+    st.set_page_config(page_title="TalentScout Candidate Search", page_icon="🔎")
+    st.title("Candidate Search")
+
+    query = st.text_input("Skills or keywords", placeholder="e.g. python kafka microservices")
+    col1, col2 = st.columns(2)
+    with col1:
+        location = st.text_input("Location contains", placeholder="e.g. Berlin")
+    with col2:
+        min_experience = st.number_input("Minimum years of experience", min_value=0.0, value=0.0, step=1.0)
+    limit = st.slider("Results", min_value=5, max_value=100, value=20)
+
+    if not query and not location:
+        st.info("Enter skills or keywords to search candidates.")
+        return
+
+    results = get_search_index().search(
+        query,
+        location=location or None,
+        min_experience=min_experience or None,
+        limit=limit
+    )
+    if not results:
+        st.warning("No candidates match your search.")
+        return
+
+    store = get_candidate_store()
+    rows = []
+    for candidate_id, score in results:
+        candidate = store.get(candidate_id)
+        if candidate is None:
+            continue
+        rows.append({
+            "Score": score,
+            "Name": candidate["name"],
+            "Email": candidate["email"],
+            "Location": candidate["location"],
+            "Experience (years)": candidate["experience_years"],
+            "Position": candidate["desired_position"],
+            "Tech Stack": ", ".join(store.technologies(candidate_id)),
+            "Answer Score": store.average_answer_score(candidate_id),
+        })
+    st.dataframe(rows, use_container_width=True)
+
+
+main()
@@ -0,0 +1,137 @@
+import time
+from collections import defaultdict
+
+import streamlit as st
+from llm_backend import CircuitBreaker, backend_health
+from metrics import METRICS_LOG_PATH, load_events, summarize_events
+
+WINDOWS = {
+    "Last hour": 3600,
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "All logged": None,
+}
+
+
+STATE_NAMES = {value: state for state, value in CircuitBreaker.STATE_VALUES.items()}
+
+
+# Recruiter page: latency percentiles per interview stage and model call, model health, plus cache and fallback counts
+def main():
+    st.set_page_config(page_title="TalentScout Metrics", page_icon="📊")
+    st.title("Interview Metrics")
+
+    window = st.selectbox("Time window", list(WINDOWS))
+    since = time.time() - WINDOWS[window] if WINDOWS[window] else None
+    events = load_events(METRICS_LOG_PATH, since=since)
+    if not events:
+        st.info(f"No metrics recorded yet. Events are logged to {METRICS_LOG_PATH}.")
+        return
+
+    st.subheader("Latency by stage")
+    summary = summarize_events(events)
+    st.dataframe(
+        [
+            {
+                "Stage": name,
+                "Count": stats["count"],
+                "p50 (ms)": round(stats["p50_ms"], 1),
+                "p95 (ms)": round(stats["p95_ms"], 1),
+                "Mean (ms)": round(stats["mean_ms"], 1),
+            }
+            for name, stats in sorted(summary.items())
+        ],
+        use_container_width=True
+    )
+
+    # Model call volume: prompt/response tokens, timeouts and in-flight deduplication
+    model_rows = defaultdict(lambda: {"Calls": 0, "Prompt tokens": 0, "Response tokens": 0, "Timeouts": 0, "Deduplicated": 0})
+    cache_rows = defaultdict(lambda: {"Hits": 0, "Misses": 0})
+    counters = defaultdict(float)
+    health_rows = defaultdict(lambda: {"Calls": 0, "Errors": 0, "Timeouts": 0, "Short-circuited": 0, "Hedged": 0, "Hedge wins": 0})
+    breaker_states = {}
+    for event in events:
+        if event.get("type") == "gauge":
+            if event["name"] == "llm_circuit_state":
+                breaker_states[(event.get("backend", ""), event.get("model", ""))] = (event["ts"], event["value"])
+            continue
+        if event.get("type") == "counter":
+            label = event.get("source") or event.get("result") or event.get("state") or ""
+            counters[(event["name"], label)] += event.get("value", 1)
+            if event["name"] == "model_short_circuits":
+                health_rows[(event.get("backend", ""), event.get("model", ""))]["Short-circuited"] += event.get("value", 1)
+            continue
+        if event["name"].startswith("model.") and not event.get("deduplicated"):
+            row = health_rows[(event.get("backend", ""), event.get("model", ""))]
+            row["Calls"] += 1
+            row["Errors"] += event.get("status", "ok") != "ok"
+            row["Timeouts"] += event.get("status") == "timeout"
+            row["Hedged"] += bool(event.get("hedged"))
+            row["Hedge wins"] += bool(event.get("hedge_won"))
+        if event["name"].startswith("model."):
+            row = model_rows[(event["name"], event.get("backend", ""), event.get("model", ""))]
+            row["Calls"] += 1
+            row["Prompt tokens"] += event.get("prompt_tokens", 0)
+            row["Response tokens"] += event.get("response_tokens", 0)
+            row["Timeouts"] += event.get("status") == "timeout"
+            row["Deduplicated"] += bool(event.get("deduplicated"))
+        if "cache_hit" in event:
+            cache_rows[event["name"]]["Hits" if event["cache_hit"] else "Misses"] += 1
+
+    if model_rows:
+        st.subheader("Model calls")
+        st.dataframe(
+            [{"Call": name, "Backend": backend, "Model": model, **row} for (name, backend, model), row in sorted(model_rows.items())],
+            use_container_width=True
+        )
+
+    # Circuit breaker state (live for this process, last logged change otherwise) and how often callers fell back
+    live = {(health["backend"], health["model"]): health for health in backend_health()}
+    if health_rows or live or breaker_states:
+        st.subheader("Model health")
+        rows = []
+        for key in sorted(set(health_rows) | set(live) | set(breaker_states)):
+            row = health_rows[key]
+            attempted = row["Calls"] + row["Short-circuited"]
+            if key in live:
+                state = live[key]["state"]
+            else:
+                state = STATE_NAMES.get(breaker_states[key][1], "") if key in breaker_states else "closed"
+            rows.append({
+                "Backend": key[0],
+                "Model": key[1],
+                "Breaker": state,
+                **row,
+                "Error rate": f"{row['Errors'] / row['Calls']:.0%}" if row["Calls"] else "-",
+                "Short-circuit rate": f"{row['Short-circuited'] / attempted:.0%}" if attempted else "-",
+            })
+        st.dataframe(rows, use_container_width=True)
+
+        fallbacks = {label: value for (name, label), value in counters.items() if name == "fallback"}
+        model_calls = sum(row["Calls"] + row["Short-circuited"] for row in health_rows.values())
+        if fallbacks and model_calls:
+            st.caption(f"Fallback rate: {sum(fallbacks.values()) / model_calls:.1%} of model calls")
+            st.dataframe(
+                [{"Source": source, "Fallbacks": int(value), "Rate": f"{value / model_calls:.1%}"} for source, value in sorted(fallbacks.items())],
+                use_container_width=True
+            )
+
+    if cache_rows:
+        st.subheader("Cache hit rate")
+        st.dataframe(
+            [
+                {"Stage": name, **row, "Hit rate": f"{row['Hits'] / (row['Hits'] + row['Misses']):.0%}"}
+                for name, row in sorted(cache_rows.items())
+            ],
+            use_container_width=True
+        )
+
+    if counters:
+        st.subheader("Fallbacks and question bank lookups")
+        st.dataframe(
+            [{"Counter": name, "Source / result": label, "Count": int(value)} for (name, label), value in sorted(counters.items())],
+            use_container_width=True
+        )
+
+
+main()
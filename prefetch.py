@@ -0,0 +1,69 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Process-wide executor shared by all sessions
+def get_prefetch_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+                atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+    return _executor
+
+
+# Per-session registry of speculative background work, keyed by a hashable key.
+# Registries live in interview_engine._prefetch_registries, a module-level dict keyed by session id, so the
+# futures survive Streamlit reruns. end_session() cancels and drops a session's registry; beyond the
+# PREFETCH_SESSIONS most recent sessions, the least recently used registry is evicted and its work cancelled.
+class PrefetchRegistry:
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    # Start fn(*args) in the background unless work for key is already registered.
+    # Work registered under other keys is cancelled, since it was for stale inputs.
+    def submit(self, key, fn, *args):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.cancelled():
+                return future
+            self._cancel_others(key)
+            future = get_prefetch_executor().submit(fn, *args)
+            self._futures[key] = future
+            return future
+
+    def _cancel_others(self, key):
+        for other_key in list(self._futures):
+            if other_key != key:
+                # Work that is already running can't be interrupted; its result is simply dropped
+                self._futures.pop(other_key).cancel()
+
+    def keys(self):
+        with self._lock:
+            return list(self._futures)
+
+    # Result for key, waiting up to timeout seconds; None if missing, cancelled or failed
+    def result(self, key, timeout=None):
+        with self._lock:
+            future = self._futures.get(key)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            print(f"Prefetch failed: {str(e)}")
+            return None
+
+    def cancel_all(self):
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
@@ -0,0 +1,202 @@
+import math
+import os
+import re
+
+from tech_normalize import ALIAS_LOOKUP, tech_key
+
+# Per-section token budgets (override with environment variables)
+RESUME_ANALYSIS_TOKENS = int(os.getenv("PROMPT_RESUME_ANALYSIS_TOKENS", "3000"))
+RESUME_QUESTION_TOKENS = int(os.getenv("PROMPT_RESUME_QUESTION_TOKENS", "1200"))
+TECH_STACK_TOKENS = int(os.getenv("PROMPT_TECH_STACK_TOKENS", "200"))
+USER_INPUT_TOKENS = int(os.getenv("PROMPT_USER_INPUT_TOKENS", "500"))
+FIELD_TOKENS = int(os.getenv("PROMPT_FIELD_TOKENS", "64"))
+
+# Rough size of a token in characters, good enough for budgeting English text
+CHARS_PER_TOKEN = 4
+# Sections longer than this are split further so one huge section can't crowd out the rest
+SECTION_MAX_TOKENS = 300
+OMITTED_MARKER = "[...]"
+
+# Resume sections that are worth keeping even when their keyword density is low
+SECTION_WEIGHTS = {
+    "skills": 2.0,
+    "technical skills": 2.0,
+    "technologies": 2.0,
+    "experience": 1.5,
+    "work experience": 1.5,
+    "professional experience": 1.5,
+    "employment": 1.5,
+    "summary": 1.3,
+    "profile": 1.3,
+    "projects": 1.2,
+    "certifications": 1.0,
+    "education": 0.8,
+    "interests": 0.3,
+    "hobbies": 0.3,
+    "references": 0.2,
+}
+
+# Words that mark resume content the prompts ask about (experience, roles, locations)
+PROFILE_KEYWORDS = {
+    "experience", "years", "engineer", "developer", "lead", "senior", "architect", "manager",
+    "built", "designed", "developed", "implemented", "deployed", "migrated", "optimized",
+    "skills", "technologies", "stack", "frameworks", "tools", "languages",
+}
+
+_word = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_blank_lines = re.compile(r"\n\s*\n")
+_header = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{1,40}?)\s*:?\s*$")
+
+
+# Cheap token estimate (about four characters per token) used for all budgets
+def estimate_tokens(text):
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+# Cut text to at most budget tokens, ending on a word boundary
+def truncate_to_tokens(text, budget):
+    text = str(text or "")
+    max_chars = budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + " " + OMITTED_MARKER
+
+# Join list items (e.g. technologies) until the token budget is used up
+def join_within_budget(items, budget, separator=", "):
+    kept = []
+    used = 0
+    for item in items:
+        cost = estimate_tokens(str(item) + separator)
+        if kept and used + cost > budget:
+            break
+        kept.append(str(item))
+        used += cost
+    return separator.join(kept)
+
+def _section_weight(header):
+    if not header:
+        return 1.0
+    return SECTION_WEIGHTS.get(" ".join(header.lower().split()), 1.0)
+
+def _is_header(line):
+    match = _header.match(line)
+    if not match:
+        return None
+    title = match.group(1)
+    if title.lower() in SECTION_WEIGHTS or title.isupper() or line.rstrip().endswith(":"):
+        return title
+    return None
+
+# Split resume text into (header, text) sections at lines that look like section titles.
+# Oversized sections are further split at blank lines and, failing that, at line breaks.
+def split_sections(text):
+    sections = []
+    header = None
+    lines = []
+    for line in text.split("\n"):
+        title = _is_header(line)
+        if title and len(title.split()) <= 4:
+            if lines:
+                sections.append((header, "\n".join(lines).strip()))
+            header = title
+            lines = [line]
+        else:
+            lines.append(line)
+    if lines:
+        sections.append((header, "\n".join(lines).strip()))
+
+    result = []
+    for header, body in sections:
+        if body:
+            result.extend((header, chunk) for chunk in _split_large(body))
+    return result
+
+def _split_large(text):
+    if estimate_tokens(text) <= SECTION_MAX_TOKENS:
+        return [text]
+    parts = [p for p in _blank_lines.split(text) if p.strip()]
+    if len(parts) == 1:
+        parts = [p for p in text.split("\n") if p.strip()]
+    chunks = []
+    current = ""
+    for part in parts:
+        part = truncate_to_tokens(part, SECTION_MAX_TOKENS)
+        if current and estimate_tokens(current) + estimate_tokens(part) > SECTION_MAX_TOKENS:
+            chunks.append(current)
+            current = part
+        else:
+            current = f"{current}\n{part}" if current else part
+    if current:
+        chunks.append(current)
+    return chunks
+
+# Keyword set for scoring: every known technology alias plus profile words and any extra terms
+def build_keywords(extra=()):
+    keywords = set(PROFILE_KEYWORDS)
+    keywords.update(key for key in ALIAS_LOOKUP if " " not in key)
+    for term in extra:
+        keywords.update(_word.findall(str(term).lower()))
+        keywords.add(tech_key(term))
+    return keywords
+
+# Keyword density of a section (keyword hits per word), scaled by how useful its section type is
+def score_section(header, text, keywords):
+    words = _word.findall(text.lower())
+    if not words:
+        return 0.0
+    hits = sum(1 for word in words if word in keywords or word.rstrip(".") in keywords)
+    return hits / len(words) * _section_weight(header)
+
+# Fit resume text into budget tokens. Short resumes are returned unchanged; longer ones keep the
+# opening section (contact details) and then the densest sections, in their original order.
+def select_resume_text(text, budget, focus=()):
+    text = (text or "").strip()
+    if estimate_tokens(text) <= budget:
+        return text
+
+    sections = split_sections(text)
+    if not sections:
+        return truncate_to_tokens(text, budget)
+
+    keywords = build_keywords(focus)
+    selected = {0: truncate_to_tokens(sections[0][1], budget // 4)}
+    remaining = budget - estimate_tokens(selected[0])
+
+    ranked = sorted(
+        range(1, len(sections)),
+        key=lambda i: score_section(sections[i][0], sections[i][1], keywords),
+        reverse=True
+    )
+    for i in ranked:
+        cost = estimate_tokens(sections[i][1]) + 1
+        if cost <= remaining:
+            selected[i] = sections[i][1]
+            remaining -= cost
+        if remaining < 16:
+            break
+
+    parts = []
+    previous = -1
+    for i in sorted(selected):
+        if i != previous + 1:
+            parts.append(OMITTED_MARKER)
+        parts.append(selected[i])
+        previous = i
+    if previous != len(sections) - 1:
+        parts.append(OMITTED_MARKER)
+    return "\n\n".join(parts)
+
+# Candidate info for prompts: no resume text, every field capped at FIELD_TOKENS
+def prompt_candidate_info(candidate_info):
+    info = {}
+    for key, value in candidate_info.items():
+        if key in ("resume_text", "resume_filename"):
+            continue
+        if isinstance(value, list):
+            info[key] = join_within_budget(value, TECH_STACK_TOKENS)
+        else:
+            info[key] = truncate_to_tokens(value, FIELD_TOKENS)
+    return info
@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+
+from tech_normalize import canonical_tech, tech_key
+
+BANK_PATH = os.getenv("QUESTION_BANK_PATH", os.path.join("data", "question_bank.json"))
+LEVELS = ["junior", "mid", "senior"]
+QUESTIONS_PER_INTERVIEW = 5
+
+_number_prefix = re.compile(r'^\s*\d+[\.\)]\s*')
+_years = re.compile(r'\d+(?:\.\d+)?')
+
+
+# Map free-text experience (e.g. "5 years") to a seniority level
+def seniority_level(experience):
+    match = _years.search(str(experience or ""))
+    if not match:
+        return "mid"
+    years = float(match.group())
+    if years < 2:
+        return "junior"
+    if years < 5:
+        return "mid"
+    return "senior"
+
+# Strip any "1." style prefix from a question
+def strip_number(question):
+    return _number_prefix.sub("", question).strip()
+
+# Number questions as "1. ...", "2. ..." in the format the interview flow expects
+def number_questions(questions):
+    return [{"question": f"{i+1}. {strip_number(q)}", "answer": None} for i, q in enumerate(questions)]
+
+
+# Precomputed questions per technology and seniority level, indexed in memory by technology
+class QuestionBank:
+    def __init__(self, path=BANK_PATH):
+        self.path = path
+        self.index = {}  # normalized technology -> {level: [question, ...]}
+        self.display_names = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            for tech, entry in data.get("technologies", {}).items():
+                self.add(entry.get("name", tech), entry.get("levels", {}))
+
+    def add(self, tech, questions_by_level):
+        key = tech_key(tech)
+        self.display_names.setdefault(key, canonical_tech(tech))
+        levels = self.index.setdefault(key, {})
+        for level, questions in questions_by_level.items():
+            existing = levels.setdefault(level, [])
+            for question in questions:
+                question = strip_number(question)
+                if question and question not in existing:
+                    existing.append(question)
+
+    def covers(self, tech):
+        return tech_key(tech) in self.index
+
+    def save(self):
+        data = {
+            "version": 1,
+            "technologies": {
+                key: {"name": self.display_names[key], "levels": levels}
+                for key, levels in sorted(self.index.items())
+            }
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    # Pick up to `needed` questions for one technology, preferring the requested level
+    # and falling back to the nearest other levels
+    def _pick(self, key, level, needed):
+        levels = self.index.get(key, {})
+        order = sorted(LEVELS, key=lambda other: abs(LEVELS.index(other) - LEVELS.index(level)))
+        picked = []
+        for other in order:
+            pool = levels.get(other) or []
+            picked.extend(random.sample(pool, min(needed - len(picked), len(pool))))
+            if len(picked) >= needed:
+                break
+        return picked
+
+    # Assign question slots round-robin across the tech stack and fill the slots of covered technologies.
+    # Returns (questions, uncovered) where uncovered maps each technology the bank lacks to its slot count.
+    def assemble(self, tech_stack, experience="", count=QUESTIONS_PER_INTERVIEW):
+        level = seniority_level(experience)
+        techs = []
+        seen = set()
+        for tech in tech_stack:
+            key = tech_key(tech)
+            if key and key not in seen:
+                seen.add(key)
+                techs.append((key, tech))
+        if not techs:
+            return [], {}
+
+        slots = {}
+        for i in range(count):
+            key, tech = techs[i % len(techs)]
+            slots[(key, tech)] = slots.get((key, tech), 0) + 1
+
+        questions = []
+        uncovered = {}
+        for (key, tech), needed in slots.items():
+            picked = self._pick(key, level, needed)
+            questions.extend(picked)
+            if len(picked) < needed:
+                uncovered[tech] = needed - len(picked)
+        return questions, uncovered
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+# Process-wide question bank, loaded once
+def get_question_bank():
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank()
+    return _bank
+
+
+# Ask the model for bank questions for one technology and level
+def generate_bank_questions(tech, level, count):
+    import interview_engine as engine
+
+    prompt = f"""
+    Generate {count} technical interview questions about {tech} for a {level}-level candidate.
+
+    Questions should:
+    1. Be specific to {tech}
+    2. Match the {level} level in depth and difficulty
+    3. Test both theoretical knowledge and practical application
+    4. Be clear and concise
+
+    Format the output as a numbered list of questions only, without any introductions or explanations.
+    """
+    response = engine.get_model().generate(prompt, generation_config={"temperature": 0.7, "max_output_tokens": 2048})
+    return [strip_number(line) for line in response.text.strip().split("\n") if _number_prefix.match(line)]
+
+# Collect technologies mentioned by candidates in the candidate store
+def techs_from_store():
+    from candidate_store import get_candidate_store
+
+    return get_candidate_store().all_technologies()
+
+# Offline build: fill the bank for every requested technology and level not already covered
+def build_bank(techs, levels=LEVELS, per_level=10, path=BANK_PATH, refresh=False):
+    bank = QuestionBank(path)
+    seen = set()
+    for tech in techs:
+        key = tech_key(tech)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        for level in levels:
+            if not refresh and bank.index.get(key, {}).get(level):
+                continue
+            try:
+                questions = generate_bank_questions(tech.strip(), level, per_level)
+            except Exception as e:
+                print(f"Error generating {level} questions for {tech}: {str(e)}")
+                continue
+            bank.add(tech.strip(), {level: questions})
+            print(f"{tech.strip()} ({level}): {len(questions)} questions")
+        # Save after every technology so an interrupted build keeps its progress
+        bank.save()
+    return bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the pre-generated technical question bank.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Generate bank questions with the model")
+    build.add_argument("--techs", default="", help="Comma-separated technologies to add")
+    build.add_argument("--from-store", action="store_true", help="Also add every technology found in the candidate store")
+    build.add_argument("--levels", default=",".join(LEVELS), help="Comma-separated seniority levels")
+    build.add_argument("--per-level", type=int, default=10, help="Questions per technology and level")
+    build.add_argument("--refresh", action="store_true", help="Regenerate levels that already have questions")
+
+    subparsers.add_parser("stats", help="Show bank coverage")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        techs = [tech for tech in args.techs.split(",") if tech.strip()]
+        if args.from_store:
+            techs.extend(techs_from_store())
+        levels = [level.strip() for level in args.levels.split(",") if level.strip()]
+        build_bank(techs, levels=levels, per_level=args.per_level, refresh=args.refresh)
+    elif args.command == "stats":
+        bank = QuestionBank()
+        for key, levels in sorted(bank.index.items()):
+            counts = ", ".join(f"{level}: {len(levels.get(level, []))}" for level in LEVELS)
+            print(f"{bank.display_names[key]} - {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import random
+import threading
+import time
+
+
+# Thread-safe token bucket limiting calls to a fixed number per minute
+class RateLimiter:
+    def __init__(self, per_minute, burst=None):
+        self.per_minute = per_minute
+        self.capacity = burst if burst is not None else max(1, per_minute // 10)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    # Block until a call is allowed
+    def acquire(self):
+        if self.per_minute <= 0:
+            return
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * 60.0 / self.per_minute
+            time.sleep(wait)
+
+
+# Call fn, retrying with exponential backoff and jitter when it raises
+def retry_with_backoff(fn, retries=3, base_delay=1.0, max_delay=30.0, retry_on=(Exception,)):
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except retry_on:
+            if attempt >= retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
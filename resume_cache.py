@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cache locations and limits (override with environment variables)
+CACHE_DIR = os.getenv("RESUME_CACHE_DIR", os.path.join("data", "cache"))
+CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+MEMORY_CACHE_ENTRIES = int(os.getenv("RESUME_CACHE_MEMORY_ENTRIES", "256"))
+
+# Hash raw file bytes so identical uploads share cache entries
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+# Build a cache key from a namespace and any number of key parts
+# (e.g. content hash, model name, prompt version)
+def make_cache_key(namespace, *parts):
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(str(part).encode("utf-8"))
+    return f"{namespace}-{digest.hexdigest()}"
+
+
+# Two-tier cache: a small in-process LRU in front of a size-bounded LRU directory of JSON files.
+# The memory tier holds serialized JSON and every get() decodes a fresh copy, so callers can't mutate cached values.
+class ResumeCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, memory_entries=MEMORY_CACHE_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._disk_index = None  # key -> (size, last_access), loaded lazily
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[-2:], f"{key}.json")
+
+    # Scan the cache directory once to learn entry sizes and access order
+    def _load_disk_index(self):
+        if self._disk_index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        entries.sort()
+        self._disk_index = OrderedDict((key, (size, mtime)) for mtime, key, size in entries)
+        self._disk_bytes = sum(size for size, _ in self._disk_index.values())
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return json.loads(self._memory[key])
+
+            self._load_disk_index()
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    payload = f.read()
+                value = json.loads(payload)
+            except (OSError, ValueError):
+                # Missing or corrupt entry - treat as a miss
+                self._forget_disk(key)
+                self.misses += 1
+                return None
+
+            # Touch the file so the on-disk LRU order survives restarts
+            now = time.time()
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+            size = self._disk_index.pop(key, (os.path.getsize(path), now))[0]
+            self._disk_index[key] = (size, now)
+
+            self._remember(key, payload)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            payload = json.dumps(value).encode("utf-8")
+            self._remember(key, payload)
+            self._load_disk_index()
+
+            path = self._path(key)
+            if len(payload) > self.max_bytes:
+                return
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write atomically so concurrent sessions never read a partial entry
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Error writing resume cache entry: {str(e)}")
+                return
+
+            self._forget_disk(key)
+            self._disk_index[key] = (len(payload), time.time())
+            self._disk_bytes += len(payload)
+            self._evict()
+
+    def _forget_disk(self, key):
+        if self._disk_index is not None and key in self._disk_index:
+            self._disk_bytes -= self._disk_index.pop(key)[0]
+
+    # Drop least recently used files until the directory fits within max_bytes
+    def _evict(self):
+        while self._disk_bytes > self.max_bytes and self._disk_index:
+            key, (size, _) = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._load_disk_index()
+            for key in list(self._disk_index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._disk_index.clear()
+            self._disk_bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Process-wide cache instance; lives in this module so it survives Streamlit script reruns
+def get_resume_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResumeCache()
+    return _cache
@@ -0,0 +1,165 @@
+import atexit
+import io
+import os
+import tempfile
+import threading
+from collections import deque
+
+from resume_ocr import PageOCR, needs_ocr, ocr_available
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TXT_MIME = "text/plain"
+
+# Extraction limits (override with environment variables)
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "80"))
+MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", "200000"))
+EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Small documents are faster to extract inline than to ship to the pool
+PARALLEL_PAGE_THRESHOLD = 8
+PAGES_PER_TASK = 4
+
+
+class ResumeTooLargeError(ValueError):
+    pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Process-wide worker pool, created on first use; "spawn" keeps workers independent of server threads
+def get_extract_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                _pool = ProcessPoolExecutor(
+                    max_workers=EXTRACT_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+# Worker task: extract text for pages [start, stop) of the PDF at path
+def _extract_pdf_page_range(path, start, stop):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+# Yield the text of each PDF page in order. Pages without a usable text layer (scans) are OCRed
+# in the background when OCR is available, while the following pages keep being read.
+# on_ocr_fallback is called for each page whose OCR failed or timed out (its text layer is yielded instead).
+def iter_pdf_pages(pdf_bytes, max_pages=MAX_PAGES, on_ocr_fallback=None):
+    # Parsers are imported on first use, so app startup doesn't pay for formats nobody uploads
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    page_count = min(len(reader.pages), max_pages)
+    texts = iter_pdf_text_layer(reader, pdf_bytes, page_count)
+    if not ocr_available():
+        yield from texts
+        return
+
+    # Page texts and pending OCR jobs, in page order
+    pending = deque()
+    try:
+        for index, text in enumerate(texts):
+            pending.append(PageOCR(reader.pages[index], text) if needs_ocr(text) else text)
+            while pending and isinstance(pending[0], str):
+                yield pending.popleft()
+        while pending:
+            item = pending.popleft()
+            if isinstance(item, str):
+                yield item
+                continue
+            text = item.result()
+            if item.degraded and on_ocr_fallback is not None:
+                on_ocr_fallback()
+            yield text
+    finally:
+        texts.close()
+        for item in pending:
+            if not isinstance(item, str):
+                item.cancel()
+
+# Yield the text layer of each of the first page_count pages, fanning page ranges out to the pool for long documents
+def iter_pdf_text_layer(reader, pdf_bytes, page_count):
+    if page_count < PARALLEL_PAGE_THRESHOLD or EXTRACT_WORKERS <= 1:
+        for i in range(page_count):
+            yield reader.pages[i].extract_text() or ""
+        return
+
+    # Workers read the PDF from a temp file instead of receiving the bytes with every task
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+
+    pool = get_extract_pool()
+    futures = [
+        pool.submit(_extract_pdf_page_range, path, start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    try:
+        for future in futures:
+            for page_text in future.result():
+                yield page_text
+    finally:
+        # Runs on early stop too: drop pages nobody will read
+        for future in futures:
+            future.cancel()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# Yield the text of each DOCX paragraph in order
+def iter_docx_paragraphs(docx_bytes):
+    import docx
+
+    document = docx.Document(io.BytesIO(docx_bytes))
+    for para in document.paragraphs:
+        yield para.text
+
+# Yield text chunks for a resume file of the given MIME type
+def iter_resume_text(data, file_type, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, on_ocr_fallback=None):
+    if len(data) > max_bytes:
+        raise ResumeTooLargeError(f"File is {len(data)} bytes; the limit is {max_bytes} bytes")
+
+    if file_type == PDF_MIME:
+        chunks = iter_pdf_pages(data, max_pages=max_pages, on_ocr_fallback=on_ocr_fallback)
+    elif file_type == DOCX_MIME:
+        chunks = iter_docx_paragraphs(data)
+    elif file_type == TXT_MIME:
+        chunks = iter(data.decode("utf-8").splitlines())
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+    try:
+        for chunk in chunks:
+            yield chunk + "\n"
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+# Collect resume text, stopping as soon as max_chars have been gathered
+def extract_text(data, file_type, max_chars=MAX_CHARS, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, on_ocr_fallback=None):
+    parts = []
+    total = 0
+    chunks = iter_resume_text(data, file_type, max_pages=max_pages, max_bytes=max_bytes, on_ocr_fallback=on_ocr_fallback)
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            total += len(chunk)
+            if max_chars is not None and total >= max_chars:
+                break
+    finally:
+        chunks.close()
+
+    text = "".join(parts)
+    return text[:max_chars] if max_chars is not None else text
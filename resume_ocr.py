@@ -0,0 +1,145 @@
+import atexit
+import hashlib
+import importlib.util
+import io
+import os
+import shutil
+import threading
+# BrokenExecutor is the base of BrokenProcessPool; importing concurrent.futures.process would load multiprocessing
+from concurrent.futures import BrokenExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from metrics import get_metrics
+from resume_cache import get_resume_cache, make_cache_key
+
+# OCR fallback for scanned PDF pages (override with environment variables).
+# Needs the optional pytesseract and Pillow packages and the tesseract binary; without them OCR is skipped.
+OCR_ENABLED = os.getenv("RESUME_OCR", "true").lower() in ("1", "true", "yes")
+OCR_WORKERS = int(os.getenv("RESUME_OCR_WORKERS", "2"))
+OCR_PAGE_TIMEOUT = float(os.getenv("RESUME_OCR_PAGE_TIMEOUT", "30"))
+OCR_LANGUAGE = os.getenv("RESUME_OCR_LANGUAGE", "eng")
+# Pages whose text layer has fewer letters and digits than this are treated as image-only
+OCR_MIN_TEXT_CHARS = int(os.getenv("RESUME_OCR_MIN_TEXT_CHARS", "20"))
+
+
+_available = None
+_pool = None
+_pool_lock = threading.Lock()
+
+# True if OCR is enabled and pytesseract, Pillow and the tesseract binary are all installed (checked once)
+def ocr_available():
+    global _available
+    if _available is None:
+        _available = OCR_ENABLED and all(importlib.util.find_spec(name) for name in ("pytesseract", "PIL")) \
+            and shutil.which("tesseract") is not None
+    return _available
+
+# Part of the resume text cache key, so text extracted without OCR is redone once OCR is installed
+def ocr_cache_id():
+    return f"ocr-{OCR_LANGUAGE}" if ocr_available() else "no-ocr"
+
+# A page needs OCR if its text layer is (almost) empty, e.g. a scanned page
+def needs_ocr(text):
+    return sum(ch.isalnum() for ch in text or "") < OCR_MIN_TEXT_CHARS
+
+# Bounded pool for OCR, separate from the text extraction pool so scans can't starve normal PDFs
+def get_ocr_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                _pool = ProcessPoolExecutor(
+                    max_workers=OCR_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+# Drop a pool whose worker died (e.g. a crash in tesseract), so the next page gets a fresh one
+def reset_ocr_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+# Worker task: OCR every image of one page; tesseract is killed after timeout seconds
+def _ocr_images(images, language, timeout):
+    import pytesseract
+    from PIL import Image
+
+    texts = []
+    for data in images:
+        with Image.open(io.BytesIO(data)) as image:
+            texts.append(pytesseract.image_to_string(image, lang=language, timeout=timeout).strip())
+    return "\n".join(text for text in texts if text)
+
+
+# OCR of one PDF page: a cached result, or a pool task that is waited for (at most OCR_PAGE_TIMEOUT) in result()
+class PageOCR:
+    def __init__(self, page, text_layer):
+        self.text_layer = text_layer
+        self.future = None
+        self.text = None
+        self.degraded = False  # True once OCR failed or timed out and the text layer was used instead
+        try:
+            images = [image.data for image in page.images]
+        except Exception as e:
+            print(f"Error reading page images for OCR: {str(e)}")
+            images = []
+        if not images:
+            self.text = text_layer
+            return
+
+        # Keyed by the page's image bytes, so the same scan is only OCRed once whatever file it arrives in
+        digest = hashlib.sha256()
+        for data in images:
+            digest.update(data)
+        self.cache_key = make_cache_key("ocr_page", digest.hexdigest(), OCR_LANGUAGE)
+        cached = get_resume_cache().get(self.cache_key)
+        if cached is not None:
+            get_metrics().count("ocr_pages", result="cached")
+            self.text = cached["text"]
+            return
+        self.pool = get_ocr_pool()
+        try:
+            self.future = self.pool.submit(_ocr_images, images, OCR_LANGUAGE, OCR_PAGE_TIMEOUT)
+        except BrokenExecutor:
+            reset_ocr_pool(self.pool)
+            self.pool = get_ocr_pool()
+            self.future = self.pool.submit(_ocr_images, images, OCR_LANGUAGE, OCR_PAGE_TIMEOUT)
+
+    # Page text: the OCR result, or the original text layer if OCR failed or timed out
+    def result(self):
+        if self.text is not None:
+            return self.text
+        metrics = get_metrics()
+        try:
+            with metrics.timed("resume.ocr_page") as timing:
+                self.text = self.future.result(timeout=OCR_PAGE_TIMEOUT)
+                timing["text_chars"] = len(self.text)
+        except FutureTimeoutError:
+            self.future.cancel()
+            print(f"OCR timed out after {OCR_PAGE_TIMEOUT:.0f}s for one page")
+            metrics.count("ocr_pages", result="timeout")
+            self.text = self.text_layer
+            self.degraded = True
+            return self.text
+        except Exception as e:
+            print(f"Error running OCR: {str(e)}")
+            if isinstance(e, BrokenExecutor):
+                reset_ocr_pool(self.pool)
+            metrics.count("ocr_pages", result="error")
+            self.text = self.text_layer
+            self.degraded = True
+            return self.text
+        metrics.count("ocr_pages", result="ocr")
+        get_resume_cache().put(self.cache_key, {"text": self.text})
+        return self.text
+
+    def cancel(self):
+        if self.future is not None:
+            self.future.cancel()
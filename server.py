@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import tornado.web
+
+import interview_engine as engine
+from metrics import get_metrics
+from resume_extract import DOCX_MIME, PDF_MIME, TXT_MIME
+from session_store import SESSION_SWEEP_INTERVAL, SessionConflictError, get_session_store
+
+# Server configuration (override with environment variables or command-line flags)
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "32"))
+SERVER_MAX_UPLOAD_BYTES = int(os.getenv("SERVER_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+UPLOAD_TYPES = {PDF_MIME, DOCX_MIME, TXT_MIME}
+_END = object()
+
+
+# Minimal stand-in for Streamlit's UploadedFile, built from a request body
+class UploadedResume:
+    def __init__(self, name, file_type, data):
+        self.name = name
+        self.type = file_type
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+# Public view of a session: everything except the resume text
+def session_summary(session):
+    return {
+        "session_id": session.session_id,
+        "stage": session.current_stage,
+        "candidate_info": {k: v for k, v in session.candidate_info.items() if k != "resume_text"},
+        "resume_uploaded": session.resume_uploaded,
+        "technical_questions": session.technical_questions,
+        "asked_questions": session.asked_questions,
+        "version": session.version,
+    }
+
+
+# Shared plumbing: engine and store calls are blocking, so they run on a bounded thread pool
+# while the event loop keeps serving other interviews
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, executor, locks):
+        self.executor = executor
+        self.locks = locks
+
+    def run_blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # Steps for one session are serialized within this process; other processes are caught by the store's version check.
+    # Each lock entry counts the requests holding or waiting for it and is dropped only when the last one leaves,
+    # so a waiter never ends up on a lock that a newer request has already replaced.
+    @asynccontextmanager
+    async def session_lock(self, session_id):
+        entry = self.locks.get(session_id)
+        if entry is None:
+            entry = self.locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.locks[session_id]
+
+    async def load_session(self, session_id):
+        session = await self.run_blocking(get_session_store().get, session_id)
+        if session is None:
+            raise tornado.web.HTTPError(404, reason="Unknown or expired session")
+        return session
+
+    async def save_session(self, session):
+        try:
+            await self.run_blocking(get_session_store().put, session)
+        except SessionConflictError:
+            raise tornado.web.HTTPError(409, reason="Session was updated by another request; retry")
+
+    def write_json(self, data, status=200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(data))
+
+    def write_error(self, status_code, **kwargs):
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps({"error": self._reason}))
+
+
+# POST /sessions: start an interview
+class SessionsHandler(BaseHandler):
+    async def post(self):
+        session = engine.new_session()
+        await self.save_session(session)
+        self.write_json({"session_id": session.session_id, "reply": engine.GREETING.strip()}, status=201)
+
+
+# GET /sessions/<id>: current state; DELETE /sessions/<id>: end the interview
+class SessionHandler(BaseHandler):
+    async def get(self, session_id):
+        self.write_json(session_summary(await self.load_session(session_id)))
+
+    async def delete(self, session_id):
+        session = await self.load_session(session_id)
+        engine.end_session(session)
+        await self.run_blocking(get_session_store().delete, session_id)
+        self.set_status(204)
+        self.finish()
+
+
+# POST /sessions/<id>/messages with {"text": "..."}.
+# Replies are returned as JSON, or with ?stream=1 as a chunked text/plain stream as they are generated.
+class MessageHandler(BaseHandler):
+    async def post(self, session_id):
+        try:
+            text = json.loads(self.request.body or b"{}").get("text", "")
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="Body must be JSON like {\"text\": \"...\"}")
+        if not isinstance(text, str) or not text.strip():
+            raise tornado.web.HTTPError(400, reason="Message text is required")
+        stream = self.get_query_argument("stream", "0") in ("1", "true", "yes")
+
+        async with self.session_lock(session_id):
+            session = await self.load_session(session_id)
+            session, reply = await self.run_blocking(engine.step, session, text)
+            if isinstance(reply, str):
+                await self.save_session(session)
+                self.write_json({"reply": reply, "stage": session.current_stage})
+            else:
+                await self.send_stream(session, reply, stream)
+
+    async def send_stream(self, session, chunks, stream):
+        parts = []
+        try:
+            if stream:
+                self.set_header("Content-Type", "text/plain; charset=utf-8")
+                self.set_header("X-Session-Stage", session.current_stage)
+            while True:
+                chunk = await self.run_blocking(next, chunks, _END)
+                if chunk is _END:
+                    break
+                parts.append(chunk)
+                if stream:
+                    self.write(chunk)
+                    await self.flush()
+        finally:
+            # Finishes the reply (and the session history) even if the client went away mid-stream
+            await self.run_blocking(chunks.close)
+            await self.save_session(session)
+        if not stream:
+            self.write_json({"reply": "".join(parts), "stage": session.current_stage})
+        else:
+            self.finish()
+
+
+# POST /sessions/<id>/resume with the file as the raw body, its MIME type as Content-Type
+# and the file name in an X-Filename header
+class ResumeHandler(BaseHandler):
+    async def post(self, session_id):
+        file_type = self.request.headers.get("Content-Type", "").split(";")[0].strip()
+        if file_type not in UPLOAD_TYPES:
+            raise tornado.web.HTTPError(415, reason="Upload a PDF, DOCX or TXT file")
+        if len(self.request.body) > SERVER_MAX_UPLOAD_BYTES:
+            raise tornado.web.HTTPError(413, reason="Resume file is too large")
+        resume = UploadedResume(self.request.headers.get("X-Filename", "resume"), file_type, self.request.body)
+
+        async with self.session_lock(session_id):
+            session = await self.load_session(session_id)
+            errors = []
+            resume_text, resume_data = await self.run_blocking(engine.upload_resume, session, resume, errors.append)
+            await self.save_session(session)
+        self.write_json({
+            "extracted_chars": len(resume_text or ""),
+            "resume_data": resume_data,
+            "errors": errors,
+            "session": session_summary(session),
+        })
+
+
+# GET /metrics: Prometheus text format
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(get_metrics().prometheus_text())
+
+
+def make_app(workers=SERVER_WORKERS):
+    options = {
+        "executor": ThreadPoolExecutor(max_workers=workers, thread_name_prefix="interview"),
+        "locks": {},  # session id -> [asyncio.Lock, requests holding or waiting for it]
+    }
+    return tornado.web.Application([
+        (r"/sessions", SessionsHandler, options),
+        (r"/sessions/([0-9a-f]{32})", SessionHandler, options),
+        (r"/sessions/([0-9a-f]{32})/messages", MessageHandler, options),
+        (r"/sessions/([0-9a-f]{32})/resume", ResumeHandler, options),
+        (r"/metrics", MetricsHandler),
+    ], max_body_size=SERVER_MAX_UPLOAD_BYTES + 1024)
+
+
+# Periodically drop expired sessions and resume texts that no live session uses any more
+async def sweep_sessions(interval=SESSION_SWEEP_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, get_session_store().purge_expired)
+        except Exception as e:
+            print(f"Error purging expired sessions: {str(e)}")
+
+
+async def serve(port, workers):
+    app = make_app(workers)
+    app.listen(port)
+    print(f"Interview server listening on port {port} ({workers} workers)")
+    sweeper = asyncio.create_task(sweep_sessions()) if SESSION_SWEEP_INTERVAL > 0 else None
+    try:
+        await asyncio.Event().wait()
+    finally:
+        # Runs when asyncio.run() cancels serve() on shutdown (e.g. Ctrl+C)
+        if sweeper is not None:
+            sweeper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve interviews over HTTP (sessions kept in the configured session store).")
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Threads for blocking engine and store calls")
+    args = parser.parse_args()
+    asyncio.run(serve(args.port, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from interview_engine import InterviewSession
+
+# Session store configuration (override with environment variables)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")  # "memory" or "sqlite"
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(2 * 3600)))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join("data", "sessions.db"))
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "600"))
+RESUME_TEXT_DIR = os.getenv("RESUME_TEXT_DIR", os.path.join("data", "resume_text"))
+
+
+class SessionConflictError(Exception):
+    pass
+
+
+# Content-addressed resume text on disk, so sessions only carry a short reference.
+# Identical resumes are stored once. Every save of a session touches its file, so files untouched for longer
+# than the session TTL belong to no live session and are removed by purge_older_than().
+class ResumeTextStore:
+    def __init__(self, directory=RESUME_TEXT_DIR):
+        self.directory = directory
+
+    def _path(self, text_id):
+        return os.path.join(self.directory, text_id[:2], f"{text_id}.txt")
+
+    # Store text and return its id
+    def put(self, text):
+        data = text.encode("utf-8")
+        text_id = hashlib.sha256(data).hexdigest()
+        path = self._path(text_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return text_id
+
+    def get(self, text_id):
+        try:
+            with open(self._path(text_id), "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            return ""
+
+    def delete(self, text_id):
+        try:
+            os.remove(self._path(text_id))
+        except FileNotFoundError:
+            pass
+
+    # Delete texts (and leftover temporary files) not written or touched in the last max_age seconds;
+    # returns how many were removed
+    def purge_older_than(self, max_age):
+        cutoff = time.time() - max_age
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir():
+                continue
+            for item in os.scandir(entry.path):
+                try:
+                    if item.stat().st_mtime < cutoff:
+                        os.remove(item.path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+# Serialize a session with its resume text replaced by a reference into the resume text store;
+# returns (resume text id or "", payload)
+def dump_session(session, resume_texts):
+    data = session.to_dict()
+    info = dict(data["candidate_info"])
+    text = info.pop("resume_text", "")
+    info["resume_text_id"] = resume_texts.put(text) if text else ""
+    data["candidate_info"] = info
+    return info["resume_text_id"], json.dumps(data, separators=(",", ":"))
+
+def load_session(payload, resume_texts):
+    data = json.loads(payload)
+    info = data["candidate_info"]
+    text_id = info.pop("resume_text_id", "")
+    info["resume_text"] = resume_texts.get(text_id) if text_id else ""
+    return InterviewSession.from_dict(data)
+
+# Resume text reference of a serialized session
+def resume_text_id(payload):
+    return json.loads(payload)["candidate_info"].get("resume_text_id", "")
+
+
+# Base class for session stores. Every put() bumps session.version; a put() based on an older version
+# than the stored one raises SessionConflictError, so two workers can't silently overwrite each other.
+class SessionStore:
+    def __init__(self, resume_texts=None):
+        self.resume_texts = resume_texts or ResumeTextStore()
+
+    def get(self, session_id):
+        raise NotImplementedError
+
+    def put(self, session):
+        raise NotImplementedError
+
+    # Delete a session and its resume text, unless another stored session has the same text
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    # Drop expired sessions, and resume texts no live session has touched within the TTL;
+    # returns how many sessions were removed
+    def purge_expired(self):
+        raise NotImplementedError
+
+
+# In-process store: serialized sessions in an LRU, expired after ttl seconds without activity.
+# Holds at most max_sessions sessions; the least recently used are evicted first.
+class MemorySessionStore(SessionStore):
+    def __init__(self, max_sessions=SESSION_MAX_SESSIONS, ttl=SESSION_TTL, resume_texts=None):
+        super().__init__(resume_texts)
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # session id -> (last access time, version, payload, resume text id)
+        self._text_refs = Counter()  # resume text id -> stored sessions referencing it
+        self._lock = threading.Lock()
+
+    # Replace the resume text reference old_id with new_id; returns how many sessions still use old_id
+    def _move_text_ref(self, old_id, new_id):
+        if new_id:
+            self._text_refs[new_id] += 1
+        if not old_id:
+            return 0
+        self._text_refs[old_id] -= 1
+        remaining = self._text_refs[old_id]
+        if not remaining:
+            del self._text_refs[old_id]
+        return remaining
+
+    # Evicted sessions' texts are left for the mtime sweep in purge_expired()
+    def _expire(self, now):
+        while self._sessions:
+            session_id, (accessed, _, _, text_id) = next(iter(self._sessions.items()))
+            if now - accessed <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+            self._move_text_ref(text_id, "")
+
+    def get(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (now,) + entry[1:]
+            self._sessions.move_to_end(session_id)
+        return load_session(entry[2], self.resume_texts)
+
+    def put(self, session):
+        expected = session.version
+        session.version = expected + 1
+        text_id, payload = dump_session(session, self.resume_texts)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session.session_id)
+            if (entry[1] if entry else 0) != expected:
+                session.version = expected
+                raise SessionConflictError(f"Session {session.session_id} was updated concurrently")
+            self._sessions[session.session_id] = (now, session.version, payload, text_id)
+            self._sessions.move_to_end(session.session_id)
+            self._move_text_ref(entry[3] if entry else "", text_id)
+            self._expire(now)
+
+    def delete(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            text_id = entry[3] if entry else ""
+            shared = self._move_text_ref(text_id, "") > 0
+        if text_id and not shared:
+            self.resume_texts.delete(text_id)
+
+    def purge_expired(self):
+        with self._lock:
+            count = len(self._sessions)
+            self._expire(time.monotonic())
+            removed = count - len(self._sessions)
+        self.resume_texts.purge_older_than(self.ttl)
+        return removed
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# SQLite-backed store shared by all workers on a host (one connection per thread, WAL mode),
+# a local stand-in for a shared session database
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path=SESSION_DB_PATH, ttl=SESSION_TTL, resume_texts=None):
+        super().__init__(resume_texts)
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                payload TEXT NOT NULL,
+                text_id TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at);
+        """)
+        self._add_text_id_column()
+        self._connection().execute("CREATE INDEX IF NOT EXISTS idx_sessions_text ON sessions(text_id)")
+
+    # Add sessions.text_id to stores created before it existed, filled in from the stored payloads
+    def _add_text_id_column(self):
+        conn = self._connection()
+        if "text_id" in [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]:
+            return
+        with conn:
+            conn.execute("ALTER TABLE sessions ADD COLUMN text_id TEXT NOT NULL DEFAULT ''")
+            rows = conn.execute("SELECT id, payload FROM sessions").fetchall()
+            conn.executemany("UPDATE sessions SET text_id = ? WHERE id = ?",
+                             [(resume_text_id(payload), session_id) for session_id, payload in rows])
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id):
+        row = self._connection().execute(
+            "SELECT payload, updated_at FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return load_session(row[0], self.resume_texts)
+
+    def put(self, session):
+        expected = session.version
+        session.version = expected + 1
+        text_id, payload = dump_session(session, self.resume_texts)
+        conn = self._connection()
+        with conn:
+            if expected == 0:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO sessions (id, version, updated_at, payload, text_id) VALUES (?, 1, ?, ?, ?)",
+                    (session.session_id, time.time(), payload, text_id)
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE sessions SET version = ?, updated_at = ?, payload = ?, text_id = ? WHERE id = ? AND version = ?",
+                    (expected + 1, time.time(), payload, text_id, session.session_id, expected)
+                )
+        if cursor.rowcount != 1:
+            session.version = expected
+            raise SessionConflictError(f"Session {session.session_id} was updated concurrently")
+
+    def delete(self, session_id):
+        conn = self._connection()
+        with conn:
+            row = conn.execute("SELECT text_id FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            text_id = row[0] if row else ""
+            shared = text_id and conn.execute(
+                "SELECT 1 FROM sessions WHERE text_id = ? LIMIT 1", (text_id,)
+            ).fetchone()
+        if text_id and not shared:
+            self.resume_texts.delete(text_id)
+
+    def purge_expired(self):
+        conn = self._connection()
+        with conn:
+            removed = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,)).rowcount
+        self.resume_texts.purge_older_than(self.ttl)
+        return removed
+
+
+SESSION_STORES = {
+    "memory": MemorySessionStore,
+    "sqlite": SQLiteSessionStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+# Process-wide session store selected by SESSION_STORE
+def get_session_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SESSION_STORE not in SESSION_STORES:
+                    raise ValueError(f"Unknown session store: {SESSION_STORE}. Choose one of: {', '.join(SESSION_STORES)}")
+                _store = SESSION_STORES[SESSION_STORE]()
+    return _store
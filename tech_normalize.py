@@ -0,0 +1,200 @@
+import re
+from functools import lru_cache
+
+# Canonical technology names and their common aliases / spellings
+TECH_ALIASES = {
+    "Python": ["py", "python3", "python 3", "cpython"],
+    "JavaScript": ["js", "javascript", "java script", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["ts", "typescript"],
+    "Java": ["java", "core java", "java se", "java ee", "j2ee"],
+    "C": ["c", "ansi c"],
+    "C++": ["cpp", "c++", "cplusplus", "c plus plus"],
+    "C#": ["csharp", "c#", "c sharp"],
+    "Go": ["go", "golang"],
+    "Rust": ["rust", "rustlang"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "SwiftUI": ["swiftui", "swift ui"],
+    "Scala": ["scala"],
+    "R": ["r", "rlang"],
+    "SQL": ["sql"],
+    "Bash": ["bash", "shell", "shell scripting", "sh"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "React": ["react", "reactjs", "react.js", "react js"],
+    "Preact": ["preact"],
+    "React Native": ["react native", "react-native"],
+    "Angular": ["angular", "angularjs", "angular.js", "angular 2+"],
+    "Vue.js": ["vue", "vuejs", "vue.js", "vue js"],
+    "Next.js": ["next", "nextjs", "next.js"],
+    "Nuxt.js": ["nuxt", "nuxtjs", "nuxt.js", "nuxt js"],
+    "NestJS": ["nest", "nestjs", "nest.js", "nest js"],
+    "Node.js": ["node", "nodejs", "node.js", "node js"],
+    "Express": ["express", "expressjs", "express.js"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "Dash": ["dash", "plotly dash"],
+    "FastAPI": ["fastapi", "fast api"],
+    "Spring": ["spring", "spring framework"],
+    "Spring Boot": ["spring boot", "springboot"],
+    "Ruby on Rails": ["rails", "ruby on rails", "ror"],
+    ".NET": [".net", "dotnet", "dot net", ".net core", "asp.net", "asp.net core"],
+    "Laravel": ["laravel"],
+    "PostgreSQL": ["postgres", "postgresql", "psql", "postgre sql"],
+    "MySQL": ["mysql", "my sql"],
+    "SQLite": ["sqlite", "sqlite3"],
+    "Microsoft SQL Server": ["mssql", "ms sql", "sql server", "microsoft sql server"],
+    "Oracle Database": ["oracle", "oracle db", "oracle database"],
+    "MongoDB": ["mongo", "mongodb", "mongo db"],
+    "Redis": ["redis"],
+    "Cassandra": ["cassandra", "apache cassandra"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "elastic"],
+    "DynamoDB": ["dynamodb", "dynamo db", "dynamo"],
+    "Kafka": ["kafka", "apache kafka"],
+    "RabbitMQ": ["rabbitmq", "rabbit mq"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop", "apache hadoop"],
+    "Airflow": ["airflow", "apache airflow"],
+    "Docker": ["docker", "docker compose", "docker-compose"],
+    "Kubernetes": ["kubernetes", "k8s", "kube"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Jenkins": ["jenkins"],
+    "GitHub Actions": ["github actions", "gh actions"],
+    "GitLab CI": ["gitlab ci", "gitlab-ci", "gitlab ci/cd"],
+    "CI/CD": ["ci/cd", "cicd", "ci cd", "continuous integration"],
+    "Git": ["git"],
+    "Linux": ["linux", "unix"],
+    "AWS": ["aws", "amazon web services"],
+    "Google Cloud": ["gcp", "google cloud", "google cloud platform"],
+    "Azure": ["azure", "microsoft azure"],
+    "GraphQL": ["graphql", "graph ql"],
+    "REST APIs": ["rest", "rest api", "rest apis", "restful", "restful apis"],
+    "gRPC": ["grpc"],
+    "TensorFlow": ["tensorflow", "tf2", "tensor flow"],
+    "PyTorch": ["pytorch", "torch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "dl"],
+    "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"],
+    "Redux": ["redux"],
+    "jQuery": ["jquery"],
+    "Selenium": ["selenium"],
+    "Pytest": ["pytest"],
+    "Jest": ["jest"],
+    "Cube.js": ["cube", "cubejs", "cube.js", "cube js"],
+    "Adobe Flash": ["flash", "adobe flash", "actionscript"],
+}
+
+# Fuzzy matching is only tried for inputs at least this long (short names like "nuxt", "dash" or "cube" are
+# too close to other technologies) and only corrects typos: one swapped, inserted or dropped character.
+# Substitutions are never corrected, since "nuxtjs" and "nextjs" differ by exactly one.
+FUZZY_MIN_LENGTH = 6
+
+# Ordinary words that are one typo away from a known key ("reacts" -> "reactjs", "sparing" -> "spring")
+COMMON_WORDS = frozenset(["reacts", "sparing", "vanillas", "angulars"])
+
+_split = re.compile(r'[,;\n]|\band\b', re.IGNORECASE)
+_whitespace = re.compile(r'\s+')
+_compact = re.compile(r'[\s.\-_]+')
+_trim = re.compile(r'^[\s\-\*•·"\'()]+|[\s\-\*•·"\'().:]+$')
+
+
+def _alias_key(text):
+    return _whitespace.sub(" ", text.strip().lower())
+
+def _compact_key(text):
+    return _compact.sub("", text.lower())
+
+
+# Precompiled lookup tables: exact alias key and punctuation-free key -> canonical name
+ALIAS_LOOKUP = {}
+COMPACT_LOOKUP = {}
+for _canonical, _aliases in TECH_ALIASES.items():
+    for _alias in [_canonical] + _aliases:
+        ALIAS_LOOKUP.setdefault(_alias_key(_alias), _canonical)
+        COMPACT_LOOKUP.setdefault(_compact_key(_alias), _canonical)
+
+# Fuzzy candidates bucketed by length so each lookup only compares against similar-length keys
+_FUZZY_BUCKETS = {}
+for _key in COMPACT_LOOKUP:
+    if len(_key) >= FUZZY_MIN_LENGTH:
+        _FUZZY_BUCKETS.setdefault(len(_key), []).append(_key)
+
+
+# True if typed is key with two adjacent characters swapped, or with one character inserted or dropped
+def _is_typo(typed, key):
+    if len(typed) == len(key):
+        diffs = [i for i in range(len(key)) if typed[i] != key[i]]
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and typed[diffs[0]] == key[diffs[1]] and typed[diffs[1]] == key[diffs[0]])
+    shorter, longer = sorted((typed, key), key=len)
+    if len(longer) - len(shorter) != 1:
+        return False
+    i = 0
+    while i < len(shorter) and shorter[i] == longer[i]:
+        i += 1
+    return shorter[i:] == longer[i + 1:]
+
+# Known technology one typo away, or None when there is none or several different ones. A name that extends
+# a known key ("preact", "swiftui") is a different technology rather than a typo, so it never matches.
+@lru_cache(maxsize=8192)
+def _fuzzy_match(compact):
+    matches = set()
+    for length in range(len(compact) - 1, len(compact) + 2):
+        for key in _FUZZY_BUCKETS.get(length, ()):
+            if compact.startswith(key) or compact.endswith(key):
+                continue
+            if _is_typo(compact, key):
+                matches.add(COMPACT_LOOKUP[key])
+    return matches.pop() if len(matches) == 1 else None
+
+
+# Canonical display name for a technology ("JS" -> "JavaScript", "Pyhton" -> "Python").
+# Unknown technologies are returned as typed, with surrounding punctuation and extra spaces removed.
+@lru_cache(maxsize=8192)
+def canonical_tech(name):
+    cleaned = _whitespace.sub(" ", _trim.sub("", str(name)))
+    if not cleaned:
+        return ""
+    key = cleaned.lower()
+    if key in ALIAS_LOOKUP:
+        return ALIAS_LOOKUP[key]
+    compact = _compact_key(cleaned)
+    if compact in COMPACT_LOOKUP:
+        return COMPACT_LOOKUP[compact]
+    if len(compact) >= FUZZY_MIN_LENGTH and compact not in COMMON_WORDS:
+        match = _fuzzy_match(compact)
+        if match:
+            return match
+    return cleaned
+
+# Lowercase canonical key used wherever technologies are indexed or compared
+def tech_key(name):
+    return canonical_tech(name).lower()
+
+# Split free text like "Python, JS and react; Docker" into raw technology names
+def split_tech_stack(text):
+    return [part.strip() for part in _split.split(text or "") if part.strip()]
+
+# Canonicalize and deduplicate technologies, keeping the order in which they first appear
+def normalize_tech_stack(techs):
+    result = []
+    seen = set()
+    for tech in techs:
+        canonical = canonical_tech(tech)
+        key = canonical.lower()
+        if canonical and key not in seen:
+            seen.add(key)
+            result.append(canonical)
+    return result
+
+# Parse a tech stack from free text or a list into a normalized list
+def parse_tech_stack(value):
+    if isinstance(value, str):
+        return normalize_tech_stack(split_tech_stack(value))
+    return normalize_tech_stack(value or [])
@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+# Modules read their configuration at import time: point every store, cache and log at a scratch directory
+# and use the offline model backend before anything from the app is imported
+_scratch = tempfile.mkdtemp(prefix="talentscout-tests-")
+os.environ.update({
+    "LLM_BACKEND": "stub",
+    "LLM_STUB_LATENCY": "0",
+    "METRICS_LOG_PATH": os.path.join(_scratch, "metrics.jsonl"),
+    "METRICS_PORT": "0",
+    "RESUME_CACHE_DIR": os.path.join(_scratch, "cache"),
+    "CANDIDATE_DB_PATH": os.path.join(_scratch, "candidates.db"),
+    "SEARCH_INDEX_DIR": os.path.join(_scratch, "search_index"),
+    "QUESTION_BANK_PATH": os.path.join(_scratch, "question_bank.json"),
+    "SESSION_DB_PATH": os.path.join(_scratch, "sessions.db"),
+    "RESUME_TEXT_DIR": os.path.join(_scratch, "resume_text"),
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,96 @@
+import sqlite3
+
+import pytest
+
+import answer_scoring
+from candidate_store import SCHEMA, CandidateStore
+
+
+def record(answer, email="ada@example.com"):
+    return {
+        "candidate_info": {"name": "Ada", "email": email, "location": "Berlin"},
+        "answers": [{"question": "1. How do you profile Python code?", "answer": answer}],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandidateStore(str(tmp_path / "candidates.db"))
+
+
+def test_saved_scores_are_persisted_and_skipped_next_time(store):
+    candidate_id = store.add(record("cProfile, then py-spy"))
+    [(unscored_id, revision, unscored)] = list(store.iter_unscored("v1"))
+    assert unscored_id == candidate_id
+    unscored["answer_scores"] = {"rubric_version": "v1", "average": 4.0, "scores": []}
+
+    assert store.save_answer_scores([(candidate_id, revision, unscored, 4.0)], "v1") == []
+    assert store.get(candidate_id)["record"]["answer_scores"]["average"] == 4.0
+    assert store.average_answer_score(candidate_id) == 4.0
+    assert list(store.iter_unscored("v1")) == []
+    assert [row[0] for row in store.iter_unscored("v2")] == [candidate_id]
+
+
+def test_record_without_answers_is_marked_scored(store):
+    candidate_id = store.add({"candidate_info": {"name": "Batch"}})
+    [(_, revision, _)] = list(store.iter_unscored("v1"))
+    assert store.save_answer_scores([(candidate_id, revision, None, None)], "v1") == []
+    assert list(store.iter_unscored("v1")) == []
+    assert store.average_answer_score(candidate_id) is None
+
+
+def test_scores_for_a_replaced_record_are_not_saved(store):
+    candidate_id = store.add(record("old answer"))
+    [(_, revision, stale_record)] = list(store.iter_unscored("v1"))
+    store.replace_record(candidate_id, record("new answer"))
+    stale_record["answer_scores"] = {"rubric_version": "v1", "average": 1.0, "scores": []}
+
+    assert store.save_answer_scores([(candidate_id, revision, stale_record, 1.0)], "v1") == [candidate_id]
+    saved = store.get(candidate_id)
+    assert saved["record"]["answers"][0]["answer"] == "new answer"
+    assert "answer_scores" not in saved["record"]
+    assert store.average_answer_score(candidate_id) is None
+    assert [row[0] for row in store.iter_unscored("v1")] == [candidate_id]
+
+
+def test_replace_record_clears_existing_scores(store):
+    candidate_id = store.add(record("first"))
+    [(_, revision, _)] = list(store.iter_unscored("v1"))
+    store.save_answer_scores([(candidate_id, revision, None, 3.0)], "v1")
+    store.replace_record(candidate_id, record("second"))
+    assert store.average_answer_score(candidate_id) is None
+    assert [row[1] for row in store.iter_unscored("v1")] == [revision + 1]
+
+
+def test_revision_column_is_added_to_old_stores(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA.replace(",\n    revision INTEGER NOT NULL DEFAULT 0", ""))
+    conn.execute("INSERT INTO candidates (id, created_at, record) VALUES ('a', '2024-01-01', '{}')")
+    conn.commit()
+    conn.close()
+
+    store = CandidateStore(path)
+    assert store.get("a")["revision"] == 0
+    assert [row[:2] for row in store.iter_unscored("v1")] == [("a", 0)]
+
+
+def test_scoring_run_rescores_candidates_replaced_mid_run(store, monkeypatch):
+    candidate_id = store.add(record("old answer"))
+    score_batch = answer_scoring.score_batch
+    replaced = []
+
+    def replace_then_score(pairs):
+        if not replaced:
+            replaced.append(True)
+            store.replace_record(candidate_id, record("a much longer new answer about sampling profilers"))
+        return score_batch(pairs)
+
+    monkeypatch.setattr(answer_scoring, "get_candidate_store", lambda: store)
+    monkeypatch.setattr(answer_scoring, "score_batch", replace_then_score)
+    stats = answer_scoring.run_scoring(concurrency=1, requests_per_minute=10000)
+
+    assert stats["candidates"] == 1 and stats["stale"] == 0
+    scores = store.get(candidate_id)["record"]["answer_scores"]
+    assert scores["scores"][0]["answer"].startswith("a much longer new answer")
+    assert list(store.iter_unscored(answer_scoring.RUBRIC_VERSION)) == []
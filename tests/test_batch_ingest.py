@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import batch_ingest
+from candidate_search import CandidateSearchIndex
+from candidate_store import CandidateStore
+
+
+def resume(i):
+    return (f"Candidate {i}\ncandidate{i}@example.com\n{i + 2} years of experience.\n"
+            f"Skills: Python, Docker, Kafka. Built streaming service number {i}.\n")
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    index = CandidateSearchIndex(str(tmp_path / "index"))
+    monkeypatch.setattr(batch_ingest, "get_candidate_store", lambda: store)
+    monkeypatch.setattr(batch_ingest, "get_search_index", lambda: index)
+    input_dir = tmp_path / "resumes"
+    (input_dir / "nested").mkdir(parents=True)
+    for i in range(3):
+        (input_dir / f"resume{i}.txt").write_text(resume(i))
+    (input_dir / "nested" / "resume3.TXT").write_text(resume(3))
+    (input_dir / "notes.md").write_text("not a resume")
+    return store, index, input_dir, tmp_path / "out"
+
+
+def run(input_dir, output_dir, **kwargs):
+    options = {"concurrency": 2, "requests_per_minute": 0, "retries": 0}
+    options.update(kwargs)
+    return batch_ingest.run_batch(str(input_dir), output_dir=str(output_dir), **options)
+
+
+def checkpoint_entries(output_dir):
+    with open(os.path.join(output_dir, "batch_checkpoint.jsonl")) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_find_resumes_filters_by_extension(setup):
+    _, _, input_dir, _ = setup
+    assert [os.path.basename(path) for path in batch_ingest.find_resumes(str(input_dir))] == [
+        "resume3.TXT", "resume0.txt", "resume1.txt", "resume2.txt"]
+
+
+def test_batch_stores_indexes_and_checkpoints_every_resume(setup):
+    store, index, input_dir, output_dir = setup
+    stats = run(input_dir, output_dir)
+    assert (stats["done"], stats["skipped"], stats["failed"]) == (4, 0, 0)
+    assert store.count() == 4
+    assert len(index.search("kafka", limit=10)) == 4
+    assert [entry["status"] for entry in checkpoint_entries(output_dir)] == ["done"] * 4
+
+
+def test_rerun_skips_checkpointed_files_even_when_renamed(setup):
+    store, _, input_dir, output_dir = setup
+    run(input_dir, output_dir)
+    shutil.move(str(input_dir / "resume0.txt"), str(input_dir / "renamed.txt"))
+    (input_dir / "resume4.txt").write_text(resume(4))
+
+    stats = run(input_dir, output_dir)
+    assert (stats["done"], stats["skipped"], stats["failed"]) == (1, 4, 0)
+    assert store.count() == 5
+
+
+def test_failed_files_are_retried_on_the_next_run(setup):
+    store, _, input_dir, output_dir = setup
+    (input_dir / "empty.txt").write_text("   ")
+    stats = run(input_dir, output_dir)
+    assert stats["failed"] == 1
+    [failed] = [entry for entry in checkpoint_entries(output_dir) if entry["status"] == "failed"]
+    assert failed["file"].endswith("empty.txt") and failed["error"]
+
+    (input_dir / "empty.txt").write_text(resume(5))
+    stats = run(input_dir, output_dir)
+    assert (stats["done"], stats["skipped"], stats["failed"]) == (1, 4, 0)
+    assert store.count() == 5
+
+
+def test_partial_checkpoint_line_is_ignored(setup):
+    _, _, input_dir, output_dir = setup
+    run(input_dir, output_dir, limit=2)
+    with open(os.path.join(output_dir, "batch_checkpoint.jsonl"), "a") as f:
+        f.write('{"file": "x", "sha256": "ab')
+    stats = run(input_dir, output_dir)
+    assert (stats["done"], stats["skipped"]) == (2, 2)
+    # Entries written after the partial line are still read back
+    stats = run(input_dir, output_dir)
+    assert (stats["done"], stats["skipped"]) == (0, 4)
@@ -0,0 +1,73 @@
+import copy
+
+import pytest
+
+from benchmarks.corpus import SIZES, build_corpus, resume_lines
+from benchmarks.run import compare, median_results
+
+
+def results(calibration=10.0, p95=5.0, throughput=50.0, memory=20.0, dispatch=2.0):
+    return {
+        "environment": {"calibration_ms": calibration},
+        "interview": {"interviews_per_sec": throughput, "peak_memory_mb": memory,
+                      "stages": {"conclusion": {"count": 50, "p95_ms": p95}}},
+        "extraction": {"pdf-small": {"p50_ms": p95, "peak_memory_mb": memory}},
+        "dispatch": {"per_message_us": dispatch},
+    }
+
+
+def metrics(regressions):
+    return sorted(metric for metric, *_ in regressions)
+
+
+def test_medians_are_taken_field_by_field():
+    runs = [{"n": 50, "ms": 1.0, "label": "a", "nested": {"ms": 3.0}},
+            {"n": 50, "ms": 9.0, "label": "b", "nested": {"ms": 1.0}},
+            {"n": 50, "ms": 2.0, "label": "c", "nested": {"ms": 2.0}}]
+    assert median_results(runs) == {"n": 50, "ms": 2.0, "label": "a", "nested": {"ms": 2.0}}
+
+
+def test_unchanged_results_pass():
+    assert compare(results(), results(), tolerance=0.2) == []
+
+
+def test_slowdowns_and_lower_throughput_are_reported():
+    slower = results(p95=8.0, throughput=30.0, dispatch=3.0)
+    assert metrics(compare(slower, results(), tolerance=0.2)) == [
+        "dispatch.per_message_us", "extraction.pdf-small.p50_ms",
+        "interview.interviews_per_sec", "interview.stages.conclusion.p95_ms",
+    ]
+
+
+def test_timings_are_scaled_by_the_calibration_run():
+    # Everything took twice as long on a machine that is twice as slow: no regression
+    slow_machine = results(calibration=20.0, p95=10.0, throughput=25.0, dispatch=4.0)
+    assert compare(slow_machine, results(), tolerance=0.2) == []
+
+
+def test_memory_is_compared_as_recorded():
+    fast_machine = results(calibration=5.0, p95=2.5, throughput=100.0, dispatch=1.0, memory=30.0)
+    assert metrics(compare(fast_machine, results(), tolerance=0.2)) == [
+        "extraction.pdf-small.peak_memory_mb", "interview.peak_memory_mb",
+    ]
+
+
+def test_small_absolute_changes_are_noise():
+    base = results(p95=0.1)
+    assert compare(results(p95=0.4), base, tolerance=0.2) == []
+
+
+def test_metrics_missing_from_the_baseline_are_skipped():
+    base = copy.deepcopy(results())
+    del base["dispatch"]
+    base["interview"]["stages"] = {}
+    assert compare(results(p95=50.0, dispatch=20.0), base, tolerance=0.2) == \
+        [("extraction.pdf-small.p50_ms", 5.0, 50.0, pytest.approx(9.0))]
+
+
+def test_corpus_is_reproducible():
+    first, second = build_corpus(seed=3), build_corpus(seed=3)
+    assert len(first) == 3 * len(SIZES)
+    assert resume_lines(2, seed=3) == resume_lines(2, seed=3) != resume_lines(2, seed=4)
+    # python-docx stamps save times into the archive, so only PDF and TXT are byte-for-byte identical
+    assert all(first[name].getvalue() == second[name].getvalue() for name in first if not name.startswith("docx"))
@@ -0,0 +1,183 @@
+import json
+import os
+
+import pytest
+
+from candidate_archive import (_FRAME, _TRAILER, END_MAGIC, MAGIC, MIN_EXTERNAL_BYTES, ArchiveFormatError, ArchiveReader,
+                               ArchiveWriter, convert_json_files)
+
+RESUME = "Senior engineer. " * 40
+HISTORY = [{"role": "assistant", "content": "Hello! " * 30}, {"role": "user", "content": "Hi, I'm Ada."}]
+
+
+def record(i, resume=RESUME):
+    return {
+        "candidate_info": {"name": f"Candidate {i}", "email": f"c{i}@example.com", "resume_text": resume,
+                           "tech_stack": ["Python", "C++"], "location": "Zürich"},
+        "conversation_history": HISTORY,
+        "technical_questions": [{"question": f"{i}. Why?", "answer": None}],
+        "previous_applications": [{"candidate_info": {"resume_text": resume}, "score": 3.5}],
+    }
+
+
+def write(path, records, chunk_records=3):
+    with ArchiveWriter(path, chunk_records=chunk_records) as writer:
+        for record_id, value in records:
+            writer.add(record_id, value)
+    return writer.stats
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "candidates.archive")
+
+
+def test_round_trip(path):
+    records = [(f"id{i}", record(i)) for i in range(7)]
+    stats = write(path, records)
+    assert stats["records"] == 7
+    # One resume and one history, shared by every record and previous application
+    assert stats["texts"] == 2
+    assert stats["archive_bytes"] < stats["input_bytes"]
+    assert not os.path.exists(path + ".tmp")
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 7
+        assert reader.record_ids() == [record_id for record_id, _ in records]
+        assert reader.get("id5") == records[5][1]
+        assert reader.get("id0") == records[0][1]
+        assert reader.get("missing") is None
+        assert list(reader.iter_records()) == records
+
+
+def test_unresolved_records_keep_text_references(path):
+    write(path, [("a", record(0))])
+    with ArchiveReader(path) as reader:
+        stored = reader.get("a", resolve=False)
+        assert set(stored["candidate_info"]["resume_text"]) == {"$text"}
+        assert stored["candidate_info"]["resume_text"] == stored["previous_applications"][0]["candidate_info"]["resume_text"]
+        [(_, streamed)] = list(reader.iter_records(resolve=False))
+        assert streamed == stored
+
+
+def test_short_texts_stay_inline(path):
+    short = "x" * (MIN_EXTERNAL_BYTES // 2)
+    stats = write(path, [("a", {"candidate_info": {"resume_text": short}})])
+    assert stats["texts"] == 0
+    with ArchiveReader(path) as reader:
+        assert reader.get("a", resolve=False) == {"candidate_info": {"resume_text": short}}
+
+
+def test_empty_archive(path):
+    write(path, [])
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 0
+        assert list(reader) == []
+
+
+def test_duplicate_record_id_is_rejected(path):
+    with pytest.raises(ValueError):
+        write(path, [("a", record(0)), ("a", record(1))])
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_foreign_file_is_rejected(path):
+    with open(path, "wb") as f:
+        f.write(b"{}\n")
+    with pytest.raises(ArchiveFormatError):
+        ArchiveReader(path)
+
+
+def test_truncated_archive_keeps_complete_chunks(path):
+    records = [(f"id{i}", record(i, resume=f"Resume {i}. " * 60)) for i in range(6)]
+    write(path, records, chunk_records=2)
+    with open(path, "rb") as f:
+        data = f.read()
+    # Cut into the middle of the last chunk frame, dropping the index and trailer
+    with ArchiveReader(path) as reader:
+        last_chunk = max(offset for offset, _ in reader._load_index()["records"].values())
+    with open(path, "wb") as f:
+        f.write(data[:last_chunk + _FRAME.size + 3])
+
+    with ArchiveReader(path) as reader:
+        assert reader.record_ids() == ["id0", "id1", "id2", "id3"]
+        assert reader.get("id3") == records[3][1]
+        assert reader.get("id4") is None
+        assert list(reader.iter_records()) == records[:4]
+
+
+def test_damaged_index_is_rebuilt_by_scanning(path):
+    records = [(f"id{i}", record(i)) for i in range(5)]
+    write(path, records, chunk_records=2)
+    with open(path, "r+b") as f:
+        f.seek(-_TRAILER.size, os.SEEK_END)
+        index_offset, end = _TRAILER.unpack(f.read(_TRAILER.size))
+        assert end == END_MAGIC
+        f.seek(index_offset + _FRAME.size + 2)
+        f.write(b"\xff\xff\xff\xff")
+    with ArchiveReader(path) as reader:
+        assert reader.record_ids() == [record_id for record_id, _ in records]
+        assert reader.get("id4") == records[4][1]
+
+
+def test_corrupt_chunk_raises_format_error(path):
+    write(path, [("a", record(0))])
+    with ArchiveReader(path) as reader:
+        [chunk_offset, _] = reader._load_index()["records"]["a"]
+    with open(path, "r+b") as f:
+        f.seek(chunk_offset + _FRAME.size + 4)
+        f.write(b"\x00\x00\x00\x00")
+    with ArchiveReader(path) as reader:
+        with pytest.raises(ArchiveFormatError):
+            reader.get("a")
+        with pytest.raises(ArchiveFormatError):
+            list(reader.iter_records())
+
+
+def test_missing_text_raises_format_error(path):
+    write(path, [("a", record(0))])
+    with open(path, "rb") as f:
+        data = f.read()
+    # Drop the text frames: rebuild the file from MAGIC and the chunk frame only, without an index
+    with ArchiveReader(path) as reader:
+        [chunk_offset, _] = reader._load_index()["records"]["a"]
+    kind, length = _FRAME.unpack(data[chunk_offset:chunk_offset + _FRAME.size])
+    with open(path, "wb") as f:
+        f.write(MAGIC + data[chunk_offset:chunk_offset + _FRAME.size + length])
+    with ArchiveReader(path) as reader:
+        assert reader.get("a", resolve=False) is not None
+        with pytest.raises(ArchiveFormatError):
+            reader.get("a")
+
+
+def test_interrupted_writer_leaves_no_archive(path):
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(path) as writer:
+            writer.add("a", record(0))
+            raise RuntimeError("interrupted")
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_convert_json_files(tmp_path, path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "candidate_20240101_120000.json").write_text(json.dumps(record(1)))
+    (data_dir / "candidate_broken.json").write_text("{not json")
+    (data_dir / "notes.json").write_text("{}")
+    stats = convert_json_files(str(data_dir), path)
+    assert stats["records"] == 1
+    with ArchiveReader(path) as reader:
+        assert reader.get("candidate_20240101_120000") == record(1)
+
+
+def test_record_keys_that_look_like_references_round_trip(path):
+    value = record(0)
+    value["notes"] = {"$text": "written by the recruiter"}
+    value["answers"] = [{"$$text": 1, "$ref": [{"$text": "x" * MIN_EXTERNAL_BYTES}]}]
+    write(path, [("a", value)])
+    with ArchiveReader(path) as reader:
+        assert reader.get("a") == value
+        assert list(reader.iter_records()) == [("a", value)]
+        assert reader.get("a", resolve=False)["notes"] == {"$$text": "written by the recruiter"}
@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+import interview_engine
+from candidate_dedup import (BANDS, DEDUP_THRESHOLD, MIN_SHINGLES, SHINGLE_WORDS, lsh_buckets, normalize_phone,
+                             resume_signature, shingles, signature_from_bytes, signature_to_bytes, similarity)
+from candidate_store import CandidateStore
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def resume(seed, words=400):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+# Replace every n-th word, so a known share of the shingles changes
+def edit(text, every):
+    words = text.split()
+    for i in range(0, len(words), every):
+        words[i] = f"edited{i}"
+    return " ".join(words)
+
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandidateStore(str(tmp_path / "candidates.db"))
+
+
+def stored_record(text, email="", phone=""):
+    return {"candidate_info": {"name": "Ada", "email": email, "phone": phone, "resume_text": text,
+                               "tech_stack": ["Python"]},
+            "technical_questions": [{"question": "1. Old question?", "answer": "old answer"}]}
+
+
+def test_identical_text_has_identical_signature():
+    text = resume(1)
+    assert resume_signature(text) == resume_signature(" ".join(text.upper().split()))
+    assert similarity(resume_signature(text), resume_signature(text)) == 1.0
+
+
+def test_short_text_is_not_signed():
+    assert resume_signature(" ".join(VOCABULARY[:MIN_SHINGLES + SHINGLE_WORDS - 2])) is None
+    assert resume_signature(" ".join(VOCABULARY[:MIN_SHINGLES + SHINGLE_WORDS - 1])) is not None
+
+
+def test_signature_bytes_round_trip():
+    signature = resume_signature(resume(2))
+    assert signature_from_bytes(signature_to_bytes(signature)) == signature
+    assert len(lsh_buckets(signature)) == BANDS
+
+
+@pytest.mark.parametrize("every", [50, 12, 6, 3])
+def test_similarity_estimates_jaccard(every):
+    original = resume(3)
+    changed = edit(original, every)
+    estimate = similarity(resume_signature(original), resume_signature(changed))
+    assert estimate == pytest.approx(jaccard(original, changed), abs=0.12)
+
+
+def test_near_identical_resume_is_a_duplicate(store):
+    original = resume(4)
+    candidate_id = store.add(stored_record(original))
+    changed = edit(original, 60)
+    assert jaccard(original, changed) > DEDUP_THRESHOLD
+    [match] = store.find_duplicates(resume_text=changed)
+    assert match["candidate_id"] == candidate_id
+    assert match["match"] == "resume"
+    assert match["similarity"] >= DEDUP_THRESHOLD
+
+
+def test_moderately_similar_resume_is_not_a_duplicate(store):
+    original = resume(5)
+    store.add(stored_record(original))
+    changed = edit(original, 4)
+    assert jaccard(original, changed) < 0.5
+    assert store.find_duplicates(resume_text=changed) == []
+
+
+def test_unrelated_resume_is_not_a_duplicate(store):
+    store.add(stored_record(resume(6)))
+    assert store.find_duplicates(resume_text=resume(7)) == []
+
+
+def test_contacts_match_after_normalization(store):
+    candidate_id = store.add(stored_record(resume(8), email="Ada@Example.com", phone="+1 (555) 123-4567"))
+    assert normalize_phone("001-555-123-4567") == "5551234567"
+    assert [m["match"] for m in store.find_duplicates(email=" ada@example.COM ")] == ["email"]
+    assert [m["candidate_id"] for m in store.find_duplicates(phone="555 123 4567")] == [candidate_id]
+    assert store.find_duplicates(phone="12") == []
+
+
+class Upload:
+    name = "resume.txt"
+    type = interview_engine.TXT_MIME
+
+    def __init__(self, text):
+        self._data = text.encode("utf-8")
+
+    def getvalue(self):
+        return self._data
+
+
+def test_returning_candidate_gets_new_questions(store, monkeypatch):
+    text = resume(9)
+    candidate_id = store.add(stored_record(text, email="ada@example.com"))
+    monkeypatch.setattr(interview_engine, "get_candidate_store", lambda: store)
+    session = interview_engine.new_session()
+    session.candidate_info["desired_position"] = "Backend Engineer"
+
+    interview_engine.upload_resume(session, Upload(edit(text, 80)))
+
+    assert session.duplicate_of == candidate_id
+    assert session.candidate_info["email"] == "ada@example.com"
+    assert session.candidate_info["tech_stack"] == ["Python"]
+    drafted = (session.tentative_questions or {}).get("questions") or []
+    assert all(q["question"] != "1. Old question?" for q in drafted)
+    interview_engine.end_session(session)
@@ -0,0 +1,140 @@
+import math
+import os
+
+import pytest
+
+from candidate_search import HEADER, MAGIC, CandidateSearchIndex, Segment, candidate_document, write_segment
+
+
+def record(text, location="", experience="", skills=()):
+    return {"candidate_info": {"resume_text": text, "location": location, "experience": experience,
+                               "tech_stack": list(skills)}}
+
+
+def document(terms, location="", experience=float("nan")):
+    return {"terms": dict(terms), "length": sum(terms.values()), "location": location, "experience": experience}
+
+
+@pytest.fixture
+def segment_path(tmp_path):
+    return str(tmp_path / "segment.bin")
+
+
+def test_segment_round_trip(segment_path):
+    documents = {
+        "a" * 32: document({"python": 3, "kafka": 1}, "berlin, germany", 6.0),
+        "b" * 32: document({"python": 1, "c++": 2}, "münchen", float("nan")),
+        "c" * 32: document({"zürich": 1}, "", 0.5),
+    }
+    write_segment(segment_path, documents)
+    segment = Segment(segment_path)
+    try:
+        assert segment.doc_count == 3
+        assert segment.term_count == 4
+        assert segment.total_length == 8
+        assert [segment.doc_id(i) for i in range(3)] == list(documents)
+        assert [segment.doc_length(i) for i in range(3)] == [4, 3, 1]
+        assert segment.experience(0) == 6.0
+        assert math.isnan(segment.experience(1))
+        assert segment.experience(2) == 0.5
+        assert [segment.location(i) for i in range(3)] == ["berlin, germany", "münchen", ""]
+        assert segment.postings("python") == [(0, 3), (1, 1)]
+        assert segment.postings("c++") == [(1, 2)]
+        assert segment.postings("zürich") == [(2, 1)]
+        assert segment.postings("java") == []
+        assert {term: list(postings) for term, postings in segment.iter_terms()} == {
+            "c++": [(1, 2)], "kafka": [(0, 1)], "python": [(0, 3), (1, 1)], "zürich": [(2, 1)],
+        }
+    finally:
+        segment.close()
+
+
+def test_segment_clamps_term_frequency(segment_path):
+    write_segment(segment_path, {"a" * 32: document({"python": 70000})})
+    segment = Segment(segment_path)
+    try:
+        assert segment.postings("python") == [(0, 0xFFFF)]
+    finally:
+        segment.close()
+
+
+def test_empty_segment(segment_path):
+    write_segment(segment_path, {})
+    segment = Segment(segment_path)
+    try:
+        assert segment.doc_count == 0
+        assert segment.postings("python") == []
+        assert list(segment.iter_terms()) == []
+    finally:
+        segment.close()
+
+
+def test_segment_without_terms_keeps_locations(segment_path):
+    write_segment(segment_path, {"a" * 32: document({}, "remote")})
+    segment = Segment(segment_path)
+    try:
+        assert segment.term_count == 0
+        assert segment.location(0) == "remote"
+    finally:
+        segment.close()
+
+
+@pytest.mark.parametrize("magic, version", [(b"XXXX", 1), (MAGIC, 99)])
+def test_segment_rejects_foreign_files(segment_path, magic, version):
+    with open(segment_path, "wb") as f:
+        f.write(HEADER.pack(magic, version, 0, 0, 0))
+    with pytest.raises(ValueError):
+        Segment(segment_path)
+
+
+@pytest.mark.parametrize("keep", [0, 4, HEADER.size + 10])
+def test_segment_rejects_truncated_files(segment_path, keep):
+    write_segment(segment_path, {"a" * 32: document({"python": 1}, "berlin")})
+    with open(segment_path, "r+b") as f:
+        f.truncate(keep)
+    with pytest.raises(ValueError):
+        Segment(segment_path)
+
+
+def test_replaced_candidate_is_only_found_by_new_text(tmp_path):
+    index = CandidateSearchIndex(str(tmp_path / "index"))
+    index.add_candidate("a" * 32, record("kafka streams"))
+    index.add_candidate("a" * 32, record("rust services"), replace=True)
+    assert index.search("kafka") == []
+    assert [candidate_id for candidate_id, _ in index.search("rust")] == ["a" * 32]
+
+
+def test_compaction_drops_replaced_documents(tmp_path):
+    index = CandidateSearchIndex(str(tmp_path / "index"), max_segments=100)
+    for i in range(3):
+        index.add_candidate(f"{i}" * 32, record("python"))
+    index.add_candidate("0" * 32, record("golang"), replace=True)
+    index.compact()
+    assert len(index._manifest_order) == 1
+    segment = index._segments[index._manifest_order[0]]
+    assert segment.doc_count == 3
+    assert index.search("python", limit=10) and "0" * 32 not in dict(index.search("python", limit=10))
+    assert len(os.listdir(str(tmp_path / "index"))) == 3  # segment, manifest and its lockfile
+
+
+def test_second_instance_sees_updates(tmp_path):
+    first = CandidateSearchIndex(str(tmp_path / "index"))
+    second = CandidateSearchIndex(str(tmp_path / "index"))
+    first.add_candidate("a" * 32, record("kafka"))
+    second.add_candidate("b" * 32, record("kafka"))
+    assert sorted(candidate_id for candidate_id, _ in first.search("kafka")) == ["a" * 32, "b" * 32]
+
+
+def test_filter_only_query_is_ordered_by_id(tmp_path):
+    index = CandidateSearchIndex(str(tmp_path / "index"))
+    for candidate_id in ("c" * 32, "a" * 32, "b" * 32):
+        index.add_candidate(candidate_id, record("text", location="Berlin", experience="5 years"))
+    index.add_candidate("d" * 32, record("text", location="Paris", experience="5 years"))
+    assert index.search("", location="berlin") == [("a" * 32, 0.0), ("b" * 32, 0.0), ("c" * 32, 0.0)]
+    assert index.search("", min_experience=6) == []
+
+
+def test_candidate_document_boosts_skills():
+    doc = candidate_document(record("python", skills=["Python"], experience="4+ years"))
+    assert doc["terms"]["python"] == 4
+    assert doc["experience"] == 4.0
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from candidate_store import BatchWriter, CandidateStore, location_terms, parse_experience_years
+
+
+def record(name, stack, experience="", location="", position="", email=""):
+    return {"candidate_info": {"name": name, "tech_stack": stack, "experience": experience,
+                               "location": location, "desired_position": position, "email": email}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    store.add_many([
+        record("Ada", ["Python", "django"], "5+ years", "Berlin, Germany", "Backend Engineer", "Ada@Example.com"),
+        record("Linus", ["C", "Python"], "12 years", "Portland", "Kernel Developer"),
+        record("Grace", ["javascript", "React"], "2 years", "Berlin", "Frontend Engineer"),
+    ])
+    return store
+
+
+def names(rows):
+    return sorted(row["name"] for row in rows)
+
+
+def test_parsing_helpers():
+    assert parse_experience_years("5+ years") == 5.0
+    assert parse_experience_years("about 3.5") == 3.5
+    assert parse_experience_years(None) is None
+    assert location_terms("Berlin,  GERMANY") == {"berlin", "germany"}
+
+
+def test_technologies_must_all_match_by_alias(store):
+    assert names(store.find(technologies=["python"])) == ["Ada", "Linus"]
+    assert names(store.find(technologies=["Python", "Django"])) == ["Ada"]
+    assert names(store.find(technologies=["JS"])) == ["Grace"]
+    assert store.find(technologies=["Rust"]) == []
+
+
+def test_location_words_match_as_prefixes(store):
+    assert names(store.find(location="berlin")) == ["Ada", "Grace"]
+    assert names(store.find(location="germ BERLIN")) == ["Ada"]
+    assert store.find(location="erlin") == []
+
+
+def test_scalar_filters_combine(store):
+    assert names(store.find(min_experience=5)) == ["Ada", "Linus"]
+    assert names(store.find(min_experience=3, max_experience=10)) == ["Ada"]
+    assert names(store.find(position="backend  engineer")) == ["Ada"]
+    assert names(store.find(email="ada@example.com ")) == ["Ada"]
+    assert names(store.find(technologies=["Python"], location="portland", min_experience=10)) == ["Linus"]
+
+
+def test_results_include_the_record_only_on_request(store):
+    row = store.find(email="ada@example.com")[0]
+    assert "record" not in row
+    full = store.find(email="ada@example.com", include_record=True)[0]
+    assert full["record"]["candidate_info"]["name"] == "Ada"
+    assert store.get(full["id"])["record"] == full["record"]
+    assert store.technologies(full["id"]) == ["Django", "Python"]
+    assert len(store.find(limit=2)) == 2
+
+
+def test_replace_record_reindexes(store):
+    candidate_id = store.find(email="ada@example.com")[0]["id"]
+    store.replace_record(candidate_id, record("Ada", ["Go"], "6 years", "Munich"))
+    assert store.find(technologies=["Python"], location="berlin") == []
+    assert names(store.find(technologies=["golang"], location="mun")) == ["Ada"]
+    assert store.get(candidate_id)["revision"] == 1
+
+
+def test_location_index_is_filled_for_old_stores(tmp_path, store):
+    conn = sqlite3.connect(store.path)
+    with conn:
+        conn.execute("DELETE FROM candidate_locations")
+    conn.close()
+    reopened = CandidateStore(store.path)
+    assert names(reopened.find(location="berlin")) == ["Ada", "Grace"]
+
+
+def test_batch_writer_flushes_in_batches(tmp_path):
+    store = CandidateStore(str(tmp_path / "batched.db"))
+    flushed = []
+    with BatchWriter(store, batch_size=2, on_flush=flushed.append) as writer:
+        for i in range(3):
+            writer.add(record(f"c{i}", ["Python"]))
+        assert store.count() == 2
+    assert store.count() == 3
+    assert [len(batch) for batch in flushed] == [2, 1]
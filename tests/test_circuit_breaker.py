@@ -0,0 +1,214 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_backend
+from llm_backend import CircuitBreaker, CircuitOpenError, LLMTimeoutError, StubBackend
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# Replaces the clock seen by llm_backend only, so other threads keep real time
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_backend, "time", SimpleNamespace(monotonic=clock, perf_counter=time.perf_counter,
+                                                             sleep=time.sleep))
+    return clock
+
+
+def breaker(**kwargs):
+    options = {"error_rate": 0.5, "min_calls": 4, "window": 60, "cooldown": 30}
+    options.update(kwargs)
+    return CircuitBreaker({"backend": "test", "model": "m"}, **options)
+
+
+def fail(b, times):
+    for _ in range(times):
+        b.record(b.allow(), False)
+
+
+def test_stays_closed_below_min_calls(clock):
+    b = breaker()
+    fail(b, 3)
+    assert b.state == CircuitBreaker.CLOSED
+    assert b.allow() is not None
+
+
+def test_opens_at_error_rate(clock):
+    b = breaker()
+    for ok in (True, True, False, False):
+        b.record(b.allow(), ok)
+    assert b.state == CircuitBreaker.OPEN
+    assert b.allow() is None
+
+
+def test_stays_closed_below_error_rate(clock):
+    b = breaker()
+    for ok in (True, True, True, False, True, False):
+        b.record(b.allow(), ok)
+    assert b.state == CircuitBreaker.CLOSED
+
+
+def test_old_outcomes_leave_the_window(clock):
+    b = breaker()
+    fail(b, 3)
+    clock.now += 61
+    b.record(b.allow(), False)
+    assert b.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_probe_through(clock):
+    b = breaker()
+    fail(b, 4)
+    clock.now += 29
+    assert b.allow() is None
+    clock.now += 1
+    probe = b.allow()
+    assert probe is not None and b.state == CircuitBreaker.HALF_OPEN
+    assert b.allow() is None
+
+
+def test_successful_probe_closes(clock):
+    b = breaker()
+    fail(b, 4)
+    clock.now += 30
+    b.record(b.allow(), True)
+    assert b.state == CircuitBreaker.CLOSED
+    assert b.snapshot()["calls"] == 0
+
+
+def test_failed_probe_reopens_for_another_cooldown(clock):
+    b = breaker()
+    fail(b, 4)
+    clock.now += 30
+    b.record(b.allow(), False)
+    assert b.state == CircuitBreaker.OPEN
+    clock.now += 29
+    assert b.allow() is None
+    assert b.snapshot()["open_for_s"] == 1.0
+
+
+def test_released_probe_can_be_retried(clock):
+    b = breaker()
+    fail(b, 4)
+    clock.now += 30
+    b.release(b.allow())
+    assert b.state == CircuitBreaker.HALF_OPEN
+    assert b.allow() is not None
+
+
+def test_late_outcome_from_before_opening_is_ignored(clock):
+    b = breaker()
+    slow_call = b.allow()
+    fail(b, 4)
+    clock.now += 30
+    probe = b.allow()
+    b.record(slow_call, True)
+    assert b.state == CircuitBreaker.HALF_OPEN
+    b.release(slow_call)
+    assert b.allow() is None  # the probe is still out
+    b.record(probe, False)
+    assert b.state == CircuitBreaker.OPEN
+
+
+def test_late_failure_does_not_reopen_closed_breaker(clock):
+    b = breaker(min_calls=1)
+    slow_call = b.allow()
+    fail(b, 1)
+    clock.now += 30
+    b.record(b.allow(), True)
+    b.record(slow_call, False)
+    assert b.state == CircuitBreaker.CLOSED
+
+
+def test_transitions_are_reported_as_gauge(clock):
+    b = breaker()
+    fail(b, 4)
+    gauges = llm_backend.get_metrics().prometheus_text()
+    assert 'talentscout_llm_circuit_state{backend="test",model="m"} 2' in gauges
+
+
+class FlakyBackend(StubBackend):
+    def __init__(self, **kwargs):
+        super().__init__("flaky", latency=0, **kwargs)
+        self.failing = True
+        self.release = threading.Event()
+
+    def _generate(self, prompt, generation_config, safety_settings, timeout):
+        if prompt == "hang":
+            self.release.wait(5)
+        if self.failing:
+            raise RuntimeError("model unavailable")
+        return "ok"
+
+
+def test_backend_short_circuits_while_open():
+    backend = FlakyBackend()
+    backend.breaker = breaker(min_calls=2, cooldown=3600)
+    for i in range(2):
+        with pytest.raises(RuntimeError):
+            backend.generate(f"prompt {i}")
+    with pytest.raises(CircuitOpenError):
+        backend.generate("prompt 3")
+    with pytest.raises(CircuitOpenError):
+        next(backend.stream("prompt 4"))
+
+
+def test_timed_out_calls_do_not_block_streams():
+    backend = FlakyBackend(max_concurrency=1)
+    backend.failing = False
+    try:
+        with pytest.raises(LLMTimeoutError):
+            backend.generate("hang", timeout=0.05)
+        start = time.perf_counter()
+        assert "".join(backend.stream("hello", timeout=2))
+        assert time.perf_counter() - start < 1
+    finally:
+        backend.release.set()
+
+
+# Stands in for the SDK model: while stalled, a request hangs until its request timeout and then fails
+class StalledModel:
+    def __init__(self):
+        self.stalled = True
+        self.timeouts = []
+
+    def generate_content(self, prompt, generation_config=None, safety_settings=None, stream=False,
+                         request_options=None):
+        timeout = request_options["timeout"]
+        self.timeouts.append(timeout)
+        if self.stalled:
+            time.sleep(timeout)
+            raise TimeoutError("Deadline exceeded")
+        if stream:
+            return iter([SimpleNamespace(text="ok")])
+        return SimpleNamespace(text="ok")
+
+
+def test_stalled_requests_give_their_threads_back():
+    backend = llm_backend.GeminiBackend("m", api_key="test", max_concurrency=2, timeout=0.2)
+    backend.breaker = breaker(min_calls=100)
+    backend._model = model = StalledModel()
+    for i in range(4):
+        with pytest.raises(LLMTimeoutError):
+            backend.generate(f"prompt {i}", timeout=0.05)
+    with pytest.raises(LLMTimeoutError):
+        next(backend.stream("stream", timeout=0.05))
+    assert sorted(model.timeouts) == [0.05] * 4 + [0.2]
+
+    model.stalled = False
+    time.sleep(0.3)
+    start = time.perf_counter()
+    assert backend.generate("after", timeout=1).text == "ok"
+    assert "".join(backend.stream("after", timeout=1)) == "ok"
+    assert time.perf_counter() - start < 0.2
+    assert backend._executor._work_queue.empty()
@@ -0,0 +1,64 @@
+from conversation import HISTORY_CONTEXT_MESSAGES, ConversationHistory
+from prompt_builder import OMITTED_MARKER
+
+
+def history(count):
+    result = ConversationHistory()
+    for i in range(count):
+        result.append("user" if i % 2 else "assistant", f"message {i}")
+    return result
+
+
+def test_messages_keep_roles_and_order():
+    h = history(5)
+    assert len(h) == 5
+    assert h.messages(3) == [{"role": "user", "content": "message 3"}, {"role": "assistant", "content": "message 4"}]
+    assert list(h)[0] == {"role": "assistant", "content": "message 0"}
+    assert h.roles == "auaua"
+
+
+def test_short_history_has_no_pages():
+    h = history(12)
+    assert h.window_start(window=12) == 0
+    assert h.page_count(window=12, page_size=5) == 0
+    assert h.page(1, window=12, page_size=5) == []
+
+
+def test_older_messages_are_paged_oldest_first():
+    h = history(25)
+    assert h.window_start(window=12) == 13
+    assert h.page_count(window=12, page_size=5) == 3
+    assert [i for i, _ in h.page(1, window=12, page_size=5)] == [0, 1, 2, 3, 4]
+    assert [i for i, _ in h.page(3, window=12, page_size=5)] == [10, 11, 12]
+    assert h.page(3, window=12, page_size=5)[-1][1]["content"] == "message 12"
+    assert h.page(4, window=12, page_size=5) == []
+
+
+def test_old_messages_are_folded_into_the_summary():
+    h = history(10)
+    assert h.summarized == 10 - HISTORY_CONTEXT_MESSAGES
+    assert h.summary[0] == "Assistant: message 0"
+    context = h.prompt_context()
+    assert "Earlier in the conversation (condensed):" in context
+    assert context.endswith("Candidate: message 9")
+    assert context.count("message 9") == 1
+
+
+def test_summary_drops_its_oldest_lines_past_the_budget():
+    h = ConversationHistory()
+    for i in range(200):
+        h.append("user", f"answer {i} " + "detail " * 30)
+    assert h.summarized == 200 - HISTORY_CONTEXT_MESSAGES
+    assert len(h.summary) < h.summarized
+    assert OMITTED_MARKER in h.prompt_context()
+    assert h.summary[-1].startswith(f"Candidate: answer {h.summarized - 1} ")
+    # The transcript itself stays complete
+    assert h.messages(0, 1)[0]["content"].startswith("answer 0 ")
+
+
+def test_round_trip_and_legacy_lists():
+    h = history(9)
+    assert ConversationHistory.from_data(h.to_dict()).to_dict() == h.to_dict()
+    legacy = ConversationHistory.from_data(h.messages())
+    assert legacy.to_dict() == h.to_dict()
+    assert len(ConversationHistory.from_data(None)) == 0
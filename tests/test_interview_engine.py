@@ -0,0 +1,82 @@
+import pytest
+
+import interview_engine
+from candidate_search import CandidateSearchIndex
+from candidate_store import CandidateStore
+from interview_engine import STAGES, new_session, step, wants_to_exit
+
+
+@pytest.fixture(autouse=True)
+def stores(tmp_path, monkeypatch):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    monkeypatch.setattr(interview_engine, "get_candidate_store", lambda: store)
+    monkeypatch.setattr(interview_engine, "get_search_index", lambda: CandidateSearchIndex(str(tmp_path / "index")))
+    return store
+
+
+# Send one message and return the full reply text, consuming it if it is streamed
+def say(session, text):
+    session, reply = step(session, text)
+    return reply if isinstance(reply, str) else "".join(reply)
+
+
+@pytest.mark.parametrize("text", ["exit", "Bye!", "  QUIT ", "I'd like to end interview now", "please stop"])
+def test_exit_phrases_exit(text):
+    assert wants_to_exit(text)
+
+
+@pytest.mark.parametrize("text", ["nonstop", "I build desktop apps", "backend developer", "exiting", "goodbyes",
+                                  "Python, Go"])
+def test_words_containing_exit_phrases_do_not_exit(text):
+    assert not wants_to_exit(text)
+
+
+def test_each_stage_moves_to_a_declared_transition():
+    session = new_session()
+    script = [
+        ("Ada", "collecting_info"),
+        ("ada@example.com", "collecting_info"),
+        ("5551234567", "collecting_info"),
+        ("4 years", "collecting_info"),
+        ("Backend Engineer", "collecting_info"),
+        ("Berlin", "resume_upload"),
+        ("I don't have one", "tech_stack"),
+        ("Python, Go", "ask_questions"),
+    ]
+    for text, expected in script:
+        before = session.current_stage
+        say(session, text)
+        assert session.current_stage == expected
+        assert session.current_stage == before or session.current_stage in STAGES[before]["transitions"]
+
+    for _ in range(len(session.technical_questions)):
+        assert session.current_stage == "ask_questions"
+        say(session, "I would profile it first and fix the hot path")
+    assert session.current_stage == "conclusion"
+    assert all(q["answer"] for q in session.asked_questions)
+
+    assert say(session, "When will I hear back?")
+    assert session.current_stage == "conclusion"
+    assert session.conversation_history.messages()[-1]["role"] == "assistant"
+
+
+def test_invalid_contact_details_keep_the_stage():
+    session = new_session()
+    say(session, "Ada")
+    assert "valid email" in say(session, "not an email")
+    assert session.current_stage == "collecting_info"
+    assert not session.candidate_info["email"]
+
+
+@pytest.mark.parametrize("stage", ["greeting", "collecting_info", "tech_stack", "ask_questions"])
+def test_exit_ends_the_interview_in_any_stage(stage):
+    session = new_session()
+    session.current_stage = stage
+    assert "end our conversation" in say(session, "exit")
+    assert session.current_stage == "conclusion"
+
+
+def test_unknown_stage_asks_to_rephrase():
+    session = new_session()
+    session.current_stage = "missing"
+    assert say(session, "hello") == interview_engine.UNKNOWN_STAGE_REPLY
@@ -0,0 +1,73 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from llm_backend import LLMBackend, LLMTimeoutError, StubBackend, get_backend
+
+
+# Backend whose calls block until released, counting how many reached the model
+class GatedBackend(LLMBackend):
+    name = "gated"
+
+    def __init__(self, **kwargs):
+        super().__init__("m", **kwargs)
+        self.release = threading.Event()
+        self.calls = 0
+
+    def _generate(self, prompt, generation_config, safety_settings, timeout):
+        self.calls += 1
+        self.release.wait(5)
+        return f"answer to {prompt}"
+
+
+def test_identical_in_flight_prompts_share_one_call():
+    backend = GatedBackend()
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(backend.generate, "same") for _ in range(4)]
+        other = pool.submit(backend.generate, "other")
+        while len(backend._in_flight) < 2:
+            threading.Event().wait(0.01)
+        backend.release.set()
+        texts = [future.result().text for future in futures]
+    assert texts == ["answer to same"] * 4
+    assert other.result().text == "answer to other"
+    assert backend.calls == 2
+    assert backend._in_flight == {}
+
+
+def test_call_past_its_deadline_times_out_and_is_not_shared():
+    backend = GatedBackend()
+    with pytest.raises(LLMTimeoutError):
+        backend.generate("slow", timeout=0.05)
+    assert backend._in_flight == {}
+    backend.release.set()
+    assert backend.generate("slow").text == "answer to slow"
+    assert backend.calls == 2
+
+
+def test_stub_templates_follow_the_prompt():
+    stub = StubBackend("m", latency=0)
+    profile = json.loads(stub.generate("Return a JSON object with these keys. Resume: 7 years of Python and Docker, "
+                                       "ada@example.com").text)
+    assert profile["email"] == "ada@example.com" and profile["experience"] == "7 years"
+    assert "Python" in profile["tech_stack"] and "Docker" in profile["tech_stack"]
+    reply = stub.generate("Hello there").text
+    assert "recruiter" in reply
+    assert "".join(stub.stream("Hello there")) == reply
+
+
+def test_stub_canned_responses(tmp_path):
+    path = tmp_path / "canned.json"
+    path.write_text(json.dumps({"magic word": "canned reply"}))
+    stub = StubBackend("m", latency=0, responses_path=str(path))
+    assert stub.generate("say the magic word").text == "canned reply"
+
+
+def test_backends_are_shared_per_model():
+    backend = get_backend("shared-model", "stub")
+    assert get_backend("shared-model", "stub") is backend
+    assert backend.cache_id == "stub:shared-model"
+    with pytest.raises(ValueError):
+        get_backend("shared-model", "nope")
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+
+import interview_engine
+from benchmarks.corpus import MemoryFile, build_txt
+from candidate_search import CandidateSearchIndex
+from candidate_store import CandidateStore
+from interview_engine import (analyze_resume_with_questions, get_cached_one_shot_analysis, new_session, step,
+                              upload_resume)
+from resume_extract import TXT_MIME
+
+
+@pytest.fixture(autouse=True)
+def one_shot(tmp_path, monkeypatch):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    monkeypatch.setattr(interview_engine, "get_candidate_store", lambda: store)
+    monkeypatch.setattr(interview_engine, "get_search_index", lambda: CandidateSearchIndex(str(tmp_path / "index")))
+    monkeypatch.setattr(interview_engine, "ONE_SHOT_ANALYSIS", True)
+
+
+def resume(*lines):
+    # A unique line keeps each test's file hash (and so its cache entries) apart
+    return MemoryFile("resume.txt", TXT_MIME, build_txt(list(lines) + [uuid.uuid4().hex]))
+
+
+def test_one_request_returns_profile_and_numbered_questions():
+    result = analyze_resume_with_questions("8 years of Python and Docker. ada@example.com", "Backend Engineer")
+    assert result["resume_data"]["email"] == "ada@example.com"
+    assert [q["question"][:3] for q in result["questions"]] == ["1. ", "2. ", "3. ", "4. ", "5. "]
+    assert all(q["answer"] is None for q in result["questions"])
+
+
+def test_results_are_cached_per_file_and_position_but_failures_are_not():
+    calls = []
+
+    def analyze(text, position):
+        calls.append(position)
+        return {"resume_data": {"name": "Ada"}, "questions": []} if position else None
+
+    file_hash = uuid.uuid4().hex
+    assert get_cached_one_shot_analysis(file_hash, "text", "", analyze=analyze) is None
+    assert get_cached_one_shot_analysis(file_hash, "text", "", analyze=analyze) is None
+    first = get_cached_one_shot_analysis(file_hash, "text", "Engineer", analyze=analyze)
+    assert get_cached_one_shot_analysis(file_hash, "text", "Engineer", analyze=analyze) == first
+    assert calls == ["", "", "Engineer"]
+
+
+def test_drafted_questions_are_used_when_the_stack_is_kept():
+    session = new_session()
+    resume_text, resume_data = upload_resume(session, resume("Python developer, 6 years", "Skills: Python, Docker"))
+    drafted = session.tentative_questions
+    assert resume_data and drafted["tech_stack"] == session.candidate_info["tech_stack"]
+    assert session.question_prefetch.keys() == []
+
+    session.current_stage = "tech_stack"
+    step(session, "yes")
+    assert session.technical_questions == drafted["questions"]
+
+
+def test_drafted_questions_are_dropped_when_the_stack_changes():
+    session = new_session()
+    upload_resume(session, resume("Python developer, 6 years", "Skills: Python"))
+    drafted = session.tentative_questions["questions"]
+
+    session.current_stage = "tech_stack"
+    step(session, "Rust")
+    assert "Rust" in session.candidate_info["tech_stack"]
+    assert session.technical_questions != drafted
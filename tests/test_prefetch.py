@@ -0,0 +1,92 @@
+import threading
+
+import interview_engine
+from interview_engine import end_session, get_session_prefetch, new_session, take_prefetched_questions, tech_stack_key
+from prefetch import PREFETCH_WORKERS, PrefetchRegistry
+from question_bank import number_questions
+
+
+def blocked():
+    release = threading.Event()
+    return release, lambda: release.wait(5) and "done"
+
+
+def test_submit_reuses_work_for_the_same_key():
+    registry = PrefetchRegistry()
+    calls = []
+    first = registry.submit("a", lambda: calls.append(1) or "result")
+    assert registry.submit("a", lambda: calls.append(2)) is first
+    assert registry.result("a", timeout=5) == "result"
+    assert calls == [1]
+    assert registry.result("missing") is None
+
+
+def test_new_key_cancels_stale_work():
+    registry = PrefetchRegistry()
+    releases = []
+    # Fill the executor so the next submissions stay queued and can be cancelled
+    for i in range(PREFETCH_WORKERS):
+        release, fn = blocked()
+        releases.append(release)
+        PrefetchRegistry().submit(i, fn)
+    try:
+        stale = registry.submit("old", lambda: "old")
+        registry.submit("new", lambda: "new")
+        assert stale.cancelled()
+        assert registry.keys() == ["new"]
+    finally:
+        for release in releases:
+            release.set()
+    assert registry.result("new", timeout=5) == "new"
+
+
+def test_failed_work_gives_none():
+    registry = PrefetchRegistry()
+    registry.submit("a", lambda: 1 / 0)
+    assert registry.result("a", timeout=5) is None
+
+
+def test_registries_are_per_session_and_dropped_when_ended():
+    session = new_session()
+    registry = get_session_prefetch(session.session_id)
+    assert session.question_prefetch is registry
+    assert get_session_prefetch(new_session().session_id) is not registry
+    end_session(session)
+    assert session.session_id not in interview_engine._prefetch_registries
+
+
+def test_least_recently_used_registry_is_evicted(monkeypatch):
+    monkeypatch.setattr(interview_engine, "PREFETCH_SESSIONS", 2)
+    monkeypatch.setattr(interview_engine, "_prefetch_registries", type(interview_engine._prefetch_registries)())
+    first = get_session_prefetch("first")
+    get_session_prefetch("second")
+    assert get_session_prefetch("first") is first
+    get_session_prefetch("third")
+    assert list(interview_engine._prefetch_registries) == ["first", "third"]
+
+
+def test_stack_key_ignores_order_case_and_aliases():
+    assert tech_stack_key(["React", "python", " "]) == tech_stack_key(["Python", "react.js"])
+
+
+def test_prefetched_questions_are_reused_for_a_grown_stack(monkeypatch):
+    session = new_session()
+    prefetched = number_questions([f"Python {i}?" for i in range(5)])
+    session.question_prefetch.submit(tech_stack_key(["Python"]), lambda: prefetched)
+    asked = []
+    monkeypatch.setattr(interview_engine, "get_technical_questions",
+                        lambda stack, *args: asked.append(stack) or number_questions([f"{stack[0]} q?"] * 5))
+
+    questions = take_prefetched_questions(session, ["Python", "Go"], "Engineer")
+    assert asked == [["Go"]]
+    assert len(questions) == interview_engine.QUESTIONS_PER_INTERVIEW
+    assert any("Go q?" in q["question"] for q in questions)
+    assert session.question_prefetch.keys() == []
+    end_session(session)
+
+
+def test_unrelated_stack_does_not_use_the_prefetch():
+    session = new_session()
+    session.question_prefetch.submit(tech_stack_key(["Python"]), lambda: ["unused"])
+    assert take_prefetched_questions(session, ["Go"], "Engineer") is None
+    end_session(session)
@@ -0,0 +1,55 @@
+from prompt_builder import (FIELD_TOKENS, OMITTED_MARKER, estimate_tokens, join_within_budget, prompt_candidate_info,
+                            select_resume_text, split_sections, truncate_to_tokens)
+
+CONTACT = "Ada Lovelace\nada@example.com | +44 20 7946 0000"
+SKILLS = "SKILLS\nPython, Kafka, Docker, Kubernetes, PostgreSQL, Redis"
+EXPERIENCE = "Experience:\nSenior engineer, 8 years. Built and deployed streaming services in Python and Kafka."
+HOBBIES = "Hobbies\n" + "I enjoy long walks along the river and the occasional crossword puzzle. " * 20
+
+
+def test_estimate_and_truncate():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+    assert truncate_to_tokens("short", 10) == "short"
+    cut = truncate_to_tokens("word " * 100, 10)
+    assert cut.endswith(" " + OMITTED_MARKER)
+    assert len(cut) <= 10 * 4 + len(OMITTED_MARKER) + 1
+    assert not cut[:-len(OMITTED_MARKER)].rstrip().endswith("wor")
+
+
+def test_join_within_budget_keeps_whole_items():
+    assert join_within_budget(["Python", "Go", "Rust"], 100) == "Python, Go, Rust"
+    assert join_within_budget(["Python", "Go", "Rust"], 3) == "Python, Go"
+    assert join_within_budget(["Python", "Go", "Rust"], 2) == "Python"
+    assert join_within_budget(["A very long technology name"], 1) == "A very long technology name"
+
+
+def test_split_sections_at_headers():
+    sections = split_sections("\n\n".join([CONTACT, SKILLS, EXPERIENCE]))
+    assert [header for header, _ in sections] == [None, "SKILLS", "Experience"]
+    assert sections[1][1].startswith("SKILLS\nPython")
+
+
+def test_short_resume_is_unchanged():
+    text = "\n\n".join([CONTACT, SKILLS])
+    assert select_resume_text(text, 1000) == text
+
+
+def test_long_resume_keeps_contact_and_dense_sections_in_order():
+    text = "\n\n".join([CONTACT, HOBBIES, SKILLS, EXPERIENCE])
+    selected = select_resume_text(text, 80)
+    assert estimate_tokens(selected) <= 80 + 10
+    assert selected.startswith(CONTACT)
+    assert "long walks" not in selected
+    assert selected.index("SKILLS") < selected.index("Experience:")
+    assert selected.endswith(f"{OMITTED_MARKER}\n\n{SKILLS}\n\n{EXPERIENCE}")
+
+
+def test_prompt_candidate_info_drops_resume_and_caps_fields():
+    info = prompt_candidate_info({
+        "name": "Ada", "resume_text": "full resume", "resume_filename": "cv.pdf",
+        "experience": "x " * 1000, "tech_stack": [f"Tech{i}" for i in range(500)],
+    })
+    assert set(info) == {"name", "experience", "tech_stack"}
+    assert estimate_tokens(info["experience"]) <= FIELD_TOKENS + 2
+    assert info["tech_stack"].startswith("Tech0, Tech1") and "Tech499" not in info["tech_stack"]
@@ -0,0 +1,75 @@
+import pytest
+
+from question_bank import QuestionBank, build_bank, number_questions, seniority_level, strip_number
+
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(str(tmp_path / "question_bank.json"))
+    bank.add("Python", {
+        "junior": [f"Python junior {i}?" for i in range(2)],
+        "mid": [f"Python mid {i}?" for i in range(2)],
+        "senior": [f"Python senior {i}?" for i in range(5)],
+    })
+    bank.add("JS", {"mid": [f"JavaScript mid {i}?" for i in range(5)]})
+    return bank
+
+
+@pytest.mark.parametrize("experience, level", [("", "mid"), ("1 year", "junior"), ("3.5 years", "mid"),
+                                               ("10+ years", "senior")])
+def test_seniority_level(experience, level):
+    assert seniority_level(experience) == level
+
+
+def test_numbering():
+    assert strip_number(" 3) Why?") == "Why?"
+    assert number_questions(["1. A?", "B?"]) == [{"question": "1. A?", "answer": None},
+                                                 {"question": "2. B?", "answer": None}]
+
+
+def test_covered_stack_is_filled_from_the_requested_level(bank):
+    questions, uncovered = bank.assemble(["Python"], experience="8 years")
+    assert uncovered == {}
+    assert len(questions) == 5 and len(set(questions)) == 5
+    assert all(q.startswith("Python senior") for q in questions)
+
+
+def test_short_level_falls_back_to_the_nearest_levels(bank):
+    questions, uncovered = bank.assemble(["Python"], experience="1 year", count=4)
+    assert uncovered == {}
+    assert sorted(q.split()[1] for q in questions) == ["junior", "junior", "mid", "mid"]
+
+
+def test_slots_are_shared_round_robin_and_gaps_reported(bank):
+    questions, uncovered = bank.assemble(["Python", "Go", "javascript", "JavaScript"], experience="3 years")
+    # Slots: Python 2, Go 2, JavaScript 1; aliases count once
+    assert uncovered == {"Go": 2}
+    assert sorted(q.split()[0] for q in questions) == ["JavaScript", "Python", "Python"]
+
+
+def test_exhausted_bank_reports_the_missing_slots(bank):
+    questions, uncovered = bank.assemble(["JavaScript"], count=7)
+    assert len(questions) == 5
+    assert uncovered == {"JavaScript": 2}
+
+
+def test_empty_stack(bank):
+    assert bank.assemble([]) == ([], {})
+
+
+def test_save_and_reload(bank):
+    bank.save()
+    loaded = QuestionBank(bank.path)
+    assert loaded.index == bank.index
+    assert loaded.covers("js") and not loaded.covers("Go")
+    assert loaded.display_names["javascript"] == "JavaScript"
+
+
+def test_build_bank_skips_filled_levels(tmp_path):
+    path = str(tmp_path / "built.json")
+    bank = build_bank(["Rust"], levels=["mid"], per_level=3, path=path)
+    assert len(bank.index["rust"]["mid"]) == 3
+    assert not bank.index["rust"]["mid"][0][0].isdigit()
+    rebuilt = build_bank(["rust", "Rust"], levels=["mid", "senior"], per_level=3, path=path)
+    assert rebuilt.index["rust"]["mid"] == bank.index["rust"]["mid"]
+    assert len(rebuilt.index["rust"]["senior"]) == 3
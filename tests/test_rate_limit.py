@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter, retry_with_backoff
+
+
+# Fake clock for rate_limit only: sleep() advances monotonic() and records the delay
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+def test_burst_is_allowed_then_calls_are_spaced(clock):
+    limiter = RateLimiter(60, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(1.0), pytest.approx(1.0)]
+
+
+def test_idle_time_refills_up_to_capacity(clock):
+    limiter = RateLimiter(120)
+    assert limiter.capacity == 12
+    for _ in range(12):
+        limiter.acquire()
+    clock.now += 3600
+    for _ in range(12):
+        limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_zero_rate_is_unlimited(clock):
+    limiter = RateLimiter(0)
+    for _ in range(100):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+
+def flaky(failures, error=RuntimeError):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("try again")
+        return len(calls)
+    return fn, calls
+
+
+def test_retries_with_exponential_backoff_and_jitter(clock):
+    fn, calls = flaky(3)
+    assert retry_with_backoff(fn, retries=3, base_delay=1.0) == 4
+    for sleep, full in zip(clock.sleeps, [1.0, 2.0, 4.0]):
+        assert full / 2 <= sleep <= full
+    assert len(clock.sleeps) == 3
+
+
+def test_delay_is_capped(clock):
+    fn, _ = flaky(6)
+    retry_with_backoff(fn, retries=6, base_delay=1.0, max_delay=5.0)
+    assert max(clock.sleeps) <= 5.0
+
+
+def test_gives_up_after_the_last_retry(clock):
+    fn, calls = flaky(10)
+    with pytest.raises(RuntimeError):
+        retry_with_backoff(fn, retries=2)
+    assert len(calls) == 3
+
+
+def test_only_listed_errors_are_retried(clock):
+    fn, calls = flaky(1, error=KeyError)
+    with pytest.raises(KeyError):
+        retry_with_backoff(fn, retries=3, retry_on=(ValueError,))
+    assert len(calls) == 1 and clock.sleeps == []
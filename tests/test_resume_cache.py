@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from resume_cache import ResumeCache, hash_bytes, make_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResumeCache(str(tmp_path / "cache"), max_bytes=10_000, memory_entries=2)
+
+
+def test_keys_depend_on_every_part():
+    key = make_cache_key("analysis", "abc", "model", 2)
+    assert key.startswith("analysis-")
+    assert key == make_cache_key("analysis", "abc", "model", 2)
+    assert key != make_cache_key("analysis", "abc", "model", 3)
+    assert make_cache_key("a", "bc") != make_cache_key("a", "b", "c")
+    assert hash_bytes(b"resume") == hash_bytes(b"resume") != hash_bytes(b"resume ")
+
+
+def test_memory_hits_return_independent_copies(cache):
+    value = {"tech_stack": ["Python"], "name": "Ada"}
+    cache.put("k", value)
+    value["tech_stack"].append("put-side mutation")
+    first = cache.get("k")
+    first["tech_stack"].append("Go")
+    first["name"] = "changed"
+    assert cache.get("k") == {"tech_stack": ["Python"], "name": "Ada"}
+    assert cache.get("k") is not cache.get("k")
+
+
+def test_disk_hits_return_independent_copies(cache):
+    cache.put("k", {"tech_stack": ["Python"]})
+    reopened = ResumeCache(cache.cache_dir, max_bytes=10_000, memory_entries=2)
+    reopened.get("k")["tech_stack"].append("Go")
+    # The second read is served from the memory tier filled by the first
+    assert reopened.get("k") == {"tech_stack": ["Python"]}
+
+
+def test_misses_and_corrupt_entries(cache):
+    assert cache.get("missing") is None
+    cache.put("k", {"a": 1})
+    with open(cache._path("k"), "w") as f:
+        f.write("{not json")
+    cache._memory.clear()
+    assert cache.get("k") is None
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_least_recently_used_files_are_evicted(cache):
+    text = "x" * 3000
+    for key in ("a", "b", "c"):
+        cache.put(key, text)
+    # A disk hit moves "a" to the end of the on-disk LRU order
+    cache._memory.clear()
+    cache.get("a")
+    cache.put("d", text)
+    assert os.path.exists(cache._path("a"))
+    assert not os.path.exists(cache._path("b"))
+    assert cache._disk_bytes <= cache.max_bytes
+
+
+def test_clear_removes_both_tiers(cache):
+    cache.put("k", {"a": 1})
+    cache.clear()
+    assert cache.get("k") is None
+    assert not os.path.exists(cache._path("k"))
@@ -0,0 +1,55 @@
+import pytest
+
+import resume_extract
+from benchmarks.corpus import LINES_PER_PAGE, build_docx, build_pdf, build_txt
+from resume_extract import (DOCX_MIME, PDF_MIME, TXT_MIME, ResumeTooLargeError, extract_text, iter_resume_text)
+
+LINES = [f"Line {i}: Built services in Python and Kafka" for i in range(3 * LINES_PER_PAGE)]
+
+
+@pytest.fixture(autouse=True)
+def no_ocr(monkeypatch):
+    monkeypatch.setattr(resume_extract, "ocr_available", lambda: False)
+
+
+def words(text):
+    return text.split()
+
+
+@pytest.mark.parametrize("file_type, build", [(TXT_MIME, build_txt), (DOCX_MIME, build_docx), (PDF_MIME, build_pdf)])
+def test_every_format_yields_all_lines_in_order(file_type, build):
+    text = extract_text(build(LINES), file_type)
+    assert words(text) == words("\n".join(LINES))
+
+
+def test_max_chars_stops_early():
+    text = extract_text(build_txt(LINES), TXT_MIME, max_chars=100)
+    assert len(text) == 100
+    assert text.startswith(LINES[0])
+
+
+def test_max_pages_limits_pdf_pages():
+    text = extract_text(build_pdf(LINES), PDF_MIME, max_pages=1)
+    assert f"Line {LINES_PER_PAGE - 1}:" in text
+    assert f"Line {LINES_PER_PAGE}:" not in text
+
+
+def test_oversized_and_unsupported_files_are_rejected():
+    with pytest.raises(ResumeTooLargeError):
+        extract_text(b"x" * 11, TXT_MIME, max_bytes=10)
+    with pytest.raises(ValueError):
+        extract_text(b"x", "image/png")
+
+
+def test_closing_the_stream_early_is_safe():
+    chunks = iter_resume_text(build_pdf(LINES), PDF_MIME)
+    assert next(chunks).startswith("Line 0:")
+    chunks.close()
+
+
+def test_long_pdf_pages_are_extracted_in_parallel_in_order(monkeypatch):
+    monkeypatch.setattr(resume_extract, "EXTRACT_WORKERS", 2)
+    lines = [f"Page line {i}" for i in range(resume_extract.PARALLEL_PAGE_THRESHOLD * LINES_PER_PAGE + 1)]
+    text = extract_text(build_pdf(lines), PDF_MIME, max_chars=None)
+    assert words(text) == words("\n".join(lines))
+    assert resume_extract._pool is not None
@@ -0,0 +1,95 @@
+import pytest
+
+import interview_engine
+import resume_extract
+from benchmarks.corpus import LINES_PER_PAGE, MemoryFile, build_pdf
+from resume_cache import ResumeCache
+from resume_extract import PDF_MIME, extract_text
+from resume_ocr import needs_ocr
+
+# One page with a text layer, then a "scanned" page with almost no text
+LINES = [f"Line {i}: Python and Kafka" for i in range(LINES_PER_PAGE)] + ["x"]
+
+
+# Stands in for PageOCR: returns OCR text, or falls back to the text layer when OCR "fails"
+class FakePageOCR:
+    fail = False
+    created = []
+
+    def __init__(self, page, text_layer):
+        self.text_layer = text_layer
+        self.degraded = False
+        self.cancelled = False
+        FakePageOCR.created.append(self)
+
+    def result(self):
+        if FakePageOCR.fail:
+            self.degraded = True
+            return self.text_layer
+        return "Scanned page: Rust and Go"
+
+    def cancel(self):
+        self.cancelled = True
+
+
+@pytest.fixture(autouse=True)
+def fake_ocr(monkeypatch):
+    monkeypatch.setattr(resume_extract, "ocr_available", lambda: True)
+    monkeypatch.setattr(resume_extract, "PageOCR", FakePageOCR)
+    monkeypatch.setattr(FakePageOCR, "fail", False)
+    monkeypatch.setattr(FakePageOCR, "created", [])
+
+
+def test_needs_ocr():
+    assert needs_ocr("")
+    assert needs_ocr(" 1 \n x ")
+    assert not needs_ocr("Senior engineer with Python experience")
+
+
+def test_pages_without_text_are_ocred_in_order():
+    fallbacks = []
+    text = extract_text(build_pdf(LINES), PDF_MIME, on_ocr_fallback=lambda: fallbacks.append(1))
+    assert len(FakePageOCR.created) == 1
+    assert text.index(f"Line {LINES_PER_PAGE - 1}:") < text.index("Scanned page: Rust and Go")
+    assert fallbacks == []
+
+
+def test_failed_ocr_falls_back_to_the_text_layer():
+    FakePageOCR.fail = True
+    fallbacks = []
+    text = extract_text(build_pdf(LINES), PDF_MIME, on_ocr_fallback=lambda: fallbacks.append(1))
+    assert "Scanned page" not in text
+    assert text.rstrip().endswith("x")
+    assert fallbacks == [1]
+
+
+def test_stopping_early_cancels_pending_ocr():
+    pages = build_pdf(["x"] + [""] * (LINES_PER_PAGE - 1) + LINES)
+    extract_text(pages, PDF_MIME, max_chars=1)
+    # The first scanned page was read; the one still pending at the end is cancelled
+    assert [page.cancelled for page in FakePageOCR.created] == [False, True]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResumeCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(interview_engine, "get_resume_cache", lambda: cache)
+    monkeypatch.setattr(interview_engine, "ocr_available", lambda: True)
+    return cache
+
+
+def test_resume_text_with_ocr_fallback_is_not_cached(cache):
+    FakePageOCR.fail = True
+    upload = MemoryFile("scan.pdf", PDF_MIME, build_pdf(LINES))
+    interview_engine.get_cached_resume_text(upload)
+    interview_engine.get_cached_resume_text(upload)
+    assert len(FakePageOCR.created) == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_resume_text_with_successful_ocr_is_cached(cache):
+    upload = MemoryFile("scan.pdf", PDF_MIME, build_pdf(LINES))
+    _, first = interview_engine.get_cached_resume_text(upload)
+    _, second = interview_engine.get_cached_resume_text(upload)
+    assert first == second and "Scanned page" in first
+    assert len(FakePageOCR.created) == 1
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+import tornado.httpserver
+import tornado.testing
+from tornado.httpclient import AsyncHTTPClient
+
+import interview_engine
+import server
+from candidate_store import CandidateStore
+from resume_extract import TXT_MIME
+from session_store import MemorySessionStore, ResumeTextStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MemorySessionStore(resume_texts=ResumeTextStore(str(tmp_path / "resume_text")))
+    candidates = CandidateStore(str(tmp_path / "candidates.db"))
+    monkeypatch.setattr(server, "get_session_store", lambda: store)
+    monkeypatch.setattr(interview_engine, "get_candidate_store", lambda: candidates)
+    return store
+
+
+# Serve make_app() on a free port for the duration of scenario(fetch, app)
+def run(scenario):
+    async def main():
+        app = server.make_app(workers=4)
+        sock, port = tornado.testing.bind_unused_port()
+        http_server = tornado.httpserver.HTTPServer(app)
+        http_server.add_sockets([sock])
+        client = AsyncHTTPClient()
+
+        async def fetch(path, method="GET", body=None, headers=None):
+            if isinstance(body, dict):
+                body = json.dumps(body)
+            response = await client.fetch(f"http://127.0.0.1:{port}{path}", method=method, body=body,
+                                          headers=headers, raise_error=False)
+            data = json.loads(response.body) if response.body and response.code != 204 else None
+            return response.code, data
+
+        try:
+            await scenario(fetch, app)
+        finally:
+            http_server.stop()
+            client.close()
+
+    asyncio.run(main())
+
+
+def test_interview_flow(store):
+    async def scenario(fetch, app):
+        code, created = await fetch("/sessions", "POST", body="")
+        assert code == 201
+        path = f"/sessions/{created['session_id']}"
+
+        code, reply = await fetch(f"{path}/messages", "POST", {"text": "Ada"})
+        assert code == 200 and reply["stage"] == "collecting_info"
+        assert "Ada" in reply["reply"]
+
+        code, reply = await fetch(f"{path}/resume", "POST", body="Python engineer, 5 years, ada@example.com",
+                                  headers={"Content-Type": TXT_MIME, "X-Filename": "resume.txt"})
+        assert code == 200 and reply["extracted_chars"] > 0
+        assert "resume_text" not in reply["session"]["candidate_info"]
+
+        code, summary = await fetch(path)
+        assert code == 200 and summary["resume_uploaded"] and summary["version"] == 3
+
+        assert (await fetch(path, "DELETE"))[0] == 204
+        assert (await fetch(path))[0] == 404
+        assert len(store) == 0
+
+    run(scenario)
+
+
+def test_bad_requests(store):
+    async def scenario(fetch, app):
+        _, created = await fetch("/sessions", "POST", body="")
+        path = f"/sessions/{created['session_id']}"
+        assert (await fetch(f"{path}/messages", "POST", body="not json"))[0] == 400
+        assert (await fetch(f"{path}/messages", "POST", {"text": "  "}))[0] == 400
+        assert (await fetch(f"/sessions/{'0' * 32}/messages", "POST", {"text": "hi"}))[0] == 404
+        code, reply = await fetch(f"{path}/resume", "POST", body="x", headers={"Content-Type": "image/png"})
+        assert code == 415 and reply["error"]
+
+    run(scenario)
+
+
+def test_concurrent_messages_to_one_session_are_serialized(store):
+    async def scenario(fetch, app):
+        _, created = await fetch("/sessions", "POST", body="")
+        path = f"/sessions/{created['session_id']}/messages"
+        results = await asyncio.gather(*[fetch(path, "POST", {"text": text})
+                                         for text in ["Ada", "ada@example.com", "5551234567"]])
+        # Without the per-session lock, requests would load the same version and all but one would get a 409
+        assert [code for code, _ in results] == [200, 200, 200]
+        session = store.get(created["session_id"])
+        assert session.version == 4
+        user_messages = [m["content"] for m in session.conversation_history.messages() if m["role"] == "user"]
+        assert sorted(user_messages) == ["5551234567", "Ada", "ada@example.com"]
+        # Lock entries are dropped once no request holds or waits for them
+        assert app.wildcard_router.rules[0].target_kwargs["locks"] == {}
+
+    run(scenario)
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+from interview_engine import new_session
+from session_store import MemorySessionStore, ResumeTextStore, SessionConflictError, SQLiteSessionStore
+
+RESUME = "Senior engineer with ten years of Python."
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    texts = ResumeTextStore(str(tmp_path / "resume_text"))
+    if request.param == "memory":
+        return MemorySessionStore(resume_texts=texts)
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"), resume_texts=texts)
+
+
+def with_resume(store, text=RESUME):
+    session = new_session()
+    session.candidate_info["resume_text"] = text
+    store.put(session)
+    return session
+
+
+def text_id(text=RESUME):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def text_path(store, text=RESUME):
+    return store.resume_texts._path(text_id(text))
+
+
+def test_round_trip_keeps_resume_text_out_of_the_payload(store):
+    session = with_resume(store)
+    loaded = store.get(session.session_id)
+    assert loaded.candidate_info["resume_text"] == RESUME
+    assert loaded.version == 1
+    assert store.get("missing") is None
+
+
+def test_stale_write_is_rejected(store):
+    session = with_resume(store)
+    stale = store.get(session.session_id)
+    store.put(session)
+    with pytest.raises(SessionConflictError):
+        store.put(stale)
+    assert stale.version == 1
+
+
+def test_deleting_one_of_two_sessions_sharing_a_text_keeps_it(store):
+    first, second = with_resume(store), with_resume(store)
+    path = text_path(store)
+    store.delete(first.session_id)
+    assert os.path.exists(path)
+    assert store.get(second.session_id).candidate_info["resume_text"] == RESUME
+    store.delete(second.session_id)
+    assert not os.path.exists(path)
+
+
+def test_resume_text_quoted_in_another_session_does_not_keep_it(store):
+    session = with_resume(store)
+    path = text_path(store)
+    other = new_session()
+    other.conversation_history.append("user", f"my old resume id was {text_id()}")
+    store.put(other)
+    store.delete(session.session_id)
+    assert not os.path.exists(path)
+
+
+def test_replaced_resume_text_is_released(store):
+    session, other = with_resume(store), with_resume(store, "Another resume.")
+    session.candidate_info["resume_text"] = "Another resume."
+    store.put(session)
+    store.delete(other.session_id)
+    assert os.path.exists(text_path(store, "Another resume."))
+    store.delete(session.session_id)
+    assert not os.path.exists(text_path(store, "Another resume."))
+
+
+def test_purge_expired_removes_old_sessions_and_texts(store):
+    session = with_resume(store)
+    path = text_path(store)
+    os.utime(path, (0, 0))
+    store.ttl = -1
+    assert store.purge_expired() == 1
+    assert store.get(session.session_id) is None
+    assert not os.path.exists(path)
+
+
+def test_text_id_column_is_added_to_old_stores(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    texts = ResumeTextStore(str(tmp_path / "resume_text"))
+    store = SQLiteSessionStore(path, resume_texts=texts)
+    first, second = with_resume(store), with_resume(store)
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP INDEX idx_sessions_text; ALTER TABLE sessions DROP COLUMN text_id;")
+    conn.close()
+
+    store = SQLiteSessionStore(path, resume_texts=texts)
+    store.delete(first.session_id)
+    assert os.path.exists(text_path(store))
+    store.delete(second.session_id)
+    assert not os.path.exists(text_path(store))
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import metrics
+from metrics import Metrics, record_script_run, script_run_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ["PyPDF2", "docx", "multiprocessing", "http.server"]
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    fresh = Metrics(log_path="")
+    monkeypatch.setattr(metrics, "_metrics", fresh)
+    monkeypatch.setattr(metrics, "_script_runs", {"startup_ms": None, "last_rerun_ms": None})
+    monkeypatch.setattr(metrics, "STARTUP_BUDGET_MS", 1000.0)
+    monkeypatch.setattr(metrics, "RERUN_BUDGET_MS", 100.0)
+    return fresh
+
+
+def test_engine_import_leaves_parsers_unloaded():
+    code = f"import sys, interview_engine; print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=os.environ.copy(),
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_first_run_is_startup_and_later_runs_are_reruns(fresh_metrics):
+    record_script_run(0.5)
+    record_script_run(0.02)
+    record_script_run(0.04)
+    report = script_run_report()
+    assert report["startup_ms"] == 500 and report["last_rerun_ms"] == 40
+    assert report["startup_budget_ms"] == 1000 and report["rerun_budget_ms"] == 100
+    assert fresh_metrics.summary()["rerun"]["count"] == 2
+
+
+def test_runs_over_budget_are_counted(fresh_metrics, capsys):
+    record_script_run(2.0)
+    record_script_run(0.05)
+    record_script_run(0.3)
+    assert fresh_metrics._counters == {("budget_exceeded", (("timer", "startup"),)): 1,
+                                       ("budget_exceeded", (("timer", "rerun"),)): 1}
+    assert "rerun took 300 ms (budget 100 ms)" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import pytest
+
+import interview_engine
+from interview_engine import new_session, step, stream_model_text, stream_questions_reply
+
+
+class FailingModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def stream(self, prompt, **kwargs):
+        yield from self.chunks
+        raise RuntimeError("connection reset")
+
+
+@pytest.fixture
+def concluded():
+    session = new_session()
+    session.current_stage = "conclusion"
+    return session
+
+
+def test_streamed_reply_is_added_to_the_history_once_consumed(concluded):
+    session, reply = step(concluded, "When will I hear back?")
+    assert not isinstance(reply, str)
+    assert session.conversation_history.messages()[-1] == {"role": "user", "content": "When will I hear back?"}
+    text = "".join(reply)
+    assert session.conversation_history.messages()[-1] == {"role": "assistant", "content": text}
+
+
+def test_abandoned_stream_keeps_what_was_shown(concluded):
+    session, reply = step(concluded, "When will I hear back?")
+    first = next(reply)
+    reply.close()
+    assert session.conversation_history.messages()[-1] == {"role": "assistant", "content": first}
+
+
+def test_failure_before_the_first_chunk_falls_back(monkeypatch):
+    monkeypatch.setattr(interview_engine, "get_model", lambda: FailingModel([]))
+    assert list(stream_model_text("prompt", "fallback")) == ["fallback"]
+
+
+def test_failure_mid_stream_keeps_the_partial_reply(monkeypatch):
+    monkeypatch.setattr(interview_engine, "get_model", lambda: FailingModel(["Hello ", "there"]))
+    assert list(stream_model_text("prompt", "fallback")) == ["Hello ", "there"]
+
+
+def test_questions_reply_shows_the_first_question_and_keeps_the_rest(monkeypatch):
+    monkeypatch.setattr(interview_engine, "iter_technical_questions", lambda *args: iter(["A?", "B?", "C?"]))
+    session = new_session()
+    chunks = list(stream_questions_reply(session, ["Python"], "Engineer"))
+    assert chunks[-1] == "1. A?"
+    assert [q["question"] for q in session.technical_questions] == ["1. A?", "2. B?", "3. C?"]
+
+
+def test_questions_reply_falls_back_to_default_questions(monkeypatch):
+    monkeypatch.setattr(interview_engine, "iter_technical_questions", lambda *args: iter([]))
+    session = new_session()
+    chunks = list(stream_questions_reply(session, ["Python"], "Engineer"))
+    assert chunks[-1] == session.technical_questions[0]["question"]
+    assert "Python" in chunks[-1]
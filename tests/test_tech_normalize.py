@@ -0,0 +1,63 @@
+import pytest
+
+from tech_normalize import COMMON_WORDS, canonical_tech, normalize_tech_stack, parse_tech_stack
+
+
+@pytest.mark.parametrize("typed, canonical", [
+    ("JS", "JavaScript"),
+    ("javascript ", "JavaScript"),
+    ("k8s", "Kubernetes"),
+    ("Node JS", "Node.js"),
+    ("- Golang.", "Go"),
+])
+def test_aliases(typed, canonical):
+    assert canonical_tech(typed) == canonical
+
+
+@pytest.mark.parametrize("typed, canonical", [
+    ("Pyhton", "Python"),
+    ("Djnago", "Django"),
+    ("Kubernets", "Kubernetes"),
+    ("Javscript", "JavaScript"),
+    ("Typescirpt", "TypeScript"),
+    ("Tensorflw", "TensorFlow"),
+])
+def test_typos_are_corrected(typed, canonical):
+    assert canonical_tech(typed) == canonical
+
+
+@pytest.mark.parametrize("typed, canonical", [
+    ("Nuxt", "Nuxt.js"),
+    ("NuxtJS", "Nuxt.js"),
+    ("Dash", "Dash"),
+    ("Cube", "Cube.js"),
+    ("Flash", "Adobe Flash"),
+    ("Test", "Test"),
+    ("Reach", "Reach"),
+    ("NestJS", "NestJS"),
+    ("NextJS", "Next.js"),
+    ("Preact", "Preact"),
+    ("SwiftUI", "SwiftUI"),
+])
+def test_different_technologies_are_not_merged(typed, canonical):
+    assert canonical_tech(typed) == canonical
+
+
+def test_substitutions_are_not_corrected():
+    assert canonical_tech("Pythin") == "Pythin"
+    assert canonical_tech("Jenkims") == "Jenkims"
+
+
+@pytest.mark.parametrize("word", sorted(COMMON_WORDS))
+def test_common_words_are_left_alone(word):
+    assert canonical_tech(word) == word
+
+
+def test_unknown_technology_is_kept_as_typed():
+    assert canonical_tech("  Elixir  Phoenix ") == "Elixir Phoenix"
+    assert canonical_tech("  ") == ""
+
+
+def test_stack_is_deduplicated_in_first_seen_order():
+    assert parse_tech_stack("JS, Pyhton and react; javascript\nPython") == ["JavaScript", "Python", "React"]
+    assert normalize_tech_stack(["Nuxt", "Next.js", "nuxtjs"]) == ["Nuxt.js", "Next.js"]